@@ -4,9 +4,327 @@
 """
 
 import argparse
+import signal
+import subprocess
+import time
 
 from core.config_manager import get_postgres_config, DATABASES_CONFIG, show_postgres_config
 from core.database_manager import DatabaseManager
+from core.benchmarks import (
+    benchmark_compression, benchmark_copy_formats, benchmark_gui_startup, benchmark_parallel_copy,
+    benchmark_partitioning, benchmark_sql_script, format_benchmark_table,
+    DEFAULT_BENCHMARK_SCALE, DEFAULT_PARALLEL_BENCHMARK_JOBS
+)
+from core.copy_loader import COPY_FORMATS, COPY_FORMAT_TEXT
+from core.dumps import DUMP_FORMATS
+from core.fanout import FanOut, load_hosts, prepare_dataset, format_host_rows, FANOUT_TABLE_HEADERS, DEFAULT_HOST_JOBS
+from core.events import EventBus, LogMessage, print_log_event
+from core.maintenance import MaintenanceSettings
+from core.memprofile import MemoryProfiler
+from core.parallel_copy import DEFAULT_COPY_JOBS
+from core.partitioning import LAYOUTS, LAYOUT_PLAIN
+from core.manifest import build_manifest, save_manifest, load_valid_manifest
+from core.mock_data import get_dataset_path
+from core.provisioning import DEFAULT_POOL_SIZE, DEFAULT_SERVE_HOST, DEFAULT_SERVE_PORT, DEFAULT_LEASE_TTL
+from core.query_pack import run_query_pack, percentile, DEFAULT_QUERY_RUNS, PLAN_CHANGED, PLAN_NEW
+from core.report import RunReport
+from core.sql_script import emit_sql_script
+from core.validation import validate_dataset, VALIDATION_MODES
+from core.watcher import DEFAULT_DEBOUNCE
+
+
+MEMPROFILE_REPORT = 'memprofile.json'
+
+
+def install_sigint_handler(db_manager):
+    """
+    Первый Ctrl+C отменяет операцию и оставляет базы в чистом состоянии,
+    повторный - немедленно прерывает программу.
+    """
+    def handler(signum, frame):
+        if db_manager.cancel_token.is_cancelled:
+            raise KeyboardInterrupt
+        print("\n⛔ Ctrl+C: отмена операции (повторное нажатие - немедленный выход)")
+        db_manager.cancel()
+
+    signal.signal(signal.SIGINT, handler)
+
+
+def build_manifests(db_names):
+    """Собирает манифесты наборов данных"""
+    for db_name in db_names:
+        if db_name not in DATABASES_CONFIG:
+            print(f"❌ База данных '{db_name}' не найдена в конфигурации")
+            continue
+
+        manifest = build_manifest(DATABASES_CONFIG[db_name])
+        path = save_manifest(DATABASES_CONFIG[db_name], manifest)
+        records = sum(entry['records'] for entry in manifest['tables'].values())
+        print(f"✅ {db_name}: {len(manifest['tables'])} таблиц, {records} записей -> {path}")
+
+
+def check_manifests(db_names):
+    """Проверяет при запуске, что манифесты соответствуют файлам данных"""
+    for db_name in db_names:
+        if db_name not in DATABASES_CONFIG:
+            continue
+
+        manifest, stale = load_valid_manifest(get_dataset_path(DATABASES_CONFIG[db_name]))
+        if manifest is None:
+            print(f"ℹ️ {db_name}: манифест не найден (python cli.py --build-manifest {db_name})")
+        elif stale:
+            print(f"⚠️ {db_name}: манифест устарел для таблиц {', '.join(stale)} "
+                  f"(python cli.py --build-manifest {db_name})")
+
+
+def validate_datasets(db_names):
+    """Проверяет моковые данные по ограничениям моделей (без подключения к серверу)"""
+    for db_name in db_names:
+        if db_name not in DATABASES_CONFIG:
+            print(f"❌ База данных '{db_name}' не найдена в конфигурации")
+            continue
+
+        print(f"\n🔎 Проверка данных {db_name}")
+        results = validate_dataset(DATABASES_CONFIG[db_name])
+        rows = []
+        for table, result in results.items():
+            counts = ', '.join(f"{kind}: {count}" for kind, count in result.counts.items())
+            rows.append([table, result.records, len(result.rejected), counts or '-'])
+        print(format_benchmark_table(['таблица', 'записей', 'отклонено', 'нарушения'], rows))
+
+        for result in results.values():
+            for violation in result.examples:
+                print(f"  • {violation}")
+
+
+def emit_sql_scripts(db_names, out_dir, compress, layout, index_profile):
+    """Сохраняет автономные SQL скрипты баз (DDL и данные COPY) для загрузки через psql"""
+    for db_name in db_names:
+        if db_name not in DATABASES_CONFIG:
+            print(f"❌ База данных '{db_name}' не найдена в конфигурации")
+            continue
+
+        path, tables, size = emit_sql_script(DATABASES_CONFIG[db_name], out_dir, compress=compress,
+                                             layout=layout, index_profile=index_profile)
+        print(f"✅ {db_name}: {len(tables)} таблиц, {sum(tables.values())} строк, "
+              f"{size / 1024:.1f} КБ -> {path}")
+        loader = f"gunzip -c {path} | psql -d {db_name} -1" if compress else f"psql -d {db_name} -1 -f {path}"
+        print(f"   Загрузка: createdb {db_name} && {loader}")
+
+
+def run_fan_out(config, hosts_file, db_names, jobs, layout, index_profile):
+    """Создает базы на всех серверах из списка одновременно"""
+    unknown = [db_name for db_name in db_names if db_name not in DATABASES_CONFIG]
+    if unknown:
+        print(f"❌ Базы данных не найдены в конфигурации: {', '.join(unknown)}")
+        return
+
+    try:
+        hosts = load_hosts(hosts_file, config)
+    except (OSError, ValueError) as e:
+        print(f"❌ Список серверов: {e}")
+        return
+
+    started = time.perf_counter()
+    datasets = [prepare_dataset(DATABASES_CONFIG[db_name], layout, index_profile) for db_name in db_names]
+    print(f"📦 Подготовлено баз: {len(datasets)}, {sum(dataset.rows for dataset in datasets)} строк, "
+          f"{sum(dataset.size for dataset in datasets) / 1024 / 1024:.1f} МБ за {time.perf_counter() - started:.2f} с")
+
+    print(f"🚀 Загрузка на {len(hosts)} серверов ({jobs} баз на сервер одновременно)...")
+    fan_out = FanOut(hosts, jobs=jobs)
+    install_sigint_handler(fan_out)
+    results = fan_out.run(datasets)
+
+    print()
+    print(format_benchmark_table(FANOUT_TABLE_HEADERS, format_host_rows(results)))
+    for result in results.values():
+        for db_name, error in result.errors.items():
+            print(f"  ❌ {result.name}/{db_name}: {error}")
+
+
+def run_copy_benchmark(config, db_name, scale):
+    """Сравнивает текстовый и двоичный COPY на масштабированных данных базы"""
+    if db_name not in DATABASES_CONFIG:
+        print(f"❌ База данных '{db_name}' не найдена в конфигурации")
+        return
+
+    print(f"⏱️ Замер COPY для {db_name} (данные x{scale}, временные таблицы)...")
+    results = benchmark_copy_formats(config, DATABASES_CONFIG[db_name], scale=scale)
+
+    rows = []
+    for result in results:
+        cpu = result['server_cpu']
+        rows.append([
+            result['table'], result['format'], result['rows'],
+            f"{result['wall']:.3f}", f"{result['rows'] / result['wall']:.0f}" if result['wall'] else '-',
+            f"{cpu:.2f}" if cpu is not None else 'н/д',
+        ])
+    print(format_benchmark_table(['таблица', 'формат', 'строк', 'время, с', 'строк/с', 'CPU сервера, с'], rows))
+
+
+def run_partitioning_benchmark(config, db_name, scale, jobs, runs):
+    """Сравнивает обычную и секционированную раскладку на масштабированных данных базы"""
+    if db_name not in DATABASES_CONFIG:
+        print(f"❌ База данных '{db_name}' не найдена в конфигурации")
+        return
+
+    print(f"⏱️ Замер секционирования для {db_name} (данные x{scale}, даты разнесены по месяцам)...")
+    results = benchmark_partitioning(config, DATABASES_CONFIG[db_name], scale=scale, jobs=jobs, runs=runs)
+    if not results:
+        print("  ⚠️ В наборе данных нет секционируемых таблиц")
+        return
+
+    rows = []
+    for result in results:
+        rows.append([
+            result['table'], result['layout'], result['rows'], result['partitions'] or '-',
+            f"{result['load']:.3f}", f"{result['maintenance']:.3f}", f"{result['month_maintenance']:.3f}",
+            f"{result['query_p50_ms']:.2f}", result['scanned'],
+        ])
+    month = results[0]['query_month']
+    print(format_benchmark_table(['таблица', 'раскладка', 'строк', 'секций', 'COPY, с', 'VACUUM, с',
+                                  f"VACUUM {month}, с", f"запрос {month}, p50 мс", 'читает таблиц'], rows))
+
+
+def run_sql_script_benchmark(config, db_name, scale, compress):
+    """Сравнивает загрузку через SQL скрипт (psql -1 -f) с прямой загрузкой COPY"""
+    if db_name not in DATABASES_CONFIG:
+        print(f"❌ База данных '{db_name}' не найдена в конфигурации")
+        return
+
+    print(f"⏱️ Замер SQL скрипта для {db_name} (данные x{scale}, таблицы _bench_*)...")
+    results = benchmark_sql_script(config, DATABASES_CONFIG[db_name], scale=scale, compress=compress)
+    if results and results[0]['script_load'] is None:
+        print("  ⚠️ psql не найден: загрузка скрипта не замерена")
+
+    rows = []
+    for result in results:
+        load = result['script_load']
+        row = [
+            result['table'], result['rows'], f"{result['direct']:.3f}", f"{result['emit']:.3f}",
+            f"{load:.3f}" if load is not None else 'н/д',
+            f"{result['emit'] + load:.3f}" if load is not None else 'н/д',
+            f"{result['bytes'] / 1024 / 1024:.1f}",
+        ]
+        if compress:
+            row += [f"{result['gzip_emit']:.3f}", f"{result['gzip_bytes'] / 1024 / 1024:.1f}"]
+        rows.append(row)
+
+    headers = ['таблица', 'строк', 'COPY, с', 'запись скрипта, с', 'psql -1 -f, с', 'скрипт всего, с', 'МБ']
+    if compress:
+        headers += ['запись gzip, с', 'МБ gzip']
+    print(format_benchmark_table(headers, rows))
+
+
+def run_parallel_copy_benchmark(config, db_name, scale, jobs, copy_format):
+    """Замеряет масштабирование загрузки таблицы с числом соединений COPY"""
+    if db_name not in DATABASES_CONFIG:
+        print(f"❌ База данных '{db_name}' не найдена в конфигурации")
+        return
+
+    jobs = jobs or DEFAULT_PARALLEL_BENCHMARK_JOBS
+    print(f"⏱️ Замер COPY в 1..{jobs} соединений для {db_name} (данные x{scale}, COPY {copy_format}, "
+          f"таблицы _bench_*)...")
+    results = benchmark_parallel_copy(config, DATABASES_CONFIG[db_name], scale=scale, jobs=jobs,
+                                      copy_format=copy_format)
+
+    rows = []
+    for result in results:
+        rows.append([
+            result['table'], result['mode'], result['rows'],
+            f"{result['copy']:.3f}", f"{result['merge']:.3f}" if result['merge'] is not None else '-',
+            f"{result['wall']:.3f}", f"{result['rows'] / result['wall']:.0f}",
+            f"{result['speedup']:.2f}x" if result['speedup'] is not None else '-',
+        ])
+    print(format_benchmark_table(['таблица', 'загрузка', 'строк', 'COPY, с', 'перенос, с', 'всего, с',
+                                  'строк/с', 'к 1 соединению'], rows))
+
+
+def run_compression_benchmark(config, db_name, scale):
+    """Сравнивает загрузку из сжатых файлов (.gz, .xz, .zst, JSON Lines) с несжатым .json"""
+    if db_name not in DATABASES_CONFIG:
+        print(f"❌ База данных '{db_name}' не найдена в конфигурации")
+        return
+
+    print(f"⏱️ Замер загрузки из сжатых файлов для {db_name} (данные x{scale}, таблицы _bench_*)...")
+    results = benchmark_compression(config, DATABASES_CONFIG[db_name], scale=scale)
+
+    rows = []
+    for result in results:
+        rows.append([
+            result['file'], result['rows'], f"{result['bytes'] / 1024 / 1024:.2f}", f"{result['ratio']:.1f}x",
+            f"{result['parse']:.3f}", f"{result['load']:.3f}", f"{result['rows'] / result['load']:.0f}",
+            f"{result['speedup']:.2f}x",
+        ])
+    print(format_benchmark_table(['файл', 'строк', 'МБ', 'сжатие', 'разбор, с', 'загрузка, с', 'строк/с',
+                                  'к .json'], rows))
+    if scale > 1:
+        print("ℹ️ Масштабированные данные - повторы записей: они сжимаются сильнее настоящих, "
+              "размеры файлов показательны только при --scale 1")
+
+
+def run_startup_benchmark(app, runs):
+    """Замеряет запуск GUI: время до первой отрисовки окна и фоновый прогрев слоя БД"""
+    print(f"⏱️ Замер запуска GUI ({app or 'main.py'}): {runs} запусков...")
+    try:
+        results = benchmark_gui_startup(runs=runs, app=app)
+    except (OSError, RuntimeError, subprocess.TimeoutExpired) as e:
+        print(f"❌ Ошибка замера запуска: {e}")
+        return
+
+    metrics = [
+        ('запуск процесса → первая отрисовка', 'process_to_paint_ms'),
+        ('main.py → первая отрисовка', 'first_paint_ms'),
+        ('  импорт Qt и интерфейса', 'imports_ms'),
+        ('  создание окна', 'window_ms'),
+        ('прогрев слоя БД (в фоне)', 'warm_up_ms'),
+        ('main.py → слой БД загружен', 'warmed_up_ms'),
+    ]
+    rows = []
+    for title, key in metrics:
+        values = [result[key] for result in results]
+        rows.append([title, f"{percentile(values, 50):.1f}", f"{min(values):.1f}", f"{max(values):.1f}"])
+    print(format_benchmark_table(['этап', 'p50, мс', 'мин, мс', 'макс, мс'], rows))
+
+    eager = sorted({name for result in results for name in result['loaded_before_paint']})
+    print(f"Загружены до первой отрисовки: {', '.join(eager) if eager else 'нет'}")
+    errors = {result['warm_up_error'] for result in results if result['warm_up_error']}
+    for error in errors:
+        print(f"⚠️ Ошибка прогрева слоя БД: {error}")
+
+
+def run_queries(config, db_names, runs, names, report_path=None):
+    """Выполняет учебные наборы запросов и печатает p50/p95 и изменения планов"""
+    results = {}
+    for db_name in db_names:
+        if db_name not in DATABASES_CONFIG:
+            print(f"❌ База данных '{db_name}' не найдена в конфигурации")
+            continue
+
+        print(f"\n⏱️ Набор запросов {db_name}: {runs} запусков каждого запроса")
+        result = run_query_pack(config, DATABASES_CONFIG[db_name], runs=runs, names=names)
+        results[db_name] = result
+        if not result['queries']:
+            print("  ⚠️ Запросы не найдены")
+            continue
+
+        rows = []
+        for query in result['queries']:
+            plan = {PLAN_CHANGED: '⚠️ изменился', PLAN_NEW: 'новый'}.get(query['plan_status'], 'без изменений')
+            rows.append([query['name'], query['rows'], query['p50_ms'], query['p95_ms'],
+                         f"{query['shared_hit_blocks']}/{query['shared_read_blocks']}", plan])
+        print(format_benchmark_table(['запрос', 'строк', 'p50, мс', 'p95, мс', 'буферы hit/read', 'план'], rows))
+
+        for query in result['queries']:
+            if query['plan_status'] == PLAN_CHANGED:
+                print(f"  ⚠️ {query['name']}: план изменился")
+                print(f"     было: {query['previous_plan_signature']}")
+                print(f"     стало: {query['plan_signature']}")
+
+    if report_path:
+        report = RunReport()
+        report.add_section('queries', lambda: results)
+        report.save(report_path)
 
 
 def main():
@@ -18,8 +336,39 @@ def main():
               python cli.py --create                      # Создать все базы
               python cli.py --create games_easy school    # Создать указанные базы
               python cli.py --clean                       # Очистить все базы
+              python cli.py --sync games_shop             # Применить только изменения данных
+              python cli.py --watch air_travel            # Перезагружать таблицы при изменении mock_data
               python cli.py --list                        # Показать список баз
               python cli.py --config                      # Показать текущий конфиг
+              python cli.py --create --report run.json    # Сохранить JSON отчет
+              python cli.py --create --memprofile         # Профиль памяти (memprofile.json)
+              python cli.py --build-manifest              # Пересобрать манифесты данных
+              python cli.py --validate air_travel         # Проверить данные без сервера
+              python cli.py --create --prevalidate filter # Загрузить только корректные записи
+              python cli.py --create air_travel --resume  # Продолжить прерванную загрузку
+              python cli.py --verify air_travel           # Сверить таблицы с данными по хешу
+              python cli.py --create air_travel --verify  # ... сразу после загрузки
+              python cli.py --serve school_world --pool-size 3       # Пул готовых копий (HTTP :8765)
+              python cli.py --fan-out hosts.json school_world        # Создать на всех серверах списка
+              python cli.py --export-dump air_travel      # Сохранить собранную базу как дамп
+              python cli.py --emit-sql scripts air_travel # SQL скрипт для psql -1 -f (без подключения)
+              python cli.py --emit-sql scripts --gzip     # ... для всех баз, сжатый gzip
+              python cli.py --benchmark-sql-script air_travel        # Скрипт через psql против COPY
+              python cli.py --create --copy-format binary # Двоичный COPY для больших таблиц
+              python cli.py --create air_travel --copy-jobs 4        # Большие таблицы в 4 соединения
+              python cli.py --benchmark-parallel-copy air_travel --jobs 8   # Масштабирование 1..8 соединений
+              python cli.py --benchmark-copy air_travel   # Сравнить текстовый и двоичный COPY
+              python cli.py --benchmark-compression air_travel       # Сжатые файлы против .json
+              python cli.py --create --layout partitioned            # Рейсы и заказы по месяцам
+              python cli.py --benchmark-partitioning air_travel      # Секции против обычной таблицы
+              python cli.py --queries air_travel --runs 20 # Замерить учебные запросы (p50/p95, планы)
+              python cli.py --benchmark-startup --runs 20 # Время запуска GUI до первой отрисовки
+              python cli.py --create --index-profile analytical      # Создать с профилем индексов
+              python cli.py --switch-index-profile oltp air_travel   # Сменить профиль без перезагрузки
+              python cli.py --create --maintenance --jobs 8          # VACUUM (ANALYZE) после загрузки
+              python cli.py --create air_travel --prewarm flights    # ... и прогрев таблиц в кэш
+              python cli.py --create air_travel --from-dump --jobs 8   # Развернуть из дампа
+              python cli.py --create air_travel --from-dump --template # Через кэш шаблонов
         """
     )
 
@@ -27,10 +376,115 @@ def main():
                         help='Создать указанные базы данных (или все, если не указано)')
     parser.add_argument('--clean', nargs='*', metavar='DB_NAME',
                         help='Очистить указанные базы данных (или все, если не указано)')
+    parser.add_argument('--sync', nargs='*', metavar='DB_NAME',
+                        help='Синхронизировать базы с моковыми данными без полной перезагрузки '
+                             '(или все, если не указано)')
+    parser.add_argument('--watch', metavar='DB_NAME',
+                        help='Следить за mock_data базы и перезагружать измененные таблицы и зависимые '
+                             'от них (до Ctrl+C)')
+    parser.add_argument('--poll', action='store_true',
+                        help='С --watch: опрашивать папку вместо inotify')
+    parser.add_argument('--debounce', type=float, default=DEFAULT_DEBOUNCE, metavar='SEC',
+                        help=f'С --watch: ждать тишины столько секунд перед перезагрузкой '
+                             f'(по умолчанию {DEFAULT_DEBOUNCE})')
+    parser.add_argument('--serve', nargs='*', metavar='DB_NAME',
+                        help='Держать пул готовых копий баз (или всех) и выдавать их по HTTP/JSON '
+                             '(POST /acquire, POST /release, GET /status, GET /metrics) до Ctrl+C')
+    parser.add_argument('--pool-size', type=int, default=DEFAULT_POOL_SIZE, metavar='N',
+                        help=f'С --serve: готовых копий каждой базы (по умолчанию {DEFAULT_POOL_SIZE})')
+    parser.add_argument('--port', type=int, default=DEFAULT_SERVE_PORT, metavar='PORT',
+                        help=f'С --serve: порт HTTP API на {DEFAULT_SERVE_HOST} (по умолчанию {DEFAULT_SERVE_PORT})')
+    parser.add_argument('--lease-ttl', type=int, default=DEFAULT_LEASE_TTL, metavar='SEC',
+                        help=f'С --serve: через сколько секунд выданная копия удаляется, даже если ее '
+                             f'не вернули (0 - никогда, по умолчанию {DEFAULT_LEASE_TTL})')
+    parser.add_argument('--fan-out', nargs='+', metavar=('HOSTS_FILE', 'DB_NAME'),
+                        help='Создать базы (или все) на всех серверах из JSON списка настроек подключения '
+                             'одновременно: данные готовятся один раз. Учитывает --layout и --index-profile')
+    parser.add_argument('--host-jobs', type=int, default=DEFAULT_HOST_JOBS, metavar='N',
+                        help=f'С --fan-out: баз, загружаемых на один сервер одновременно '
+                             f'(по умолчанию {DEFAULT_HOST_JOBS})')
     parser.add_argument('--list', action='store_true',
                         help='Показать список доступных баз данных')
     parser.add_argument('--config', action='store_true',
                         help='Показать текущую конфигурацию PostgreSQL')
+    parser.add_argument('--build-manifest', nargs='*', metavar='DB_NAME',
+                        help='Собрать манифест набора данных (число записей, размеры, хеши, зависимости)')
+    parser.add_argument('--validate', nargs='*', metavar='DB_NAME',
+                        help='Проверить моковые данные по ограничениям моделей без подключения к серверу '
+                             '(или все, если не указано)')
+    parser.add_argument('--prevalidate', choices=VALIDATION_MODES,
+                        help='С --create: проверить данные до загрузки. fail - не создавать базу при '
+                             'первой ошибке, filter - пропустить ошибочные записи')
+    parser.add_argument('--verify', nargs='*', metavar='DB_NAME',
+                        help='Сверить содержимое таблиц баз (или всех) с моковыми данными по хешу, '
+                             'посчитанному на сервере. С --create - сразу после загрузки')
+    parser.add_argument('--export-dump', nargs='*', metavar='DB_NAME',
+                        help='Сохранить собранные базы как дампы в папку dumps/ (или все, если не указано)')
+    parser.add_argument('--dump-format', choices=DUMP_FORMATS,
+                        help='Формат дампа: directory (pg_dump -Fd) или copy (без утилит PostgreSQL). '
+                             'По умолчанию directory, если доступен pg_dump')
+    parser.add_argument('--emit-sql', nargs='+', metavar=('DIR', 'DB_NAME'),
+                        help='Сохранить в DIR автономные SQL скрипты баз (DDL и данные COPY) для '
+                             'psql -1 -f (или всех баз, если не указано). Учитывает --layout и --index-profile')
+    parser.add_argument('--gzip', action='store_true',
+                        help='С --emit-sql: сжимать скрипты gzip (<база>.sql.gz)')
+    parser.add_argument('--benchmark-sql-script', metavar='DB_NAME',
+                        help='Сравнить загрузку масштабированных данных через SQL скрипт (psql -1 -f) '
+                             'и прямой COPY')
+    parser.add_argument('--resume', action='store_true',
+                        help='С --create: продолжить прерванную загрузку с контрольных точек '
+                             '(загруженные таблицы и пакеты пропускаются)')
+    parser.add_argument('--from-dump', action='store_true',
+                        help='С --create: развернуть базы из дампов вместо загрузки JSON')
+    parser.add_argument('--template', action='store_true',
+                        help='С --from-dump: восстанавливать дамп в шаблонную базу и копировать ее')
+    parser.add_argument('--jobs', type=int, metavar='N',
+                        help='Число параллельных потоков экспорта и восстановления дампов, '
+                             'VACUUM и прогрева; наибольшее число соединений --benchmark-parallel-copy')
+    parser.add_argument('--copy-format', choices=COPY_FORMATS, default=COPY_FORMAT_TEXT,
+                        help='Формат COPY для больших таблиц (по умолчанию text)')
+    parser.add_argument('--copy-jobs', type=int, default=DEFAULT_COPY_JOBS, metavar='N',
+                        help='С --create: загружать каждую большую таблицу через COPY в N соединений '
+                             '(через промежуточную таблицу, таблица получает все строки или ни одной). '
+                             'Перезагрузка --watch идет в одной транзакции и в одном соединении')
+    parser.add_argument('--benchmark-parallel-copy', metavar='DB_NAME',
+                        help='Сравнить загрузку больших таблиц в 1, 2, 4 ... --jobs соединений '
+                             '(масштабированные данные, таблицы _bench_*)')
+    parser.add_argument('--benchmark-compression', metavar='DB_NAME',
+                        help='Сравнить загрузку масштабированных данных из файлов .json, .jsonl и сжатых '
+                             '(.gz, .xz, .zst): размер, разбор и COPY (таблицы _bench_*)')
+    parser.add_argument('--benchmark-copy', metavar='DB_NAME',
+                        help='Сравнить текстовый и двоичный COPY на масштабированных данных созданной базы')
+    parser.add_argument('--layout', choices=LAYOUTS, default=LAYOUT_PLAIN,
+                        help='С --create: раскладка таблиц. partitioned - таблицы-временные ряды '
+                             'секционируются по месяцам (по умолчанию plain)')
+    parser.add_argument('--benchmark-partitioning', metavar='DB_NAME',
+                        help='Сравнить обычную и секционированную раскладку: COPY, VACUUM и запрос за месяц')
+    parser.add_argument('--benchmark-startup', nargs='?', const='', metavar='APP',
+                        help='Замерить запуск GUI: время до первой отрисовки окна и прогрев слоя БД '
+                             '(--runs запусков; APP - собранное приложение, по умолчанию main.py)')
+    parser.add_argument('--scale', type=int, default=DEFAULT_BENCHMARK_SCALE, metavar='N',
+                        help=f'Во сколько раз масштабировать данные для замеров (по умолчанию {DEFAULT_BENCHMARK_SCALE})')
+    parser.add_argument('--queries', nargs='*', metavar='DB_NAME',
+                        help='Выполнить учебные наборы запросов queries/<база>/ (или все, если не указано)')
+    parser.add_argument('--runs', type=int, default=DEFAULT_QUERY_RUNS, metavar='N',
+                        help=f'Сколько раз выполнять каждый запрос (по умолчанию {DEFAULT_QUERY_RUNS})')
+    parser.add_argument('--query', nargs='+', metavar='NAME',
+                        help='С --queries: выполнить только указанные запросы')
+    parser.add_argument('--index-profile', metavar='PROFILE',
+                        help='С --create: профиль вторичных индексов (minimal, default, oltp, analytical)')
+    parser.add_argument('--switch-index-profile', nargs='+', metavar=('PROFILE', 'DB_NAME'),
+                        help='Переключить профиль индексов существующих баз (или всех) без перезагрузки данных')
+    parser.add_argument('--maintenance', action='store_true',
+                        help='С --create: выполнить VACUUM (ANALYZE) таблиц после загрузки')
+    parser.add_argument('--prewarm', nargs='*', metavar='TABLE',
+                        help='С --create: VACUUM (ANALYZE) и прогрев таблиц с индексами в кэш '
+                             '(pg_prewarm, или все таблицы, если не указано)')
+    parser.add_argument('--report', metavar='PATH',
+                        help='Сохранить JSON отчет с таймингами фаз и статистикой таблиц')
+    parser.add_argument('--memprofile', action='store_true',
+                        help='Профилировать память по фазам и таблицам (tracemalloc и RSS). '
+                             f'Результат добавляется в JSON отчет (по умолчанию {MEMPROFILE_REPORT})')
 
     args = parser.parse_args()
 
@@ -41,6 +495,24 @@ def main():
         print(f"\nВсего: {len(DATABASES_CONFIG)} баз данных")
         return
 
+    if args.build_manifest is not None:
+        build_manifests(args.build_manifest or list(DATABASES_CONFIG.keys()))
+        return
+
+    if args.validate is not None:
+        validate_datasets(args.validate or list(DATABASES_CONFIG.keys()))
+        return
+
+    if args.emit_sql:
+        out_dir, *databases = args.emit_sql
+        emit_sql_scripts(databases or list(DATABASES_CONFIG.keys()), out_dir, args.gzip,
+                         args.layout, args.index_profile)
+        return
+
+    if args.benchmark_startup is not None:
+        run_startup_benchmark(args.benchmark_startup or None, args.runs)
+        return
+
     # Загружаем конфигурацию
     config = get_postgres_config()
 
@@ -48,9 +520,72 @@ def main():
         show_postgres_config(config)
         return
 
-    db_manager = DatabaseManager(config)
+    if args.queries is not None:
+        run_queries(config, args.queries or list(DATABASES_CONFIG.keys()), args.runs, args.query, args.report)
+        return
+
+    if args.fan_out:
+        hosts_file, *databases = args.fan_out
+        run_fan_out(config, hosts_file, databases or list(DATABASES_CONFIG.keys()),
+                    args.host_jobs, args.layout, args.index_profile)
+        return
+
+    if args.benchmark_copy:
+        run_copy_benchmark(config, args.benchmark_copy, args.scale)
+        return
+
+    if args.benchmark_partitioning:
+        run_partitioning_benchmark(config, args.benchmark_partitioning, args.scale, args.jobs, args.runs)
+        return
+
+    if args.benchmark_sql_script:
+        run_sql_script_benchmark(config, args.benchmark_sql_script, args.scale, args.gzip)
+        return
+
+    if args.benchmark_compression:
+        run_compression_benchmark(config, args.benchmark_compression, args.scale)
+        return
+
+    if args.benchmark_parallel_copy:
+        run_parallel_copy_benchmark(config, args.benchmark_parallel_copy, args.scale, args.jobs, args.copy_format)
+        return
+
+    # Подписчики шины событий: консоль и (опционально) JSON отчет
+    event_bus = EventBus()
+    event_bus.subscribe(print_log_event, (LogMessage,))
+
+    report = None
+    if args.report or args.memprofile:
+        report = RunReport()
+        event_bus.subscribe(report.handle)
+
+    profiler = None
+    if args.memprofile:
+        profiler = MemoryProfiler()
+        event_bus.subscribe(profiler.handle)
+        report.add_section('memory', profiler.to_dict)
+        profiler.start()
+
+    maintenance = None
+    if args.maintenance or args.prewarm is not None:
+        maintenance = MaintenanceSettings(prewarm=args.prewarm is not None, prewarm_tables=args.prewarm,
+                                          jobs=args.jobs)
+
+    db_manager = DatabaseManager(config, event_bus=event_bus, copy_format=args.copy_format,
+                                 index_profile=args.index_profile, maintenance=maintenance, layout=args.layout,
+                                 validation=args.prevalidate, resume=args.resume,
+                                 verify=args.create is not None and args.verify is not None,
+                                 copy_jobs=args.copy_jobs)
+    install_sigint_handler(db_manager)
+
+    if args.create is not None and args.from_dump:
+        databases = args.create or list(DATABASES_CONFIG.keys())
+        print(f"🚀 Создание баз данных из дампов: {', '.join(databases)}")
+        db_manager.restore_databases(databases, jobs=args.jobs, use_template=args.template)
+
+    elif args.create is not None:
+        check_manifests(args.create or list(DATABASES_CONFIG.keys()))
 
-    if args.create is not None:
         if len(args.create) == 0:
             # Создать все базы
             print("🚀 Создание всех баз данных...")
@@ -70,8 +605,42 @@ def main():
             print(f"🧹 Очистка выбранных баз данных: {', '.join(args.clean)}")
             db_manager.clean_databases(args.clean)
 
+    elif args.switch_index_profile:
+        profile, *databases = args.switch_index_profile
+        db_manager.switch_index_profiles(databases or list(DATABASES_CONFIG.keys()), profile)
+
+    elif args.export_dump is not None:
+        db_manager.export_dumps(args.export_dump or list(DATABASES_CONFIG.keys()),
+                                dump_format=args.dump_format, jobs=args.jobs)
+
+    elif args.serve is not None:
+        db_manager.serve_pool(args.serve or list(DATABASES_CONFIG.keys()), size=args.pool_size,
+                              port=args.port, lease_ttl=args.lease_ttl)
+
+    elif args.watch:
+        db_manager.watch_database(args.watch, debounce=args.debounce, polling=args.poll)
+
+    elif args.verify is not None:
+        db_manager.verify_databases(args.verify or list(DATABASES_CONFIG.keys()))
+
+    elif args.sync is not None:
+        databases = args.sync or list(DATABASES_CONFIG.keys())
+        check_manifests(databases)
+        print(f"🔄 Синхронизация баз данных: {', '.join(databases)}")
+        db_manager.sync_databases(databases)
+
     else:
         parser.print_help()
+        return
+
+    if profiler:
+        profiler.stop()
+        print("\n🧠 Память по таблицам:")
+        for line in profiler.summary_lines():
+            print(line)
+
+    if report:
+        report.save(args.report or MEMPROFILE_REPORT)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,585 @@
+"""
+Замеры производительности загрузки.
+
+Записи таблиц набора данных повторяются scale раз (масштабированный набор)
+и загружаются во временные таблицы без ограничений, поэтому замер не
+зависит от уникальных ключей и не меняет данные базы. Кроме времени
+измеряется процессорное время серверного процесса - из /proc/<pid>/stat,
+если сервер запущен на этой же машине.
+
+Замер секционирования использует обычные таблицы _bench_*, так как VACUUM
+секций выполняется в нескольких соединениях; таблицы удаляются после замера.
+По той же причине обычные таблицы нужны замеру SQL скрипта: скрипт загружает
+отдельный процесс psql, замеру COPY в несколько соединений и замеру
+загрузки из сжатых файлов.
+
+Замер запуска GUI запускает приложение (main.py или собранный exe) с
+--startup-benchmark несколько раз подряд: каждый запуск - новый процесс,
+который сообщает тайминги строкой JSON и закрывается сам.
+"""
+
+import importlib
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+from core.binary_copy import BinaryCopyEncoder, copy_binary_chunk, supports_binary_copy
+from core.cancellation import CancellationToken
+from core.config_manager import BASE_DIR, create_database_connection
+from core.copy_loader import (
+    get_copy_columns, copy_text_chunk, COPY_FORMAT_TEXT, COPY_FORMAT_BINARY
+)
+from core.dumps import find_pg_tool, pg_tool_command, pg_tool_env
+from core.maintenance import run_parallel, vacuum_analyze, analyze_table, DEFAULT_MAINTENANCE_JOBS
+from core.manifest import get_table_name, load_valid_manifest, choose_chunk_size
+from core.mock_data import get_dataset_path, get_table_file, iter_records, iter_chunks, write_records
+from core.parallel_copy import ParallelCopy
+from core.partitioning import (
+    get_partitioning, get_date_span, create_month_partitions, get_leaf_partitions, partition_name
+)
+from core.query_pack import percentile
+from core.sql_script import open_script, write_copy_block
+
+DEFAULT_BENCHMARK_SCALE = 1000
+
+# Таблицы с числами и датами, на которых заметна разница форматов COPY
+DEFAULT_COPY_BENCHMARK_TABLES = {
+    'air_travel': ['flights', 'passengers'],
+}
+
+# Форматы файлов замера сжатия; первый - несжатый, к нему считается ускорение
+COMPRESSION_BENCHMARK_SUFFIXES = ('.json', '.json.gz', '.json.xz', '.json.zst', '.jsonl', '.jsonl.gz', '.jsonl.zst')
+
+# Наибольшее число соединений замера COPY в несколько соединений (по умолчанию)
+DEFAULT_PARALLEL_BENCHMARK_JOBS = 4
+
+STARTUP_BENCHMARK_FLAG = '--startup-benchmark'
+STARTUP_TIMEOUT = 60
+
+
+def backend_cpu_time(pid):
+    """Процессорное время серверного процесса в секундах (или None)"""
+    try:
+        with open(f'/proc/{pid}/stat', 'r') as f:
+            fields = f.read().rsplit(')', 1)[1].split()
+    except OSError:
+        return None
+    # После имени процесса: utime и stime - 12-е и 13-е поля
+    return (int(fields[11]) + int(fields[12])) / os.sysconf('SC_CLK_TCK')
+
+
+def load_scaled_records(file_path, scale):
+    """Записи таблицы, повторенные scale раз"""
+    records = list(iter_records(file_path))
+    return records * scale
+
+
+def format_benchmark_table(headers, rows):
+    """Форматирует результаты замера в виде текстовой таблицы"""
+    widths = [max(len(str(value)) for value in column) for column in zip(headers, *rows)]
+    lines = ['  '.join(str(value).ljust(width) for value, width in zip(headers, widths))]
+    lines.append('  '.join('-' * width for width in widths))
+    for row in rows:
+        lines.append('  '.join(str(value).ljust(width) for value, width in zip(row, widths)))
+    return '\n'.join(lines)
+
+
+def benchmark_copy_formats(config, db_config, tables=None, scale=DEFAULT_BENCHMARK_SCALE):
+    """
+    Сравнивает текстовый и двоичный COPY на масштабированных таблицах.
+    Возвращает список результатов: таблица, формат, строк, время, CPU сервера.
+    """
+    models_module = importlib.import_module(db_config['models_module'])
+    models = {get_table_name(model): model for model in models_module.get_models()}
+    dataset_path = get_dataset_path(db_config)
+    manifest, _ = load_valid_manifest(dataset_path)
+    entries = manifest['tables'] if manifest else {}
+
+    tables = tables or DEFAULT_COPY_BENCHMARK_TABLES.get(db_config['db_name'], list(models))
+
+    database = create_database_connection(db_config['db_name'], config)
+    database.connect()
+    pid = database.connection().get_backend_pid()
+    cursor = database.cursor()
+
+    results = []
+    try:
+        for table_name in tables:
+            model = models[table_name]
+            records = load_scaled_records(get_table_file(dataset_path, table_name), scale)
+            if not records:
+                continue
+
+            columns = get_copy_columns(model, {})
+            chunk_size = choose_chunk_size(entries.get(table_name))
+            bench_table = f"bench_{table_name}"
+            database.execute_sql(
+                f'CREATE TEMP TABLE IF NOT EXISTS "{bench_table}" AS SELECT * FROM "{table_name}" WITH NO DATA'
+            )
+
+            formats = [COPY_FORMAT_TEXT]
+            if supports_binary_copy(columns):
+                formats.append(COPY_FORMAT_BINARY)
+
+            for copy_format in formats:
+                database.execute_sql(f'TRUNCATE "{bench_table}"')
+                database.commit()
+                encoder = BinaryCopyEncoder(columns) if copy_format == COPY_FORMAT_BINARY else None
+
+                cpu_before = backend_cpu_time(pid)
+                started = time.perf_counter()
+                with database.atomic():
+                    for chunk in iter_chunks(records, chunk_size):
+                        if encoder:
+                            copy_binary_chunk(cursor, model, encoder, chunk, table=bench_table)
+                        else:
+                            copy_text_chunk(cursor, model, columns, chunk, table=bench_table)
+                wall = time.perf_counter() - started
+                cpu_after = backend_cpu_time(pid)
+
+                results.append({
+                    'table': table_name,
+                    'format': copy_format,
+                    'rows': len(records),
+                    'wall': wall,
+                    'server_cpu': None if cpu_before is None else cpu_after - cpu_before,
+                })
+    finally:
+        database.close()
+
+    return results
+
+
+def spread_dates(records, column, scale):
+    """
+    Записи, повторенные scale раз: k-я копия сдвинута на k дней (по кругу
+    в пределах года), чтобы масштабированные данные занимали много месяцев
+    """
+    result = []
+    for k in range(scale):
+        shift = timedelta(days=k % 365)
+        for record in records:
+            value = record.get(column)
+            if value is not None:
+                text = str(value)
+                record = dict(record, **{column: (date.fromisoformat(text[:10]) + shift).isoformat() + text[10:]})
+            result.append(record)
+    return result
+
+
+def _scanned_relations(node):
+    """Таблицы и секции, которые читает план"""
+    relations = [node['Relation Name']] if 'Relation Name' in node else []
+    for child in node.get('Plans', []):
+        relations.extend(_scanned_relations(child))
+    return relations
+
+
+def benchmark_partitioning(config, db_config, scale=DEFAULT_BENCHMARK_SCALE, jobs=None, runs=10):
+    """
+    Сравнивает обычную и секционированную по месяцам таблицу на
+    масштабированных данных: загрузку COPY, VACUUM (ANALYZE) всей таблицы
+    (у секций - параллельно в jobs соединениях) и данных одного месяца,
+    запрос за один месяц (отсечение секций).
+    """
+    models_module = importlib.import_module(db_config['models_module'])
+    models = {get_table_name(model): model for model in models_module.get_models()}
+    partitioning = get_partitioning(models_module)
+    dataset_path = get_dataset_path(db_config)
+    manifest, _ = load_valid_manifest(dataset_path)
+    entries = manifest['tables'] if manifest else {}
+    jobs = jobs or DEFAULT_MAINTENANCE_JOBS
+
+    database = create_database_connection(db_config['db_name'], config)
+    database.connect()
+    cursor = database.cursor()
+
+    results = []
+    bench_tables = []
+    try:
+        for table_name, column in partitioning.items():
+            model = models[table_name]
+            records = spread_dates(list(iter_records(get_table_file(dataset_path, table_name))), column, scale)
+            if not records:
+                continue
+            first, last = get_date_span(records, column)
+            columns = get_copy_columns(model, {})
+
+            # Запрос за месяц из середины диапазона
+            month_start = (first + (last - first) / 2).replace(day=1)
+            month_end = (month_start + timedelta(days=32)).replace(day=1)
+            query = (f'SELECT COUNT(*) FROM "{{table}}" '
+                     f'WHERE "{column}" >= \'{month_start}\' AND "{column}" < \'{month_end}\'')
+
+            for partitioned in (False, True):
+                bench_table = f"_bench_{table_name}_{'partitioned' if partitioned else 'plain'}"
+                bench_tables.append(bench_table)
+                database.execute_sql(f'DROP TABLE IF EXISTS "{bench_table}"')
+                ddl = f'CREATE TABLE "{bench_table}" (LIKE "{table_name}")'
+                if partitioned:
+                    ddl += f' PARTITION BY RANGE ("{column}")'
+                database.execute_sql(ddl)
+                # Записи загружаются без id (как в замере COPY), последовательность базы не трогаем
+                database.execute_sql(
+                    f'ALTER TABLE "{bench_table}" ALTER COLUMN "{model._meta.primary_key.column_name}" DROP NOT NULL'
+                )
+                if partitioned:
+                    create_month_partitions(database, bench_table, first, last)
+                leaves = get_leaf_partitions(database, bench_table)
+
+                started = time.perf_counter()
+                with database.atomic():
+                    for chunk in iter_chunks(records, choose_chunk_size(entries.get(table_name))):
+                        copy_text_chunk(cursor, model, columns, chunk, table=bench_table)
+                load = time.perf_counter() - started
+
+                started = time.perf_counter()
+                run_parallel(database, leaves, jobs, vacuum_analyze, CancellationToken())
+                if partitioned:
+                    analyze_table(database, bench_table)
+                maintenance = time.perf_counter() - started
+
+                # Повторное обслуживание после изменений за месяц: у секционированной
+                # таблицы - только секция месяца, у обычной - вся таблица
+                month_table = partition_name(bench_table, month_start) if partitioned else bench_table
+                started = time.perf_counter()
+                vacuum_analyze(database, month_table)
+                month_maintenance = time.perf_counter() - started
+
+                sql = query.format(table=bench_table)
+                latencies = []
+                for _ in range(runs):
+                    started = time.perf_counter()
+                    database.execute_sql(sql).fetchall()
+                    latencies.append((time.perf_counter() - started) * 1000)
+                plan = database.execute_sql(f'EXPLAIN (FORMAT JSON) {sql}').fetchone()[0]
+                if isinstance(plan, str):
+                    plan = json.loads(plan)
+
+                results.append({
+                    'table': table_name,
+                    'layout': 'partitioned' if partitioned else 'plain',
+                    'rows': len(records),
+                    'partitions': len(leaves) if partitioned else 0,
+                    'load': load,
+                    'maintenance': maintenance,
+                    'month_maintenance': month_maintenance,
+                    'query_month': f"{month_start:%Y-%m}",
+                    'query_p50_ms': percentile(latencies, 50),
+                    'scanned': len(_scanned_relations(plan[0]['Plan'])),
+                })
+    finally:
+        for bench_table in bench_tables:
+            database.execute_sql(f'DROP TABLE IF EXISTS "{bench_table}"')
+        database.close()
+
+    return results
+
+
+def _write_bench_script(path, compress, model, columns, records, chunk_size, bench_table):
+    """Скрипт замера: очистка таблицы и блок COPY. Возвращает (секунды, байт)"""
+    started = time.perf_counter()
+    with open_script(path, compress) as f:
+        f.write(f'TRUNCATE "{bench_table}";\n')
+        write_copy_block(f, model, columns, records, chunk_size, table=bench_table)
+    return time.perf_counter() - started, os.path.getsize(path)
+
+
+def benchmark_sql_script(config, db_config, tables=None, scale=DEFAULT_BENCHMARK_SCALE, compress=False):
+    """
+    Сравнивает загрузку масштабированных таблиц через SQL скрипт (запись
+    скрипта и psql -1 -f) с прямой загрузкой COPY из процесса. С compress
+    дополнительно замеряется запись скрипта с gzip. Если psql недоступен,
+    время загрузки скрипта не замеряется (None).
+    """
+    models_module = importlib.import_module(db_config['models_module'])
+    models = {get_table_name(model): model for model in models_module.get_models()}
+    dataset_path = get_dataset_path(db_config)
+    manifest, _ = load_valid_manifest(dataset_path)
+    entries = manifest['tables'] if manifest else {}
+    psql = find_pg_tool('psql')
+
+    tables = tables or DEFAULT_COPY_BENCHMARK_TABLES.get(db_config['db_name'], list(models))
+
+    database = create_database_connection(db_config['db_name'], config)
+    database.connect()
+    cursor = database.cursor()
+
+    results = []
+    bench_tables = []
+    try:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            for table_name in tables:
+                model = models[table_name]
+                records = load_scaled_records(get_table_file(dataset_path, table_name), scale)
+                if not records:
+                    continue
+
+                columns = get_copy_columns(model, {})
+                chunk_size = choose_chunk_size(entries.get(table_name))
+                bench_table = f"_bench_{table_name}_script"
+                bench_tables.append(bench_table)
+                database.execute_sql(f'DROP TABLE IF EXISTS "{bench_table}"')
+                database.execute_sql(f'CREATE TABLE "{bench_table}" (LIKE "{table_name}")')
+                database.execute_sql(
+                    f'ALTER TABLE "{bench_table}" ALTER COLUMN "{model._meta.primary_key.column_name}" DROP NOT NULL'
+                )
+
+                started = time.perf_counter()
+                with database.atomic():
+                    for chunk in iter_chunks(records, chunk_size):
+                        copy_text_chunk(cursor, model, columns, chunk, table=bench_table)
+                direct = time.perf_counter() - started
+
+                path = os.path.join(temp_dir, f"{table_name}.sql")
+                emit, size = _write_bench_script(path, False, model, columns, records, chunk_size, bench_table)
+
+                gzip_emit = gzip_size = None
+                if compress:
+                    gzip_emit, gzip_size = _write_bench_script(path + '.gz', True, model, columns, records,
+                                                               chunk_size, bench_table)
+
+                script_load = None
+                if psql:
+                    command = pg_tool_command('psql', config, '-d', db_config['db_name'], '-X', '-q', '-1',
+                                              '-v', 'ON_ERROR_STOP=1', '-f', path)
+                    started = time.perf_counter()
+                    subprocess.run(command, env=pg_tool_env(config), check=True,
+                                   stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+                    script_load = time.perf_counter() - started
+
+                    loaded = database.execute_sql(f'SELECT COUNT(*) FROM "{bench_table}"').fetchone()[0]
+                    if loaded != len(records):
+                        raise RuntimeError(f"Скрипт загрузил {loaded} строк {table_name} из {len(records)}")
+
+                results.append({
+                    'table': table_name,
+                    'rows': len(records),
+                    'direct': direct,
+                    'emit': emit,
+                    'bytes': size,
+                    'script_load': script_load,
+                    'gzip_emit': gzip_emit,
+                    'gzip_bytes': gzip_size,
+                })
+    finally:
+        for bench_table in bench_tables:
+            database.execute_sql(f'DROP TABLE IF EXISTS "{bench_table}"')
+        database.close()
+
+    return results
+
+
+def compression_suffixes():
+    """Форматы файлов для замера сжатия (.zst - если установлен zstandard)"""
+    try:
+        import zstandard  # noqa: F401
+    except ImportError:
+        return [suffix for suffix in COMPRESSION_BENCHMARK_SUFFIXES if not suffix.endswith('.zst')]
+    return list(COMPRESSION_BENCHMARK_SUFFIXES)
+
+
+def benchmark_compression(config, db_config, tables=None, scale=DEFAULT_BENCHMARK_SCALE):
+    """
+    Сравнивает загрузку масштабированных таблиц из несжатых и сжатых файлов.
+    Записи сохраняются во временную папку во всех форматах, для каждого
+    файла замеряется разбор (iter_records) и загрузка (разбор и COPY в
+    таблицу _bench_*). Ускорение считается к несжатому .json
+    """
+    models_module = importlib.import_module(db_config['models_module'])
+    models = {get_table_name(model): model for model in models_module.get_models()}
+    dataset_path = get_dataset_path(db_config)
+    manifest, _ = load_valid_manifest(dataset_path)
+    entries = manifest['tables'] if manifest else {}
+
+    tables = tables or DEFAULT_COPY_BENCHMARK_TABLES.get(db_config['db_name'], list(models))
+
+    database = create_database_connection(db_config['db_name'], config)
+    database.connect()
+    cursor = database.cursor()
+
+    results = []
+    bench_tables = []
+    try:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            for table_name in tables:
+                model = models[table_name]
+                records = load_scaled_records(get_table_file(dataset_path, table_name), scale)
+                if not records:
+                    continue
+
+                columns = get_copy_columns(model, {})
+                chunk_size = choose_chunk_size(entries.get(table_name))
+                bench_table = f"_bench_{table_name}_compression"
+                bench_tables.append(bench_table)
+                database.execute_sql(f'DROP TABLE IF EXISTS "{bench_table}"')
+                database.execute_sql(f'CREATE TABLE "{bench_table}" (LIKE "{table_name}")')
+                database.execute_sql(
+                    f'ALTER TABLE "{bench_table}" ALTER COLUMN "{model._meta.primary_key.column_name}" DROP NOT NULL'
+                )
+
+                baseline = None
+                for suffix in compression_suffixes():
+                    path = os.path.join(temp_dir, table_name + suffix)
+                    write_records(path, records)
+
+                    started = time.perf_counter()
+                    parsed = sum(1 for _ in iter_records(path))
+                    parse = time.perf_counter() - started
+                    if parsed != len(records):
+                        raise RuntimeError(f"{table_name}{suffix}: прочитано {parsed} записей из {len(records)}")
+
+                    database.execute_sql(f'TRUNCATE "{bench_table}"')
+                    database.commit()
+                    started = time.perf_counter()
+                    with database.atomic():
+                        for chunk in iter_chunks(iter_records(path), chunk_size):
+                            copy_text_chunk(cursor, model, columns, chunk, table=bench_table)
+                    load = time.perf_counter() - started
+
+                    size = os.path.getsize(path)
+                    if baseline is None:
+                        baseline = {'bytes': size, 'load': load}
+                    results.append({
+                        'table': table_name,
+                        'file': table_name + suffix,
+                        'rows': len(records),
+                        'bytes': size,
+                        'ratio': baseline['bytes'] / size,
+                        'parse': parse,
+                        'load': load,
+                        'speedup': baseline['load'] / load,
+                    })
+                    os.remove(path)
+    finally:
+        for bench_table in bench_tables:
+            database.execute_sql(f'DROP TABLE IF EXISTS "{bench_table}"')
+        database.close()
+
+    return results
+
+
+def parallel_job_counts(jobs):
+    """Число соединений для замера: 1, 2, 4 ... и jobs"""
+    counts = []
+    count = 1
+    while count < jobs:
+        counts.append(count)
+        count *= 2
+    counts.append(jobs)
+    return counts
+
+
+def benchmark_parallel_copy(config, db_config, tables=None, scale=DEFAULT_BENCHMARK_SCALE,
+                            jobs=DEFAULT_PARALLEL_BENCHMARK_JOBS, copy_format=COPY_FORMAT_TEXT):
+    """
+    Сравнивает загрузку масштабированной таблицы в одном соединении (COPY
+    прямо в таблицу) и через промежуточную таблицу в 1, 2, 4 ... jobs
+    соединений. Время загрузки в несколько соединений включает перенос
+    строк в таблицу (INSERT ... SELECT)
+    """
+    models_module = importlib.import_module(db_config['models_module'])
+    models = {get_table_name(model): model for model in models_module.get_models()}
+    dataset_path = get_dataset_path(db_config)
+    manifest, _ = load_valid_manifest(dataset_path)
+    entries = manifest['tables'] if manifest else {}
+
+    tables = tables or DEFAULT_COPY_BENCHMARK_TABLES.get(db_config['db_name'], list(models))
+
+    database = create_database_connection(db_config['db_name'], config)
+    database.connect()
+
+    results = []
+    bench_tables = []
+    try:
+        for table_name in tables:
+            model = models[table_name]
+            records = load_scaled_records(get_table_file(dataset_path, table_name), scale)
+            if not records:
+                continue
+
+            columns = get_copy_columns(model, records[0])
+            encoder = None
+            if copy_format == COPY_FORMAT_BINARY and supports_binary_copy(columns):
+                encoder = BinaryCopyEncoder(columns)
+            chunk_size = choose_chunk_size(entries.get(table_name))
+            bench_table = f"_bench_{table_name}_parallel"
+            bench_tables.append(bench_table)
+            database.execute_sql(f'DROP TABLE IF EXISTS "{bench_table}"')
+            database.execute_sql(f'CREATE TABLE "{bench_table}" (LIKE "{table_name}" INCLUDING DEFAULTS)')
+
+            # Одно соединение: COPY пакетами прямо в таблицу в одной транзакции
+            cursor = database.cursor()
+            started = time.perf_counter()
+            with database.atomic():
+                for chunk in iter_chunks(records, chunk_size):
+                    if encoder:
+                        copy_binary_chunk(cursor, model, encoder, chunk, table=bench_table)
+                    else:
+                        copy_text_chunk(cursor, model, columns, chunk, table=bench_table)
+            direct = time.perf_counter() - started
+            results.append({
+                'table': table_name, 'mode': '1 соединение, без промежуточной', 'rows': len(records),
+                'copy': direct, 'merge': None, 'wall': direct, 'speedup': 1.0,
+            })
+
+            for count in parallel_job_counts(jobs):
+                database.execute_sql(f'TRUNCATE "{bench_table}"')
+                loader = ParallelCopy(database, model, count, CancellationToken(), copy_format=copy_format,
+                                      table=bench_table, log=lambda message: None)
+                started = time.perf_counter()
+                try:
+                    loader.copy_to_staging(records, chunk_size)
+                    with database.atomic():
+                        loader.merge()
+                finally:
+                    loader.drop_staging()
+                wall = time.perf_counter() - started
+                results.append({
+                    'table': table_name, 'mode': f"{count} соед. через промежуточную", 'rows': len(records),
+                    'copy': loader.copy_duration, 'merge': loader.merge_duration, 'wall': wall,
+                    'speedup': direct / wall,
+                })
+    finally:
+        for bench_table in bench_tables:
+            database.execute_sql(f'DROP TABLE IF EXISTS "{bench_table}"')
+        database.close()
+
+    return results
+
+
+def startup_command(app=None):
+    """Команда запуска GUI для замера: собранное приложение или main.py"""
+    if app:
+        return [app, STARTUP_BENCHMARK_FLAG]
+    return [sys.executable, os.path.join(BASE_DIR, 'main.py'), STARTUP_BENCHMARK_FLAG]
+
+
+def benchmark_gui_startup(runs=10, app=None):
+    """
+    Запускает GUI runs раз и собирает тайминги запуска. Кроме таймингов,
+    которые сообщает само приложение (от начала main.py), измеряется время
+    от запуска процесса до первой отрисовки окна - с запуском интерпретатора
+    """
+    env = os.environ.copy()
+    if sys.platform.startswith('linux') and not env.get('DISPLAY') and not env.get('WAYLAND_DISPLAY'):
+        env.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+    command = startup_command(app)
+    results = []
+    for _ in range(runs):
+        spawned = time.time()
+        completed = subprocess.run(command, env=env, cwd=BASE_DIR, capture_output=True, text=True,
+                                   encoding='utf-8', errors='replace', timeout=STARTUP_TIMEOUT)
+        reports = [line for line in completed.stdout.splitlines() if line.startswith('{')]
+        if not reports:
+            raise RuntimeError(f"Приложение не сообщило тайминги запуска (код {completed.returncode}): "
+                               f"{completed.stderr.strip()[-500:]}")
+        result = json.loads(reports[-1])
+        result['process_to_paint_ms'] = (result['first_paint_wall'] - spawned) * 1000
+        results.append(result)
+    return results
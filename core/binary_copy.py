@@ -0,0 +1,183 @@
+"""
+Загрузка записей через COPY ... FROM STDIN (FORMAT binary).
+
+В текстовом формате сервер разбирает каждое число, дату и время из строки.
+В двоичном формате значения кодируются на клиенте по типам полей peewee
+модели (int4/int8, numeric, date, timestamp, bool, float, text), и сервер
+только копирует готовые представления. Строки пакета записываются в один
+переиспользуемый bytearray.
+"""
+
+import io
+import struct
+from datetime import date, datetime
+from decimal import Decimal
+
+from core.copy_loader import copy_sql
+
+BINARY_SIGNATURE = b'PGCOPY\n\xff\r\n\x00'
+BINARY_HEADER = BINARY_SIGNATURE + struct.pack('!ii', 0, 0)
+BINARY_TRAILER = struct.pack('!h', -1)
+
+# Эпоха PostgreSQL для date и timestamp
+PG_EPOCH_DATE = date(2000, 1, 1)
+PG_EPOCH_DATETIME = datetime(2000, 1, 1)
+
+NUMERIC_POS = 0x0000
+NUMERIC_NEG = 0x4000
+NUMERIC_NAN = 0xC000
+
+_int16 = struct.Struct('!h')
+_int32 = struct.Struct('!i')
+_length_int32 = struct.Struct('!ii')
+_length_int64 = struct.Struct('!iq')
+_length_float4 = struct.Struct('!if')
+_length_float8 = struct.Struct('!id')
+_numeric_header = struct.Struct('!hhhh')
+
+_NULL = _int32.pack(-1)
+_TRUE = _int32.pack(1) + b'\x01'
+_FALSE = _int32.pack(1) + b'\x00'
+
+
+def _encode_int2(value):
+    return _int32.pack(2) + _int16.pack(int(value))
+
+
+def _encode_int4(value):
+    return _length_int32.pack(4, int(value))
+
+
+def _encode_int8(value):
+    return _length_int64.pack(8, int(value))
+
+
+def _encode_float4(value):
+    return _length_float4.pack(4, float(value))
+
+
+def _encode_float8(value):
+    return _length_float8.pack(8, float(value))
+
+
+def _encode_bool(value):
+    return _TRUE if value else _FALSE
+
+
+def _encode_text(value):
+    data = str(value).encode('utf-8')
+    return _int32.pack(len(data)) + data
+
+
+def _encode_date(value):
+    if isinstance(value, datetime):
+        value = value.date()
+    elif not isinstance(value, date):
+        value = date.fromisoformat(str(value)[:10])
+    return _length_int32.pack(4, (value - PG_EPOCH_DATE).days)
+
+
+def _encode_timestamp(value):
+    if not isinstance(value, datetime):
+        value = datetime.fromisoformat(str(value)) if not isinstance(value, date) \
+            else datetime(value.year, value.month, value.day)
+    delta = value.replace(tzinfo=None) - PG_EPOCH_DATETIME
+    micros = (delta.days * 86400 + delta.seconds) * 1000000 + delta.microseconds
+    return _length_int64.pack(8, micros)
+
+
+def encode_numeric(value):
+    """
+    Кодирует число в двоичный формат numeric: цифры по основанию 10000,
+    вес первой группы, знак и число знаков после запятой.
+    """
+    number = value if isinstance(value, Decimal) else Decimal(str(value))
+    if number.is_nan():
+        return _numeric_header.pack(0, 0, NUMERIC_NAN, 0)
+
+    text = format(abs(number), 'f')
+    int_part, _, frac_part = text.partition('.')
+    dscale = len(frac_part)
+
+    # Выравниваем целую часть слева и дробную справа до групп по 4 цифры
+    int_part = int_part.lstrip('0')
+    int_part = int_part.zfill((len(int_part) + 3) // 4 * 4)
+    frac_part = frac_part.ljust((len(frac_part) + 3) // 4 * 4, '0')
+
+    groups = [int(int_part[i:i + 4]) for i in range(0, len(int_part), 4)]
+    weight = len(groups) - 1
+    groups += [int(frac_part[i:i + 4]) for i in range(0, len(frac_part), 4)]
+
+    # Ведущие и завершающие нулевые группы не хранятся
+    while groups and groups[0] == 0:
+        groups.pop(0)
+        weight -= 1
+    while groups and groups[-1] == 0:
+        groups.pop()
+
+    if not groups:
+        return _numeric_header.pack(0, 0, NUMERIC_POS, dscale)
+
+    sign = NUMERIC_NEG if number.is_signed() else NUMERIC_POS
+    return _numeric_header.pack(len(groups), weight, sign, dscale) + struct.pack(f'!{len(groups)}H', *groups)
+
+
+def _encode_numeric(value):
+    data = encode_numeric(value)
+    return _int32.pack(len(data)) + data
+
+
+# Тип поля peewee -> кодировщик значения (вместе с длиной)
+FIELD_ENCODERS = {
+    'AUTO': _encode_int4,
+    'INT': _encode_int4,
+    'SMALLINT': _encode_int2,
+    'BIGAUTO': _encode_int8,
+    'BIGINT': _encode_int8,
+    'FLOAT': _encode_float4,
+    'DOUBLE': _encode_float8,
+    'DECIMAL': _encode_numeric,
+    'DATE': _encode_date,
+    'DATETIME': _encode_timestamp,
+    'BOOL': _encode_bool,
+    'VARCHAR': _encode_text,
+    'CHAR': _encode_text,
+    'TEXT': _encode_text,
+}
+
+
+def supports_binary_copy(columns):
+    """Проверяет, что для всех колонок есть двоичный кодировщик"""
+    return all(column.field.field_type in FIELD_ENCODERS for column in columns)
+
+
+class BinaryCopyEncoder:
+    """Кодирует пакеты записей в двоичный формат COPY в общий буфер."""
+
+    def __init__(self, columns):
+        self.columns = columns
+        self.encoders = [FIELD_ENCODERS[column.field.field_type] for column in columns]
+        self.field_count = _int16.pack(len(columns))
+        self.buffer = bytearray()
+
+    def encode(self, records):
+        """Записывает пакет в буфер (предыдущее содержимое затирается)"""
+        buffer = self.buffer
+        del buffer[:]
+        buffer += BINARY_HEADER
+
+        pairs = list(zip(self.columns, self.encoders))
+        for record in records:
+            buffer += self.field_count
+            for column, encoder in pairs:
+                value = column.value(record)
+                buffer += _NULL if value is None else encoder(value)
+
+        buffer += BINARY_TRAILER
+        return buffer
+
+
+def copy_binary_chunk(cursor, model, encoder, records, table=None):
+    """Загружает пакет записей одной командой COPY в двоичном формате"""
+    buffer = io.BytesIO(encoder.encode(records))
+    cursor.copy_expert(copy_sql(model, encoder.columns, ' (FORMAT binary)', table=table), buffer)
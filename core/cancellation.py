@@ -0,0 +1,64 @@
+"""
+Отмена выполняющихся операций создания и очистки баз данных.
+"""
+
+import threading
+import time
+
+
+class OperationCancelled(Exception):
+    """Операция была отменена пользователем."""
+
+
+class CancellationToken:
+    """
+    Потокобезопасный флаг отмены.
+
+    Рабочий поток проверяет токен между пакетами записей, а инициатор
+    отмены (кнопка в GUI, Ctrl+C в CLI) вызывает cancel(). Токен также
+    хранит pid серверных процессов, чтобы их можно было прервать через
+    pg_cancel_backend.
+    """
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._backend_pids = set()
+        self.cancelled_at = None
+
+    def cancel(self):
+        """Устанавливает флаг отмены."""
+        with self._lock:
+            if self.cancelled_at is None:
+                self.cancelled_at = time.perf_counter()
+        self._event.set()
+
+    @property
+    def is_cancelled(self):
+        return self._event.is_set()
+
+    def raise_if_cancelled(self):
+        """Выбрасывает OperationCancelled, если операция отменена."""
+        if self._event.is_set():
+            raise OperationCancelled("Операция отменена пользователем")
+
+    def latency(self):
+        """Время в секундах с момента запроса отмены (или None)."""
+        if self.cancelled_at is None:
+            return None
+        return time.perf_counter() - self.cancelled_at
+
+    def register_backend(self, pid):
+        """Запоминает pid серверного процесса активного соединения."""
+        with self._lock:
+            self._backend_pids.add(pid)
+
+    def unregister_backend(self, pid):
+        """Забывает pid закрытого соединения."""
+        with self._lock:
+            self._backend_pids.discard(pid)
+
+    def backend_pids(self):
+        """Возвращает pid всех активных соединений."""
+        with self._lock:
+            return sorted(self._backend_pids)
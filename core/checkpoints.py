@@ -0,0 +1,106 @@
+"""
+Контрольные точки загрузки (режим --resume).
+
+Большие таблицы загружаются пакетами COPY, каждый пакет - в своей
+транзакции. В той же транзакции в служебной таблице _mock_load_progress
+сохраняется, сколько записей файла таблицы уже обработано, поэтому
+контрольная точка всегда соответствует данным в базе. Небольшие таблицы
+загружаются одной транзакцией и отмечаются целиком.
+
+Если загрузка прервалась (например, оборвалось соединение), запуск с
+--resume не пересоздает таблицы: загруженные таблицы пропускаются, а
+прерванная продолжается с записи после последнего пакета. Контрольные
+точки действительны только для того же набора данных и тех же настроек
+загрузки - иначе база пересоздается полностью.
+"""
+
+import hashlib
+
+LOAD_PROGRESS_TABLE = '_mock_load_progress'
+
+
+class TableCheckpoint:
+    """Прогресс загрузки таблицы: обработано записей, добавлено, ошибок."""
+
+    def __init__(self, table_name, done=0, inserted=0, errors=0, completed=False):
+        self.table_name = table_name
+        self.done = done
+        self.inserted = inserted
+        self.errors = errors
+        self.completed = completed
+
+
+class LoadCheckpoints:
+    """Контрольные точки загрузки базы с отпечатком набора данных."""
+
+    def __init__(self, database, fingerprint, tables=None):
+        self.database = database
+        self.fingerprint = fingerprint
+        self.tables = tables or {}
+
+    def get(self, table_name):
+        """Контрольная точка таблицы (пустая, если таблица не загружалась)"""
+        return self.tables.get(table_name) or TableCheckpoint(table_name)
+
+    def save(self, table_name, done, inserted, errors, completed=False):
+        """Сохраняет прогресс таблицы (в текущей транзакции)"""
+        self.database.execute_sql(f'''
+            INSERT INTO "{LOAD_PROGRESS_TABLE}" (table_name, fingerprint, done, inserted, errors, completed)
+            VALUES (%s, %s, %s, %s, %s, %s)
+            ON CONFLICT (table_name) DO UPDATE SET
+                fingerprint = EXCLUDED.fingerprint, done = EXCLUDED.done, inserted = EXCLUDED.inserted,
+                errors = EXCLUDED.errors, completed = EXCLUDED.completed
+        ''', (table_name, self.fingerprint, done, inserted, errors, completed))
+        self.tables[table_name] = TableCheckpoint(table_name, done, inserted, errors, completed)
+
+
+def load_fingerprint(dataset_fingerprint, layout, validation):
+    """
+    Отпечаток загрузки: данные набора и настройки, от которых зависит
+    содержимое таблиц (раскладка и отбор записей проверкой)
+    """
+    payload = f"{dataset_fingerprint}|{layout}|{validation or ''}"
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+CHECKPOINT_STORE_DDL = f'''CREATE TABLE IF NOT EXISTS "{LOAD_PROGRESS_TABLE}" (
+            table_name TEXT PRIMARY KEY,
+            fingerprint TEXT NOT NULL,
+            done BIGINT NOT NULL,
+            inserted BIGINT NOT NULL,
+            errors BIGINT NOT NULL,
+            completed BOOLEAN NOT NULL
+        )'''
+CHECKPOINT_STORE_DROP_SQL = f'DROP TABLE IF EXISTS "{LOAD_PROGRESS_TABLE}"'
+
+
+def ensure_checkpoint_store(database):
+    """Создает служебную таблицу контрольных точек, если ее нет"""
+    database.execute_sql(CHECKPOINT_STORE_DDL)
+
+
+def drop_checkpoint_store(database):
+    """Удаляет служебную таблицу контрольных точек"""
+    database.execute_sql(CHECKPOINT_STORE_DROP_SQL)
+
+
+def read_checkpoints(database, fingerprint):
+    """
+    Сохраненные контрольные точки: (LoadCheckpoints, устарели ли).
+    Если контрольных точек нет или они от другого набора данных - (None, ...)
+    """
+    if not database.table_exists(LOAD_PROGRESS_TABLE):
+        return None, False
+
+    cursor = database.execute_sql(
+        f'SELECT table_name, fingerprint, done, inserted, errors, completed FROM "{LOAD_PROGRESS_TABLE}"'
+    )
+    rows = cursor.fetchall()
+    if not rows:
+        return None, False
+    if any(row[1] != fingerprint for row in rows):
+        return None, True
+
+    tables = {name: TableCheckpoint(name, done, inserted, errors, completed)
+              for name, _, done, inserted, errors, completed in rows}
+    return LoadCheckpoints(database, fingerprint, tables), False
@@ -2,8 +2,6 @@ import json
 import os
 import sys
 
-from peewee import PostgresqlDatabase
-
 
 def get_base_dir():
     """Получить базовую директорию, работающую в PyInstaller и при разработке"""
@@ -28,6 +26,8 @@ CONFIG_DIR = os.path.join(BASE_DIR, 'config')
 MODELS_DIR = os.path.join(BASE_DIR, 'models')
 MOCK_DATA_DIR = os.path.join(BASE_DIR, 'mock_data')
 RESOURCES_DIR = os.path.join(BASE_DIR, 'resources')
+DUMPS_DIR = os.path.join(BASE_DIR, 'dumps')
+CACHE_DIR = os.path.join(BASE_DIR, 'cache')
 POSTGRES_CONFIG_PATH = os.path.join(CONFIG_DIR, 'postgres.json')
 
 # Глобальная переменная для хранения конфигурации
@@ -137,6 +137,10 @@ def create_database_connection(db_name, config=None):
         config: Опционально - конфигурация подключения.
                 Если не указана, будет загружена автоматически.
     """
+    # peewee (и psycopg2) импортируются при первом подключении: модуль
+    # настроек загружается при старте GUI, до первой отрисовки окна
+    from peewee import PostgresqlDatabase
+
     if config is None:
         config = get_postgres_config()
 
@@ -0,0 +1,114 @@
+"""
+Загрузка записей через COPY ... FROM STDIN (текстовый формат).
+
+Записи из JSON сопоставляются с полями peewee модели так же, как это
+делает Model.create(**record): ключ записи - имя поля или имя колонки
+внешнего ключа (airline_id для поля airline). Отсутствующие в записи поля
+получают значение по умолчанию из модели.
+"""
+
+import io
+from datetime import date, datetime
+
+from peewee import AutoField
+
+COPY_FORMAT_TEXT = 'text'
+COPY_FORMAT_BINARY = 'binary'
+COPY_FORMATS = (COPY_FORMAT_TEXT, COPY_FORMAT_BINARY)
+
+
+class CopyColumn:
+    """Колонка таблицы и способ получить ее значение из записи."""
+
+    def __init__(self, field):
+        self.field = field
+        self.name = field.column_name
+        self.keys = [field.name]
+        object_id_name = getattr(field, 'object_id_name', None)
+        if object_id_name and object_id_name not in self.keys:
+            self.keys.append(object_id_name)
+        if field.column_name not in self.keys:
+            self.keys.append(field.column_name)
+
+    def value(self, record):
+        """Значение колонки для записи (или значение по умолчанию)"""
+        for key in self.keys:
+            if key in record:
+                return record[key]
+
+        default = self.field.default
+        return default() if callable(default) else default
+
+
+def get_copy_columns(model, sample_record):
+    """
+    Колонки для COPY. Автоинкрементный первичный ключ копируется, только если
+    он есть в записях - иначе значения берутся из последовательности.
+    """
+    columns = []
+    for field in model._meta.sorted_fields:
+        column = CopyColumn(field)
+        if isinstance(field, AutoField) and not any(key in sample_record for key in column.keys):
+            continue
+        columns.append(column)
+    return columns
+
+
+def encode_text_value(value):
+    """Кодирует значение в текстовый формат COPY"""
+    if value is None:
+        return '\\N'
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if not isinstance(value, str):
+        return str(value)
+    return (value.replace('\\', '\\\\')
+            .replace('\t', '\\t')
+            .replace('\n', '\\n')
+            .replace('\r', '\\r'))
+
+
+def encode_text_rows(columns, records):
+    """Формирует буфер текстового COPY для пакета записей"""
+    lines = []
+    for record in records:
+        lines.append('\t'.join(encode_text_value(column.value(record)) for column in columns))
+    lines.append('')
+    return '\n'.join(lines)
+
+
+def copy_sql(model, columns, options='', table=None):
+    """Формирует команду COPY ... FROM STDIN (по умолчанию в таблицу модели)"""
+    column_list = ', '.join(f'"{column.name}"' for column in columns)
+    return f'COPY "{table or model._meta.table_name}" ({column_list}) FROM STDIN{options}'
+
+
+def copy_text_chunk(cursor, model, columns, records, table=None):
+    """Загружает пакет записей одной командой COPY"""
+    buffer = io.StringIO(encode_text_rows(columns, records))
+    cursor.copy_expert(copy_sql(model, columns, table=table), buffer)
+
+
+def reset_sequence(database, model, columns):
+    """
+    Сдвигает последовательность первичного ключа после загрузки явных id,
+    иначе следующие INSERT без id получат занятые значения.
+    """
+    pk = model._meta.primary_key
+    if not isinstance(pk, AutoField) or pk.column_name not in [column.name for column in columns]:
+        return
+
+    reset_serial_sequence(database, model._meta.table_name, pk.column_name)
+
+
+def serial_sequence_sql(table, column):
+    """Запрос, устанавливающий последовательность колонки на максимальное значение в таблице"""
+    return (f"SELECT setval(pg_get_serial_sequence('\"{table}\"', '{column}'), "
+            f"COALESCE(MAX(\"{column}\"), 1), MAX(\"{column}\") IS NOT NULL) FROM \"{table}\"")
+
+
+def reset_serial_sequence(database, table, column):
+    """Устанавливает последовательность колонки на максимальное значение в таблице"""
+    database.execute_sql(serial_sequence_sql(table, column))
@@ -1,21 +1,118 @@
 import importlib
-import json
+import itertools
 import os
+import shutil
+import threading
+import time
 import traceback
+from contextlib import contextmanager
 from datetime import datetime
 
 import psycopg2
-from peewee import PostgresqlDatabase
+from peewee import AutoField, IntegrityError, PostgresqlDatabase
 from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
 
-from core.config_manager import MOCK_DATA_DIR, DATABASES_CONFIG
+from core.benchmarks import format_benchmark_table
+from core.cancellation import CancellationToken, OperationCancelled
+from core.checkpoints import LoadCheckpoints, load_fingerprint, read_checkpoints
+from core.config_manager import DATABASES_CONFIG, create_database_connection
+from core.binary_copy import BinaryCopyEncoder, copy_binary_chunk, supports_binary_copy
+from core.copy_loader import (
+    get_copy_columns, copy_text_chunk, reset_sequence, reset_serial_sequence, COPY_FORMAT_TEXT, COPY_FORMAT_BINARY
+)
+from core.dumps import (
+    get_dump_path, choose_dump_format, find_pg_tool, pg_tool_command, pg_tool_env, run_pg_tool,
+    dataset_fingerprint, get_dump_tables, count_rows, export_copy_tables, build_dump_manifest,
+    save_dump_manifest, load_dump_manifest, restore_copy_tables, DEFAULT_RESTORE_JOBS,
+    FORMAT_DIRECTORY, DIRECTORY_DATA, SYNC_STORE_COLUMNS
+)
+from core.events import (
+    EventBus, ProgressThrottle, LogMessage, PhaseStarted, PhaseFinished,
+    TableStarted, TableProgress, TableFinished, CancelCompleted, print_log_event,
+    PHASE_CREATE, PHASE_CLEAN, PHASE_DROP, PHASE_DDL, PHASE_LOAD, PHASE_STATS, PHASE_SYNC,
+    PHASE_EXPORT, PHASE_RESTORE, PHASE_INDEXES, PHASE_MAINTENANCE, PHASE_VALIDATE, PHASE_RELOAD,
+    PHASE_VERIFY, MaintenanceStep
+)
+from core.index_profiles import get_index_profiles, apply_index_profile, detect_profile
+from core.maintenance import (
+    run_parallel, vacuum_analyze, analyze_table, enable_pg_prewarm, prewarm_table, read_table,
+    STEP_VACUUM, STEP_ANALYZE, STEP_PREWARM
+)
+from core.manifest import (
+    load_valid_manifest, save_manifest, build_table_entry, get_table_dependencies,
+    get_dependent_tables, choose_strategy, choose_chunk_size, file_sha256, STRATEGY_COPY
+)
+from core.mock_data import (
+    get_dataset_path, get_table_file, split_table_file, get_compression, iter_records, iter_chunks
+)
+from core.validation import validate_dataset, iter_filtered_records, ValidationFailed, VALIDATION_FAIL
+from core.templates import (
+    get_template_name, get_template_fingerprint, drop_template, mark_template, recreate_database, template_lock
+)
+from core.parallel_copy import ParallelCopy, DEFAULT_COPY_JOBS
+from core.partitioning import (
+    get_partitioning, get_date_span, create_month_partitions,
+    get_leaf_partitions, get_partitioned_tables, find_dangling_references, LAYOUT_PLAIN, LAYOUT_PARTITIONED
+)
+from core.provisioning import (
+    ProvisioningPool, create_pool_server, pool_fingerprint,
+    DEFAULT_POOL_SIZE, DEFAULT_SERVE_HOST, DEFAULT_SERVE_PORT, DEFAULT_LEASE_TTL
+)
+from core.schema_ddl import get_create_ddl, get_drop_ddl, execute_batch, model_definition_hash
+from core.verification import (
+    get_verify_columns, source_content_hash, manifest_content_hash, verify_table, ContentHash,
+    SOURCE_MANIFEST, SOURCE_DATA, VERIFY_TABLE_HEADERS
+)
+from core.sync import (
+    ensure_sync_store, compute_table_diff, apply_upserts, apply_deletes,
+    save_table_diff_state, record_baseline, get_stored_file_hash, clear_table_state, LoadBaseline
+)
+from core.watcher import create_watcher, wait_for_changes, DEFAULT_DEBOUNCE
 
 
 class DatabaseManager:
-    def __init__(self, config):
-        """Инициализация с конфигом (словарем)."""
+    def __init__(self, config, event_bus=None, cancel_token=None, copy_format=COPY_FORMAT_TEXT,
+                 index_profile=None, maintenance=None, layout=LAYOUT_PLAIN, validation=None, resume=False,
+                 verify=False, copy_jobs=DEFAULT_COPY_JOBS):
+        """
+        Инициализация с конфигом (словарем).
+
+        Args:
+            config: Настройки подключения к PostgreSQL
+            event_bus: Шина событий для вывода и прогресса.
+                       Если не указана, сообщения печатаются в stdout.
+            cancel_token: Токен отмены операции (создается автоматически)
+            copy_format: Формат COPY для больших таблиц: text или binary
+            index_profile: Профиль вторичных индексов (по умолчанию - индексы моделей)
+            maintenance: Настройки обслуживания после загрузки (MaintenanceSettings)
+            layout: Раскладка таблиц: plain или partitioned (секции по месяцам)
+            validation: Проверка данных до загрузки: fail - не создавать базу при
+                        ошибках, filter - загружать только корректные записи
+            resume: Продолжить прерванную загрузку с контрольных точек
+                    вместо пересоздания таблиц
+            verify: Проверить содержимое таблиц по хешу после загрузки
+            copy_jobs: Число соединений, в которые загружается каждая большая
+                       таблица (COPY через промежуточную таблицу)
+        """
         self.config = config
+        self.copy_format = copy_format
+        self.index_profile = index_profile
+        self.maintenance = maintenance
+        self.layout = layout
+        self.validation = validation
+        self.resume = resume
+        self.verify = verify
+        self.copy_jobs = max(1, copy_jobs or 1)
         self.created_databases = []
+        # Средний размер записи таблиц для оценки объема в прогрессе: {(база, таблица): байт}
+        self._record_bytes = {}
+        self.cancel_token = cancel_token or CancellationToken()
+
+        if event_bus is None:
+            event_bus = EventBus()
+            event_bus.subscribe(print_log_event, (LogMessage,))
+        self.events = event_bus
+        self.progress = ProgressThrottle(self.events)
 
         # Используем конфиг для подключения к postgres
         self.db = PostgresqlDatabase(
@@ -26,61 +123,336 @@ class DatabaseManager:
             port=self.config.get('port', 5432)
         )
 
+    # ==================== СОБЫТИЯ ====================
+
+    def _log(self, message=''):
+        """Публикует текстовое сообщение в шину событий"""
+        self.events.publish(LogMessage(text=str(message)))
+
+    @contextmanager
+    def _phase(self, database, phase):
+        """
+        Публикует начало и окончание фазы операции.
+        Фаза считается неуспешной при исключении или если outcome['success'] = False.
+        """
+        outcome = {'success': True}
+        self.events.publish(PhaseStarted(database=database, phase=phase))
+        started = time.perf_counter()
+        try:
+            yield outcome
+        except BaseException:
+            outcome['success'] = False
+            raise
+        finally:
+            self.events.publish(PhaseFinished(
+                database=database,
+                phase=phase,
+                duration=time.perf_counter() - started,
+                success=outcome['success']
+            ))
+
+    # ==================== ОТМЕНА ОПЕРАЦИЙ ====================
+
+    def cancel(self):
+        """
+        Отменяет выполняющуюся операцию. Безопасно вызывать из другого потока.
+        Рабочий поток остановится на ближайшей проверке токена, а текущие
+        запросы на сервере прерываются через pg_cancel_backend.
+        """
+        if self.cancel_token.is_cancelled:
+            return
+
+        self._log("⛔ Запрошена отмена операции...")
+        self.cancel_token.cancel()
+        self._cancel_backends()
+
+    def _cancel_backends(self):
+        """Прерывает запросы активных соединений на сервере"""
+        pids = self.cancel_token.backend_pids()
+        if not pids:
+            return
+
+        try:
+            conn = self._connect_admin()
+            cursor = conn.cursor()
+            cursor.execute("SELECT pg_cancel_backend(pid) FROM unnest(%s::int[]) AS pid", (pids,))
+            cursor.close()
+            conn.close()
+            self._log(f"⛔ Отправлен pg_cancel_backend для процессов: {', '.join(map(str, pids))}")
+        except Exception as e:
+            self._log(f"⚠️ Не удалось прервать запросы на сервере: {e}")
+
+    def _register_backend(self, database):
+        """Запоминает pid серверного процесса соединения для отмены"""
+        pid = database.connection().get_backend_pid()
+        self.cancel_token.register_backend(pid)
+        return pid
+
+    @staticmethod
+    @contextmanager
+    def _retarget(database, db_name):
+        """
+        Временно подключает базу peewee моделей набора к другой базе сервера
+        (например, к шаблону <база>__template): модели загружают данные туда
+        """
+        source = database.database
+        if db_name == source:
+            yield
+            return
+        database.init(db_name)
+        try:
+            yield
+        finally:
+            database.init(source)
+
+    def _finish_cancelled(self, database, models, db_name):
+        """Приводит базу в чистое состояние после отмены"""
+        self._log(f"⛔ Создание базы {db_name} отменено, удаляем частично загруженные таблицы...")
+
+        try:
+            if database.in_transaction():
+                database.rollback()
+            self._drop_database_tables(database, models)
+        except Exception as e:
+            self._log(f"⚠️ Не удалось очистить базу после отмены: {e}")
+
+        latency = self.cancel_token.latency() or 0.0
+        self.events.publish(CancelCompleted(database=db_name, latency=latency))
+        self._log(f"⏱️ Отмена завершена за {latency * 1000:.0f} мс")
+
     # ==================== ОСНОВНЫЕ ПУБЛИЧНЫЕ МЕТОДЫ ====================
 
     def create_databases(self, databases_list):
         """Создает несколько выбранных баз данных"""
-        print(f"🎓 СОЗДАНИЕ ВЫБРАННЫХ БАЗ ДАННЫХ")
-        print("=" * 60)
-        print(f"📡 Подключение к: {self.config['host']}:{self.config['port']}")
-        print(f"👤 Пользователь: {self.config['user']}")
-        print(f"📋 Выбрано баз: {len(databases_list)}")
-        print("=" * 60)
+        self._log(f"🎓 СОЗДАНИЕ ВЫБРАННЫХ БАЗ ДАННЫХ")
+        self._log("=" * 60)
+        self._log(f"📡 Подключение к: {self.config['host']}:{self.config['port']}")
+        self._log(f"👤 Пользователь: {self.config['user']}")
+        self._log(f"📋 Выбрано баз: {len(databases_list)}")
+        self._log("=" * 60)
 
         success_count = 0
 
         for db_name in databases_list:
+            if self.cancel_token.is_cancelled:
+                self._log("⛔ Операция отменена, оставшиеся базы пропущены")
+                break
+
             if db_name in DATABASES_CONFIG:
                 if self._create_single_database(db_name, DATABASES_CONFIG[db_name]):
                     success_count += 1
             else:
-                print(f"❌ База данных '{db_name}' не найдена в конфигурации")
+                self._log(f"❌ База данных '{db_name}' не найдена в конфигурации")
 
         self._show_create_summary(success_count, databases_list)
         return success_count
 
     def clean_databases(self, databases_list):
         """Очищает выбранные базы данных"""
-        print(f"🧹 ОЧИСТКА ВЫБРАННЫХ БАЗ ДАННЫХ")
-        print("=" * 60)
-        print(f"📋 Выбрано баз для очистки: {len(databases_list)}")
-        print("=" * 60)
+        self._log(f"🧹 ОЧИСТКА ВЫБРАННЫХ БАЗ ДАННЫХ")
+        self._log("=" * 60)
+        self._log(f"📋 Выбрано баз для очистки: {len(databases_list)}")
+        self._log("=" * 60)
 
         success_count = 0
 
         for db_name in databases_list:
+            if self.cancel_token.is_cancelled:
+                self._log("⛔ Операция отменена, оставшиеся базы пропущены")
+                break
+
             if db_name in DATABASES_CONFIG:
                 if self._clean_single_database(db_name, DATABASES_CONFIG[db_name]):
                     success_count += 1
             else:
-                print(f"❌ База данных '{db_name}' не найдена в конфигурации")
+                self._log(f"❌ База данных '{db_name}' не найдена в конфигурации")
 
-        print(f"\n{'=' * 60}")
-        print(f"🧹 Очищено баз: {success_count} из {len(databases_list)}")
-        print(f"{'=' * 60}\n")
+        self._log(f"\n{'=' * 60}")
+        self._log(f"🧹 Очищено баз: {success_count} из {len(databases_list)}")
+        self._log(f"{'=' * 60}\n")
 
         return success_count
 
+    def sync_databases(self, databases_list):
+        """Синхронизирует выбранные базы с моковыми данными (только изменения)"""
+        self._log(f"🔄 СИНХРОНИЗАЦИЯ ВЫБРАННЫХ БАЗ ДАННЫХ")
+        self._log("=" * 60)
+        self._log(f"📋 Выбрано баз для синхронизации: {len(databases_list)}")
+        self._log("=" * 60)
+
+        success_count = 0
+
+        for db_name in databases_list:
+            if self.cancel_token.is_cancelled:
+                self._log("⛔ Операция отменена, оставшиеся базы пропущены")
+                break
+
+            if db_name in DATABASES_CONFIG:
+                if self._sync_single_database(db_name, DATABASES_CONFIG[db_name]):
+                    success_count += 1
+            else:
+                self._log(f"❌ База данных '{db_name}' не найдена в конфигурации")
+
+        self._log(f"\n{'=' * 60}")
+        self._log(f"🔄 Синхронизировано баз: {success_count} из {len(databases_list)}")
+        self._log(f"{'=' * 60}\n")
+
+        return success_count
+
+    def export_dumps(self, databases_list, dump_format=None, jobs=None):
+        """Сохраняет собранные базы как артефакты дампов"""
+        self._log(f"📦 ЭКСПОРТ ДАМПОВ БАЗ ДАННЫХ")
+        self._log("=" * 60)
+        self._log(f"📋 Выбрано баз: {len(databases_list)}")
+        self._log("=" * 60)
+
+        success_count = 0
+
+        for db_name in databases_list:
+            if self.cancel_token.is_cancelled:
+                self._log("⛔ Операция отменена, оставшиеся базы пропущены")
+                break
+
+            if db_name in DATABASES_CONFIG:
+                if self._export_single_dump(db_name, DATABASES_CONFIG[db_name], dump_format, jobs):
+                    success_count += 1
+            else:
+                self._log(f"❌ База данных '{db_name}' не найдена в конфигурации")
+
+        self._log(f"\n{'=' * 60}")
+        self._log(f"📦 Экспортировано дампов: {success_count} из {len(databases_list)}")
+        self._log(f"{'=' * 60}\n")
+
+        return success_count
+
+    def restore_databases(self, databases_list, jobs=None, use_template=False):
+        """Создает базы из артефактов дампов (параллельное восстановление)"""
+        self._log(f"🎓 СОЗДАНИЕ БАЗ ДАННЫХ ИЗ ДАМПОВ")
+        self._log("=" * 60)
+        self._log(f"📡 Подключение к: {self.config['host']}:{self.config['port']}")
+        self._log(f"👤 Пользователь: {self.config['user']}")
+        self._log(f"📋 Выбрано баз: {len(databases_list)}")
+        self._log("=" * 60)
+
+        success_count = 0
+
+        for db_name in databases_list:
+            if self.cancel_token.is_cancelled:
+                self._log("⛔ Операция отменена, оставшиеся базы пропущены")
+                break
+
+            if db_name in DATABASES_CONFIG:
+                if self._restore_single_database(db_name, DATABASES_CONFIG[db_name], jobs, use_template):
+                    success_count += 1
+            else:
+                self._log(f"❌ База данных '{db_name}' не найдена в конфигурации")
+
+        self._show_create_summary(success_count, databases_list)
+        return success_count
+
+    def switch_index_profiles(self, databases_list, profile):
+        """Переключает профиль индексов существующих баз без перезагрузки данных"""
+        self._log(f"🗂️ ПЕРЕКЛЮЧЕНИЕ ПРОФИЛЯ ИНДЕКСОВ: {profile}")
+        self._log("=" * 60)
+
+        success_count = 0
+
+        for db_name in databases_list:
+            if self.cancel_token.is_cancelled:
+                self._log("⛔ Операция отменена, оставшиеся базы пропущены")
+                break
+
+            if db_name not in DATABASES_CONFIG:
+                self._log(f"❌ База данных '{db_name}' не найдена в конфигурации")
+                continue
+
+            db_config = DATABASES_CONFIG[db_name]
+            with self._phase(db_config['db_name'], PHASE_INDEXES) as outcome:
+                outcome['success'] = self._switch_single_index_profile(db_name, db_config, profile)
+            if outcome['success']:
+                success_count += 1
+
+        self._log(f"\n{'=' * 60}")
+        self._log(f"🗂️ Профиль переключен: {success_count} из {len(databases_list)} баз")
+        self._log(f"{'=' * 60}\n")
+
+        return success_count
+
+    def watch_database(self, db_name, debounce=DEFAULT_DEBOUNCE, polling=False):
+        """
+        Следит за моковыми данными базы и перезагружает измененные таблицы
+        до отмены операции (Ctrl+C)
+        """
+        if db_name not in DATABASES_CONFIG:
+            self._log(f"❌ База данных '{db_name}' не найдена в конфигурации")
+            return False
+        return self._watch_single_database(db_name, DATABASES_CONFIG[db_name], debounce, polling)
+
+    def serve_pool(self, databases_list, size=DEFAULT_POOL_SIZE, host=DEFAULT_SERVE_HOST, port=DEFAULT_SERVE_PORT,
+                   lease_ttl=DEFAULT_LEASE_TTL):
+        """
+        Держит пул готовых копий баз и выдает их по HTTP до отмены
+        операции (Ctrl+C)
+        """
+        unknown = [db_name for db_name in databases_list if db_name not in DATABASES_CONFIG]
+        if unknown:
+            self._log(f"❌ Базы данных не найдены в конфигурации: {', '.join(unknown)}")
+            return False
+        return self._serve_pool(databases_list, size, host, port, lease_ttl)
+
+    def verify_databases(self, databases_list):
+        """Сверяет содержимое таблиц существующих баз с моковыми данными по хешу"""
+        self._log(f"🔎 ПРОВЕРКА СОДЕРЖИМОГО БАЗ ДАННЫХ")
+        self._log("=" * 60)
+        self._log(f"📋 Выбрано баз для проверки: {len(databases_list)}")
+        self._log("=" * 60)
+
+        success_count = 0
+
+        for db_name in databases_list:
+            if self.cancel_token.is_cancelled:
+                self._log("⛔ Операция отменена, оставшиеся базы пропущены")
+                break
+
+            if db_name in DATABASES_CONFIG:
+                if self._verify_single_database(db_name, DATABASES_CONFIG[db_name]):
+                    success_count += 1
+            else:
+                self._log(f"❌ База данных '{db_name}' не найдена в конфигурации")
+
+        self._log(f"\n{'=' * 60}")
+        self._log(f"🔎 Совпадают с данными: {success_count} из {len(databases_list)} баз")
+        self._log(f"{'=' * 60}\n")
+
+        return success_count
+
+    def build_templates(self, databases_list):
+        """
+        Собирает шаблоны баз (<база>__template) для копирования. Актуальные
+        шаблоны не пересобираются
+        """
+        for db_name in databases_list:
+            if db_name not in DATABASES_CONFIG:
+                self._log(f"❌ База данных '{db_name}' не найдена в конфигурации")
+                return False
+            if not self._build_template(db_name, DATABASES_CONFIG[db_name]):
+                return False
+        return True
+
     def create_all_databases(self):
         """Создает все базы данных из конфигурации"""
-        print("🎓 ЗАПУСК СОЗДАНИЯ УЧЕБНЫХ БАЗ ДАННЫХ PostgreSQL")
-        print("=" * 60)
-        print(f"📡 Подключение к: {self.config['host']}:{self.config['port']}")
-        print(f"👤 Пользователь: {self.config['user']}")
-        print("=" * 60)
+        self._log("🎓 ЗАПУСК СОЗДАНИЯ УЧЕБНЫХ БАЗ ДАННЫХ PostgreSQL")
+        self._log("=" * 60)
+        self._log(f"📡 Подключение к: {self.config['host']}:{self.config['port']}")
+        self._log(f"👤 Пользователь: {self.config['user']}")
+        self._log("=" * 60)
 
         success_count = 0
         for db_name, db_config in DATABASES_CONFIG.items():
+            if self.cancel_token.is_cancelled:
+                self._log("⛔ Операция отменена, оставшиеся базы пропущены")
+                break
+
             if self._create_single_database(db_name, db_config):
                 success_count += 1
 
@@ -89,16 +461,36 @@ class DatabaseManager:
 
     # ==================== МЕТОДЫ СОЗДАНИЯ БАЗ ДАННЫХ ====================
 
-    def _create_single_database(self, db_name, db_config):
-        """Создает одну базу данных с таблицами и данными"""
-        print(f"\n{'=' * 50}")
-        print(f"Создание базы данных: {db_config['description']}")
-        print(f"Имя базы: {db_config['db_name']}")
-        print(f"{'=' * 50}")
+    def _create_single_database(self, db_name, db_config, target=None):
+        """
+        Создает одну базу данных с таблицами и данными. С target набор
+        загружается в базу с этим именем (например, в шаблон), а база
+        набора не затрагивается
+        """
+        target = target or db_config['db_name']
+        models_module = importlib.import_module(db_config['models_module'])
+        with self._phase(target, PHASE_CREATE) as outcome, self._retarget(models_module.get_database(), target):
+            outcome['success'] = self._create_single_database_impl(db_name, db_config, target)
+            return outcome['success']
+
+    def _create_single_database_impl(self, db_name, db_config, target):
+        """Выполняет шаги создания базы данных target"""
+        self._log(f"\n{'=' * 50}")
+        self._log(f"Создание базы данных: {db_config['description']}")
+        self._log(f"Имя базы: {target}")
+        self._log(f"{'=' * 50}")
 
         try:
+            # Данные проверяются до обращения к серверу
+            rejected = {}
+            if self.validation:
+                with self._phase(target, PHASE_VALIDATE) as outcome:
+                    outcome['success'], rejected = self._validate_dataset(db_config)
+                if not outcome['success']:
+                    return False
+
             # Создаем базу данных если она не существует
-            if not self._create_database_if_not_exists(db_config['db_name']):
+            if not self._create_database_if_not_exists(target):
                 return False
 
             # Импортируем модели для этой БД
@@ -106,36 +498,91 @@ class DatabaseManager:
             database = models_module.get_database()
             models = models_module.get_models()
 
+            if self.index_profile and self.index_profile not in get_index_profiles(models_module):
+                self._log(f"❌ Профиль индексов '{self.index_profile}' не объявлен для базы {db_name}")
+                return False
+
             # Подключаемся к базе данных
-            print("🔗 Подключение к базе данных...")
+            self._log("🔗 Подключение к базе данных...")
             database.connect()
-            print("✅ Подключение к базе данных установлено")
-
-            # Очищаем и создаем таблицы
-            if not self._drop_database_tables(database, models):
-                print("⚠️ Продолжаем без очистки таблиц")
-
-            if not self._create_database_tables(database, models):
-                print("❌ Не удалось создать таблицы, пропускаем базу")
-                database.close()
-                return False
+            backend_pid = self._register_backend(database)
+            self._log("✅ Подключение к базе данных установлено")
+
+            # Прерванная загрузка продолжается без пересоздания таблиц
+            fingerprint = load_fingerprint(dataset_fingerprint(db_config, models), self.layout, self.validation)
+            checkpoints = self._read_checkpoints(database, fingerprint) if self.resume else None
+
+            if checkpoints is None:
+                # Очищаем и создаем таблицы
+                self.cancel_token.raise_if_cancelled()
+                with self._phase(target, PHASE_DROP) as outcome:
+                    outcome['success'] = self._drop_database_tables(database, models)
+                if not outcome['success']:
+                    self._log("⚠️ Продолжаем без очистки таблиц")
+
+                with self._phase(target, PHASE_DDL) as outcome:
+                    outcome['success'] = self._create_database_tables(database, models,
+                                                                      self._get_layout_partitioning(models_module))
+                if not outcome['success']:
+                    self._log("❌ Не удалось создать таблицы, пропускаем базу")
+                    self.cancel_token.unregister_backend(backend_pid)
+                    database.close()
+                    return False
+                checkpoints = LoadCheckpoints(database, fingerprint)
 
             # Загружаем моковые данные
-            self._load_mock_data_smart(db_config, models_module, database)
+            self.cancel_token.raise_if_cancelled()
+            with self._phase(target, PHASE_LOAD):
+                self._load_mock_data_smart(db_config, models_module, database, checkpoints, rejected)
+            self._check_dangling_references(database, models_module)
+
+            # Вторичные индексы профиля строятся по загруженным данным
+            if self.index_profile:
+                self.cancel_token.raise_if_cancelled()
+                with self._phase(target, PHASE_INDEXES):
+                    self._apply_index_profile(database, models_module, self.index_profile)
+
+            # VACUUM и прогрев - после построения всех индексов
+            if self.maintenance and self.maintenance.enabled:
+                self.cancel_token.raise_if_cancelled()
+                with self._phase(target, PHASE_MAINTENANCE):
+                    self._run_maintenance(target, database, models)
 
             # Показываем статистику
-            self._show_database_stats(models_module)
+            with self._phase(target, PHASE_STATS):
+                self._show_database_stats(models_module)
+
+            # Содержимое таблиц сверяется с моковыми данными по хешу
+            if self.verify:
+                self.cancel_token.raise_if_cancelled()
+                with self._phase(target, PHASE_VERIFY) as outcome:
+                    outcome['success'] = self._verify_database_content(db_config, models_module, database,
+                                                                       rejected)
+                if not outcome['success']:
+                    self.cancel_token.unregister_backend(backend_pid)
+                    database.close()
+                    return False
 
             # Закрываем соединение
+            self.cancel_token.unregister_backend(backend_pid)
             database.close()
-            print("✅ Соединение с базой данных закрыто")
+            self._log("✅ Соединение с базой данных закрыто")
 
-            self.created_databases.append(db_config['db_name'])
+            self.created_databases.append(target)
             return True
 
+        except OperationCancelled:
+            self._finish_cancelled(database, models, target)
+            self.cancel_token.unregister_backend(backend_pid)
+            database.close()
+            return False
+
         except Exception as e:
-            print(f"❌ Ошибка при создании базы {db_name}: {e}")
-            traceback.print_exc()
+            self._log(f"❌ Ошибка при создании базы {db_name}: {e}")
+            self._log(traceback.format_exc())
+
+            if 'backend_pid' in locals():
+                self.cancel_token.unregister_backend(backend_pid)
 
             # Пытаемся закрыть соединение в случае ошибки
             try:
@@ -145,18 +592,23 @@ class DatabaseManager:
                 pass
             return False
 
+    def _connect_admin(self):
+        """Открывает autocommit-соединение psycopg2 с базой postgres"""
+        # Используем self.config вместо POSTGRES_CONFIG
+        conn = psycopg2.connect(
+            user=self.config.get('user', 'postgres'),
+            password=self.config.get('password', ''),
+            host=self.config.get('host', 'localhost'),
+            port=self.config.get('port', 5432),
+            database='postgres'
+        )
+        conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+        return conn
+
     def _create_database_if_not_exists(self, db_name):
         """Создает базу данных PostgreSQL если она не существует"""
         try:
-            # Используем self.config вместо POSTGRES_CONFIG
-            conn = psycopg2.connect(
-                user=self.config.get('user', 'postgres'),
-                password=self.config.get('password', ''),
-                host=self.config.get('host', 'localhost'),
-                port=self.config.get('port', 5432),
-                database='postgres'
-            )
-            conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+            conn = self._connect_admin()
             cursor = conn.cursor()
 
             # Проверяем существование базы данных
@@ -165,75 +617,70 @@ class DatabaseManager:
 
             if not exists:
                 cursor.execute(f'CREATE DATABASE "{db_name}"')
-                print(f"✅ База данных '{db_name}' создана")
+                self._log(f"✅ База данных '{db_name}' создана")
             else:
-                print(f"ℹ️ База данных '{db_name}' уже существует")
+                self._log(f"ℹ️ База данных '{db_name}' уже существует")
 
             cursor.close()
             conn.close()
             return True
 
         except Exception as e:
-            print(f"❌ Ошибка при создании базы данных '{db_name}': {e}")
+            self._log(f"❌ Ошибка при создании базы данных '{db_name}': {e}")
             return False
 
     def _drop_database_tables(self, database, models):
-        """Безопасно удаляет таблицы базы данных"""
+        """
+        Безопасно удаляет представления, таблицы базы данных и служебные
+        таблицы: предкомпилированный DDL одним запросом в одной транзакции
+        """
         try:
-            print("🧹 Очистка существующих таблиц...")
-            self._drop_all_views(database)
-            database.drop_tables(models, safe=False)
-            print("✅ Таблицы очищены")
+            self._log("🧹 Очистка существующих таблиц...")
+            statements, _ = get_drop_ddl(database.database, models)
+            with database.atomic():
+                execute_batch(database, statements)
+            self._log("✅ Таблицы очищены")
             return True
         except Exception as e:
-            print(f"⚠️ Не удалось очистить таблицы: {e}")
+            self._log(f"⚠️ Не удалось очистить таблицы: {e}")
             return False
 
-    @staticmethod
-    def _create_database_tables(database, models):
-        """Безопасно создает таблицы базы данных"""
+    def _create_database_tables(self, database, models, partitioning=None):
+        """
+        Безопасно создает таблицы базы данных: предкомпилированный DDL
+        (из кэша, пока не изменились модели) одним запросом в одной транзакции
+        """
         try:
-            print("📋 Создание таблиц...")
-            database.create_tables(models)
-            print("✅ Таблицы созданы успешно!")
+            self._log("📋 Создание таблиц...")
+            # С профилем до загрузки создаются только уникальные индексы
+            statements, source = get_create_ddl(database.database, models, partitioning,
+                                                unique_indexes_only=bool(self.index_profile))
+            with database.atomic():
+                execute_batch(database, statements)
+            if partitioning:
+                self._log(f"🗂️ Секционированы по месяцам: "
+                          f"{', '.join(f'{table} ({column})' for table, column in partitioning.items())}")
+            self._log(f"✅ Таблицы созданы успешно! ({len(statements)} операторов DDL, "
+                      f"{'из кэша' if source != 'compiled' else 'скомпилированы по моделям'})")
             return True
         except Exception as e:
-            print(f"❌ Ошибка при создании таблиц: {e}")
+            self._log(f"❌ Ошибка при создании таблиц: {e}")
             return False
 
-    @staticmethod
-    def _drop_all_views(database):
-        """Удаляет все VIEW из базы данных"""
-        try:
-            with database.connection_context():
-                cursor = database.execute_sql("""
-                    SELECT table_name 
-                    FROM information_schema.views 
-                    WHERE table_schema = 'public'
-                """)
-
-                views = cursor.fetchall()
-
-                for view in views:
-                    view_name = view[0]
-                    try:
-                        database.execute_sql(f'DROP VIEW IF EXISTS "{view_name}" CASCADE')
-                        print(f"  🗑️ Удален VIEW: {view_name}")
-                    except Exception as e:
-                        print(f"  ⚠️ Не удалось удалить VIEW {view_name}: {e}")
-
-        except Exception as e:
-            print(f"⚠️ Ошибка при получении списка VIEW: {e}")
-            raise
-
     # ==================== МЕТОДЫ ОЧИСТКИ БАЗ ДАННЫХ ====================
 
     def _clean_single_database(self, db_name, db_config):
         """Очищает одну базу данных"""
-        print(f"\n{'=' * 50}")
-        print(f"Очистка базы данных: {db_config['description']}")
-        print(f"Имя базы: {db_config['db_name']}")
-        print(f"{'=' * 50}")
+        with self._phase(db_config['db_name'], PHASE_CLEAN) as outcome:
+            outcome['success'] = self._clean_single_database_impl(db_name, db_config)
+            return outcome['success']
+
+    def _clean_single_database_impl(self, db_name, db_config):
+        """Выполняет шаги очистки базы данных"""
+        self._log(f"\n{'=' * 50}")
+        self._log(f"Очистка базы данных: {db_config['description']}")
+        self._log(f"Имя базы: {db_config['db_name']}")
+        self._log(f"{'=' * 50}")
 
         try:
             # Импортируем модели для этой БД
@@ -242,40 +689,177 @@ class DatabaseManager:
             models = models_module.get_models()
 
             # Подключаемся к базе данных
-            print("🔗 Подключение к базе данных...")
+            self._log("🔗 Подключение к базе данных...")
             database.connect()
-            print("✅ Подключение к базе данных установлено")
+            backend_pid = self._register_backend(database)
+            self._log("✅ Подключение к базе данных установлено")
+
+            # Очищаем таблицы (удаление выполняется в одной транзакции,
+            # поэтому при отмене база остается в исходном состоянии)
+            dropped = self._drop_database_tables(database, models)
+            self.cancel_token.unregister_backend(backend_pid)
+            database.close()
+
+            if self.cancel_token.is_cancelled and not dropped:
+                latency = self.cancel_token.latency() or 0.0
+                self.events.publish(CancelCompleted(database=db_config['db_name'], latency=latency))
+                self._log(f"⛔ Очистка базы {db_name} отменена за {latency * 1000:.0f} мс, изменения откатены")
+                return False
+
+            if not dropped:
+                self._log("⚠️ Не удалось очистить таблицы")
+                return False
+
+            self._log("✅ База данных очищена")
+            return True
+
+        except Exception as e:
+            self._log(f"❌ Ошибка при очистке базы {db_name}: {e}")
+            self._log(traceback.format_exc())
+            return False
 
-            # Очищаем таблицы
-            if not self._drop_database_tables(database, models):
-                print("⚠️ Не удалось очистить таблицы")
+    # ==================== МЕТОДЫ СИНХРОНИЗАЦИИ ====================
+
+    def _sync_single_database(self, db_name, db_config):
+        """Синхронизирует одну базу данных"""
+        with self._phase(db_config['db_name'], PHASE_SYNC) as outcome:
+            outcome['success'] = self._sync_single_database_impl(db_name, db_config)
+            return outcome['success']
+
+    def _sync_single_database_impl(self, db_name, db_config):
+        """
+        Применяет к базе только отличия от моковых данных: новые и измененные
+        записи - через INSERT ... ON CONFLICT DO UPDATE, удаленные - DELETE.
+        Все изменения выполняются в одной транзакции.
+        """
+        self._log(f"\n{'=' * 50}")
+        self._log(f"Синхронизация базы данных: {db_config['description']}")
+        self._log(f"Имя базы: {db_config['db_name']}")
+        self._log(f"{'=' * 50}")
+
+        mock_data_path = get_dataset_path(db_config)
+        if not os.path.exists(mock_data_path):
+            self._log(f"⚠️ Папка с данными не найдена: {mock_data_path}")
+            return False
+
+        try:
+            if not self._create_database_if_not_exists(db_config['db_name']):
+                return False
+
+            models_module = importlib.import_module(db_config['models_module'])
+            database = models_module.get_database()
+            models = models_module.get_models()
+            model_mapping = {model._meta.table_name: model for model in models}
+
+            self._log("🔗 Подключение к базе данных...")
+            database.connect()
+            backend_pid = self._register_backend(database)
+            self._log("✅ Подключение к базе данных установлено")
+
+            # ON CONFLICT (id) невозможен: первичный ключ секционированной таблицы составной
+            partitioned = get_partitioned_tables(database, model_mapping)
+            if partitioned:
+                self._log(f"❌ Таблицы {', '.join(partitioned)} секционированы, синхронизация не поддерживается. "
+                          f"Пересоздайте базу: python cli.py --create {db_name} --layout {LAYOUT_PARTITIONED}")
+                self.cancel_token.unregister_backend(backend_pid)
                 database.close()
                 return False
 
-            print("✅ База данных очищена")
+            # Недостающие таблицы создаются, существующие не трогаются
+            database.create_tables(models)
+            ensure_sync_store(database)
+
+            # Хеши файлов берем из манифеста, для устаревших записей считаем заново
+            manifest, _ = load_valid_manifest(mock_data_path)
+            tables = manifest['tables'] if manifest else {}
+
+            loading_order = [table for table in self._get_loading_order(db_config['db_name'])
+                             if table in model_mapping]
+            started = time.perf_counter()
+
+            with database.atomic():
+                diffs = []
+                for table_name in loading_order:
+                    self.cancel_token.raise_if_cancelled()
+                    file_path = get_table_file(mock_data_path, table_name)
+                    if not os.path.exists(file_path):
+                        self._log(f"  ⚠️ Файл {os.path.basename(file_path)} не найден")
+                        continue
+
+                    entry = tables.get(table_name)
+                    file_hash = entry['sha256'] if entry else file_sha256(file_path)
+                    diffs.append(compute_table_diff(database, model_mapping[table_name], file_path, file_hash))
+
+                # Вставки и обновления - в порядке зависимостей, удаления - в обратном
+                for diff in diffs:
+                    self.cancel_token.raise_if_cancelled()
+                    apply_upserts(database, diff)
+                for diff in reversed(diffs):
+                    self.cancel_token.raise_if_cancelled()
+                    apply_deletes(database, diff)
+
+                for diff in diffs:
+                    if not diff.unchanged:
+                        save_table_diff_state(database, diff)
+
+            for diff in diffs:
+                if diff.unchanged or diff.is_empty:
+                    self._log(f"  ✅ {diff.table_name}: без изменений")
+                else:
+                    self._log(f"  🔄 {diff.table_name}: добавлено/обновлено {len(diff.upserts)}, "
+                              f"удалено {len(diff.deletes)}")
+
+            self._log(f"⏱️ Синхронизация заняла {time.perf_counter() - started:.2f} с")
+
+            self.cancel_token.unregister_backend(backend_pid)
             database.close()
             return True
 
+        except OperationCancelled:
+            latency = self.cancel_token.latency() or 0.0
+            self.events.publish(CancelCompleted(database=db_config['db_name'], latency=latency))
+            self._log(f"⛔ Синхронизация базы {db_name} отменена за {latency * 1000:.0f} мс, изменения откатены")
+            self.cancel_token.unregister_backend(backend_pid)
+            database.close()
+            return False
+
         except Exception as e:
-            print(f"❌ Ошибка при очистке базы {db_name}: {e}")
-            traceback.print_exc()
+            self._log(f"❌ Ошибка при синхронизации базы {db_name}: {e}")
+            self._log(traceback.format_exc())
+
+            if 'backend_pid' in locals():
+                self.cancel_token.unregister_backend(backend_pid)
+
+            try:
+                if 'database' in locals() and not database.is_closed():
+                    database.close()
+            except BaseException:
+                pass
             return False
 
     # ==================== МЕТОДЫ ЗАГРУЗКИ ДАННЫХ ====================
 
-    def _load_mock_data_smart(self, db_config, models_module, database):
+    def _load_mock_data_smart(self, db_config, models_module, database, checkpoints, rejected=None):
         """Умная загрузка данных с обработкой ошибок для каждой записи"""
-        mock_data_path = os.path.join(MOCK_DATA_DIR, db_config['mock_data_folder'])
+        mock_data_path = get_dataset_path(db_config)
 
         if not os.path.exists(mock_data_path):
-            print(f"⚠️ Папка с данными не найдена: {mock_data_path}")
+            self._log(f"⚠️ Папка с данными не найдена: {mock_data_path}")
             return
 
-        print(f"📂 Загрузка данных из: {db_config['mock_data_folder']}")
+        self._log(f"📂 Загрузка данных из: {db_config['mock_data_folder']}")
+
+        # Манифест дает объем таблиц до чтения файлов
+        manifest, stale = load_valid_manifest(mock_data_path)
+        if manifest is None:
+            self._log("ℹ️ Манифест набора данных не найден, все таблицы загружаются через INSERT")
+        elif stale:
+            self._log(f"⚠️ Манифест устарел для таблиц: {', '.join(stale)}. "
+                      f"Обновите его: python cli.py --build-manifest {db_config['db_name']}")
 
         # Определяем порядок загрузки
         loading_order = self._get_loading_order(db_config['db_name'])
-        print(f"🔀 Порядок загрузки: {', '.join(loading_order)}")
+        self._log(f"🔀 Порядок загрузки: {', '.join(loading_order)}")
 
         # Создаем mapping имен файлов к классам моделей
         model_mapping = {}
@@ -285,8 +869,11 @@ class DatabaseManager:
             model_mapping[model.__name__.lower()] = model
 
         # Загружаем данные в правильном порядке
+        tables = manifest['tables'] if manifest else {}
         for table_name in loading_order:
-            self._load_table_safely(mock_data_path, table_name, model_mapping, models_module, database)
+            self.cancel_token.raise_if_cancelled()
+            self._load_table_safely(mock_data_path, table_name, model_mapping, models_module, database,
+                                    checkpoints, tables.get(table_name), (rejected or {}).get(table_name))
 
     @staticmethod
     def _get_loading_order(db_name):
@@ -299,14 +886,23 @@ class DatabaseManager:
         }
         return loading_orders.get(db_name, [])
 
-    def _load_table_safely(self, mock_data_path, table_name, model_mapping, models_module, database):
-        """Безопасно загружает данные для одной таблицы"""
+    def _load_table_safely(self, mock_data_path, table_name, model_mapping, models_module, database,
+                           checkpoints, manifest_entry=None, rejected=None):
+        """
+        Безопасно загружает данные для одной таблицы. rejected - номера записей,
+        отклоненных предварительной проверкой: они пропускаются при чтении.
+        checkpoints - контрольные точки загрузки: загруженная таблица
+        пропускается, прерванная продолжается с последнего пакета
+        """
         try:
-            filename = f"{table_name}.json"
-            file_path = os.path.join(mock_data_path, filename)
+            # Файл может быть сжат (.gz, .xz, .zst) или в формате JSON Lines -
+            # записи читаются с потоковой распаковкой
+            file_path = get_table_file(mock_data_path, table_name)
+            filename = os.path.basename(file_path)
+            source = f" из {filename}" if filename != f"{table_name}.json" else ''
 
             if not os.path.exists(file_path):
-                print(f"  ⚠️ Файл {filename} не найден")
+                self._log(f"  ⚠️ Файл {filename} не найден")
                 return
 
             # Ищем модель
@@ -316,50 +912,283 @@ class DatabaseManager:
                 model_class = getattr(models_module, class_name, None)
 
             if not model_class:
-                print(f"  ⚠️ Модель для таблицы '{table_name}' не найдена")
+                self._log(f"  ⚠️ Модель для таблицы '{table_name}' не найдена")
                 return
 
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-
-            if not data:
-                print(f"  ⚠️ {table_name}: файл пуст")
+            checkpoint = checkpoints.get(table_name)
+            if checkpoint.completed:
+                self._log(f"  ⏭️ {table_name}: загружена до прерывания ({checkpoint.inserted} записей), пропускаем")
                 return
 
-            print(f"  📖 {table_name}: {len(data)} записей")
-
-            # Обрабатываем даты
-            processed_data = self._process_dates(data)
-
-            # Загружаем данные - КАЖДУЮ ЗАПИСЬ В ОТДЕЛЬНОЙ ТРАНЗАКЦИИ
-            inserted_count = 0
-            errors_count = 0
-
-            for i, item in enumerate(processed_data):
-                try:
-                    with database.atomic():
-                        model_class.create(**item)
-                    inserted_count += 1
-
-                except Exception as e:
-                    errors_count += 1
-                    error_msg = str(e)
-
-                    if 'duplicate key' in error_msg or 'unique constraint' in error_msg:
-                        print(f"    ⚠️ Дубликат записи {i + 1}: пропускаем")
-                    elif 'foreign key' in error_msg.lower():
-                        print(f"    ⚠️ Ошибка внешнего ключа в записи {i + 1}: пропускаем")
-                    else:
-                        print(f"    ⚠️ Ошибка в записи {i + 1}: {error_msg}")
+            db_name = database.database
+            self.events.publish(TableStarted(database=db_name, table=table_name))
+
+            # Большие таблицы из манифеста загружаются через COPY потоком,
+            # без чтения всего файла в память
+            # Хеши записей для последующей инкрементальной синхронизации
+            # собираются при чтении файла загрузчиком
+            baseline = LoadBaseline(model_class, manifest_entry['sha256'] if manifest_entry else None)
+
+            strategy = choose_strategy(manifest_entry)
+            if strategy == STRATEGY_COPY:
+                total = manifest_entry['records']
+                chunk_size = choose_chunk_size(manifest_entry)
+                records = baseline.read(file_path)
+                if not total:
+                    self._log(f"  ⚠️ {table_name}: файл пуст")
+                    return
+                self._log(f"  📖 {table_name}: {total} записей{source} "
+                          f"(COPY {self.copy_format}, пакеты по {chunk_size})")
+            else:
+                data = list(baseline.read(file_path))
+
+                if not data:
+                    self._log(f"  ⚠️ {table_name}: файл пуст")
+                    return
+
+                total = len(data)
+                self._log(f"  📖 {table_name}: {total} записей{source}")
+
+                # Обрабатываем даты
+                records = self._process_dates(data)
+
+            # Без манифеста размер записи оценивается по файлу. У сжатого файла
+            # размер на диске - не объем данных, такая таблица идет без оценки
+            average = manifest_entry.get('avg_record_bytes') if manifest_entry else None
+            if not average and not get_compression(file_path):
+                average = os.path.getsize(file_path) // total
+            self._record_bytes[(db_name, table_name)] = average or 0
+
+            # Записи, отклоненные проверкой, пропускаются. Остальные получают
+            # явный id, чтобы ссылки дочерних таблиц указывали на те же строки
+            if rejected:
+                records = iter_filtered_records(model_class, records, rejected)
+                total -= len(rejected)
+                self._log(f"  🔎 {table_name}: {len(rejected)} записей отклонено проверкой и пропущено")
+
+            # Продолжение прерванной загрузки: обработанные записи пропускаются,
+            # последовательность сдвигается на загруженные id (значения,
+            # выданные в откаченном пакете, не должны образовать пропуск)
+            if checkpoint.done:
+                records = itertools.islice(records, checkpoint.done, None)
+                self._log(f"  ⏩ {table_name}: продолжаем с записи {checkpoint.done + 1} из {total}")
+            if isinstance(model_class._meta.primary_key, AutoField):
+                reset_serial_sequence(database, table_name, model_class._meta.primary_key.column_name)
+
+            partitioning = self._get_layout_partitioning(models_module)
+            if table_name in partitioning:
+                with database.atomic():
+                    self._create_partitions(database, table_name, partitioning[table_name], file_path)
+
+            # Загружаем данные. Небольшая таблица загружается в одной транзакции,
+            # большая - пакетами COPY, каждый пакет в своей транзакции вместе
+            # с контрольной точкой. При отмене таблицы удаляются.
+            started = time.perf_counter()
+
+            # В несколько соединений - только вне транзакции: промежуточную таблицу,
+            # созданную в транзакции (перезагрузка --watch), соединения потоков не видят
+            loaded = None
+            parallel = strategy == STRATEGY_COPY and self.copy_jobs > 1 and not checkpoint.done
+            if parallel and database.in_transaction():
+                self._log(f"    ℹ️ {table_name}: загрузка в общей транзакции, --copy-jobs не используется")
+            elif parallel:
+                loaded = self._copy_records_parallel(
+                    database, model_class, table_name, records, total, chunk_size, started, checkpoints
+                )
+                if loaded is None:
+                    # Перенос нарушил ограничения: таблица загружается заново в
+                    # одном соединении, плохие записи пропускаются построчно
+                    records = baseline.read(file_path)
+                    if rejected:
+                        records = iter_filtered_records(model_class, records, rejected)
+                    started = time.perf_counter()
+
+            if loaded is not None:
+                inserted_count, errors_count = loaded
+            elif strategy == STRATEGY_COPY:
+                inserted_count, errors_count = self._copy_records(
+                    database, model_class, table_name, records, total, chunk_size, started, checkpoints
+                )
+            else:
+                with database.atomic():
+                    inserted_count, errors_count = self._insert_records(
+                        database, model_class, table_name, records, total, started
+                    )
+                    checkpoints.save(table_name, total, inserted_count, errors_count)
+
+            if rejected and isinstance(model_class._meta.primary_key, AutoField):
+                reset_serial_sequence(database, table_name, model_class._meta.primary_key.column_name)
+
+            self.events.publish(TableFinished(
+                database=db_name, table=table_name,
+                inserted=inserted_count, errors=errors_count,
+                duration=time.perf_counter() - started
+            ))
+
+            # Состояние синхронизации сохраняется в одной транзакции
+            # с отметкой о загрузке таблицы
+            with database.atomic():
+                if errors_count == 0:
+                    record_baseline(database, baseline)
+                checkpoints.save(table_name, total, inserted_count, errors_count, completed=True)
 
             # Отчет по таблице
             if errors_count == 0:
-                print(f"  ✅ {table_name}: все {inserted_count} записей добавлены")
+                self._log(f"  ✅ {table_name}: все {inserted_count} записей добавлены")
             else:
-                print(f"  ⚠️ {table_name}: {inserted_count} добавлено, {errors_count} ошибок")
+                self._log(f"  ⚠️ {table_name}: {inserted_count} добавлено, {errors_count} ошибок")
+
+        except OperationCancelled:
+            self._log(f"  ⛔ {table_name}: загрузка отменена, изменения откатены")
+            raise
 
         except Exception as e:
-            print(f"  ❌ Критическая ошибка загрузки {table_name}: {e}")
+            # Без соединения остальные таблицы загрузить нельзя: создание базы
+            # завершается ошибкой, загруженные пакеты сохранены контрольными точками
+            if not database.is_closed() and database.connection().closed:
+                self._log(f"  ❌ {table_name}: соединение с сервером потеряно. Продолжить загрузку: "
+                          f"python cli.py --create {database.database} --resume")
+                raise
+            self._log(f"  ❌ Критическая ошибка загрузки {table_name}: {e}")
+
+    def _publish_table_progress(self, database, table_name, done, total, errors, started):
+        """Публикует прогресс загрузки таблицы (с ограничением частоты)"""
+        self.progress.publish(TableProgress(
+            database=database.database, table=table_name,
+            done=done, total=total, errors=errors,
+            elapsed=time.perf_counter() - started,
+            bytes=done * self._record_bytes.get((database.database, table_name), 0)
+        ), force=done >= total)
+
+    def _insert_records(self, database, model_class, table_name, records, total, started,
+                        offset=0, errors_before=0):
+        """
+        Построчная загрузка: КАЖДАЯ ЗАПИСЬ В ОТДЕЛЬНОЙ ТОЧКЕ СОХРАНЕНИЯ,
+        ошибочные записи пропускаются. Возвращает (добавлено, ошибок).
+        """
+        inserted_count = 0
+        errors_count = 0
+
+        for i, item in enumerate(records, start=offset):
+            self.cancel_token.raise_if_cancelled()
+
+            try:
+                with database.atomic():
+                    model_class.create(**item)
+                inserted_count += 1
+
+            except Exception as e:
+                # Запрос прерван через pg_cancel_backend
+                self.cancel_token.raise_if_cancelled()
+
+                errors_count += 1
+                error_msg = str(e)
+
+                if 'duplicate key' in error_msg or 'unique constraint' in error_msg:
+                    self._log(f"    ⚠️ Дубликат записи {i + 1}: пропускаем")
+                elif 'foreign key' in error_msg.lower():
+                    self._log(f"    ⚠️ Ошибка внешнего ключа в записи {i + 1}: пропускаем")
+                else:
+                    self._log(f"    ⚠️ Ошибка в записи {i + 1}: {error_msg}")
+
+            self._publish_table_progress(database, table_name, i + 1, total,
+                                         errors_before + errors_count, started)
+
+        return inserted_count, errors_count
+
+    def _copy_records(self, database, model_class, table_name, records, total, chunk_size, started,
+                      checkpoints):
+        """
+        Загрузка пакетами через COPY, каждый пакет - в своей транзакции вместе
+        с контрольной точкой. Пакет с ошибкой откатывается и загружается
+        построчно, чтобы пропустить только плохие записи. Загрузка начинается
+        с контрольной точки таблицы. Возвращает (добавлено, ошибок).
+        """
+        cursor = database.cursor()
+        columns = None
+        encoder = None
+        checkpoint = checkpoints.get(table_name)
+        done = checkpoint.done
+        inserted_count = checkpoint.inserted
+        errors_count = checkpoint.errors
+
+        for chunk in iter_chunks(records, chunk_size):
+            self.cancel_token.raise_if_cancelled()
+
+            if columns is None:
+                columns = get_copy_columns(model_class, chunk[0])
+                if self.copy_format == COPY_FORMAT_BINARY:
+                    if supports_binary_copy(columns):
+                        encoder = BinaryCopyEncoder(columns)
+                    else:
+                        self._log(f"    ℹ️ {table_name}: двоичный COPY не поддерживает типы полей, используется текстовый")
+
+            try:
+                with database.atomic():
+                    if encoder:
+                        copy_binary_chunk(cursor, model_class, encoder, chunk)
+                    else:
+                        copy_text_chunk(cursor, model_class, columns, chunk)
+                    checkpoints.save(table_name, done + len(chunk), inserted_count + len(chunk), errors_count)
+                inserted_count += len(chunk)
+                self._publish_table_progress(database, table_name, done + len(chunk),
+                                             total, errors_count, started)
+
+            except Exception as e:
+                self.cancel_token.raise_if_cancelled()
+
+                self._log(f"    ⚠️ COPY записей {done + 1}-{done + len(chunk)} не удался, "
+                          f"загружаем пакет построчно: {str(e).splitlines()[0]}")
+                with database.atomic():
+                    inserted, errors = self._insert_records(
+                        database, model_class, table_name, self._process_dates(chunk),
+                        total, started, offset=done, errors_before=errors_count
+                    )
+                    checkpoints.save(table_name, done + len(chunk), inserted_count + inserted, errors_count + errors)
+                inserted_count += inserted
+                errors_count += errors
+
+            done += len(chunk)
+
+        if columns:
+            reset_sequence(database, model_class, columns)
+
+        return inserted_count, errors_count
+
+    def _copy_records_parallel(self, database, model_class, table_name, records, total, chunk_size, started,
+                               checkpoints):
+        """
+        Загрузка в copy_jobs соединений через промежуточную таблицу (см.
+        core/parallel_copy.py). Строки переносятся в таблицу одним INSERT ...
+        SELECT в транзакции вместе с контрольной точкой. Возвращает
+        (добавлено, ошибок) или None, если перенос нарушил ограничения таблицы
+        """
+        loader = ParallelCopy(
+            database, model_class, self.copy_jobs, self.cancel_token, copy_format=self.copy_format, log=self._log,
+            on_progress=lambda done, errors: self._publish_table_progress(
+                database, table_name, done, total, errors, started
+            )
+        )
+        try:
+            copied, errors_count = loader.copy_to_staging(records, chunk_size)
+            try:
+                with database.atomic():
+                    inserted_count = loader.merge()
+                    checkpoints.save(table_name, total, inserted_count, errors_count)
+            except IntegrityError as e:
+                self.cancel_token.raise_if_cancelled()
+                self._log(f"    ⚠️ {table_name}: перенос из промежуточной таблицы нарушил ограничения "
+                          f"({str(e).splitlines()[0]}), загружаем в одном соединении")
+                return None
+        finally:
+            if not database.is_closed() and not database.connection().closed:
+                loader.drop_staging()
+
+        self._log(f"    ⚡ {table_name}: {copied} записей в {loader.jobs} соединений за {loader.copy_duration:.2f} с, "
+                  f"перенос в таблицу {loader.merge_duration:.2f} с")
+        if loader.columns:
+            reset_sequence(database, model_class, loader.columns)
+        return inserted_count, errors_count
 
     @staticmethod
     def _process_dates(data):
@@ -376,28 +1205,692 @@ class DatabaseManager:
             processed_data.append(processed_item)
         return processed_data
 
+    # ==================== ДАМПЫ И ШАБЛОНЫ ====================
+
+    def _export_single_dump(self, db_name, db_config, dump_format, jobs):
+        """Экспортирует одну собранную базу в dumps/<база>/"""
+        with self._phase(db_config['db_name'], PHASE_EXPORT) as outcome:
+            outcome['success'] = self._export_single_dump_impl(db_name, db_config, dump_format, jobs)
+            return outcome['success']
+
+    def _export_single_dump_impl(self, db_name, db_config, dump_format, jobs):
+        """Выполняет шаги экспорта дампа"""
+        dump_format = choose_dump_format(dump_format)
+        jobs = jobs or DEFAULT_RESTORE_JOBS
+        dump_path = get_dump_path(db_config['db_name'])
+        self._log(f"\n📦 Экспорт {db_config['db_name']} (формат {dump_format}) -> {dump_path}")
+
+        if dump_format == FORMAT_DIRECTORY and not find_pg_tool('pg_dump'):
+            self._log("❌ pg_dump не найден. Используйте --dump-format copy")
+            return False
+
+        try:
+            models_module = importlib.import_module(db_config['models_module'])
+            database = models_module.get_database()
+            models = models_module.get_models()
+            started = time.perf_counter()
+
+            database.connect()
+            try:
+                missing = [model._meta.table_name for model in models
+                           if not database.table_exists(model._meta.table_name)]
+                if missing:
+                    self._log(f"❌ В базе нет таблиц: {', '.join(missing)}. "
+                              f"Сначала создайте ее: python cli.py --create {db_name}")
+                    return False
+
+                # Дамп пересобирается целиком
+                if os.path.exists(dump_path):
+                    shutil.rmtree(dump_path)
+                os.makedirs(dump_path)
+
+                tables = get_dump_tables(database, models)
+                if dump_format == FORMAT_DIRECTORY:
+                    count_rows(database, tables)
+                else:
+                    export_copy_tables(database, dump_path, tables)
+            finally:
+                database.close()
+
+            if dump_format == FORMAT_DIRECTORY:
+                run_pg_tool(
+                    pg_tool_command('pg_dump', self.config, '-Fd', '-j', str(jobs), '--no-owner',
+                                    '--no-privileges', '-f', os.path.join(dump_path, DIRECTORY_DATA),
+                                    db_config['db_name']),
+                    pg_tool_env(self.config), self.cancel_token
+                )
+
+            manifest = build_dump_manifest(db_config, dump_format, tables, dataset_fingerprint(db_config, models))
+            save_dump_manifest(dump_path, manifest)
+
+            rows = sum(entry['rows'] for entry in tables.values())
+            self._log(f"✅ {db_name}: {len(tables)} таблиц, {rows} строк за {time.perf_counter() - started:.2f} с")
+            return True
+
+        except OperationCancelled:
+            self._log(f"⛔ Экспорт базы {db_name} отменен")
+            shutil.rmtree(dump_path, ignore_errors=True)
+            return False
+
+        except Exception as e:
+            self._log(f"❌ Ошибка при экспорте базы {db_name}: {e}")
+            self._log(traceback.format_exc())
+            return False
+
+    def _restore_single_database(self, db_name, db_config, jobs, use_template):
+        """Создает одну базу данных из дампа"""
+        with self._phase(db_config['db_name'], PHASE_RESTORE) as outcome:
+            outcome['success'] = self._restore_single_database_impl(db_name, db_config, jobs, use_template)
+            return outcome['success']
+
+    def _restore_single_database_impl(self, db_name, db_config, jobs, use_template):
+        """
+        Пересоздает базу и восстанавливает в нее дамп. С use_template дамп
+        восстанавливается в шаблонную базу (только если шаблон устарел),
+        а целевая база создается копированием шаблона.
+        """
+        target = db_config['db_name']
+        jobs = jobs or DEFAULT_RESTORE_JOBS
+        dump_path = get_dump_path(target)
+
+        self._log(f"\n{'=' * 50}")
+        self._log(f"Создание базы данных из дампа: {db_config['description']}")
+        self._log(f"Имя базы: {target}")
+        self._log(f"{'=' * 50}")
+
+        manifest = load_dump_manifest(dump_path)
+        if manifest is None:
+            self._log(f"❌ Дамп не найден: {dump_path}. Создайте его: python cli.py --export-dump {db_name}")
+            return False
+
+        if manifest['format'] == FORMAT_DIRECTORY and not find_pg_tool('pg_restore'):
+            self._log("❌ pg_restore не найден. Экспортируйте дамп с --dump-format copy")
+            return False
+
+        models_module = importlib.import_module(db_config['models_module'])
+        if manifest['dataset_fingerprint'] != dataset_fingerprint(db_config, models_module.get_models()):
+            self._log(f"⚠️ Моковые данные изменились после экспорта дампа "
+                      f"(python cli.py --export-dump {db_name})")
+
+        restoring = target
+        try:
+            conn = self._connect_admin()
+            cursor = conn.cursor()
+            started = time.perf_counter()
+
+            try:
+                if use_template:
+                    template = get_template_name(target)
+                    if get_template_fingerprint(cursor, template) == manifest['fingerprint']:
+                        self._log(f"♻️ Шаблон {template} актуален")
+                    else:
+                        self._log(f"📦 Сборка шаблона {template} из дампа...")
+                        restoring = template
+                        drop_template(cursor, template)
+                        recreate_database(cursor, template)
+                        self._restore_dump_into(template, db_config, dump_path, manifest, jobs)
+                        mark_template(cursor, template, manifest['fingerprint'])
+
+                    restoring = target
+                    recreate_database(cursor, target, template=template)
+                    self._log(f"✅ База '{target}' скопирована из шаблона {template}")
+                else:
+                    recreate_database(cursor, target)
+                    self._log(f"✅ База данных '{target}' пересоздана")
+                    self._restore_dump_into(target, db_config, dump_path, manifest, jobs)
+            finally:
+                cursor.close()
+                conn.close()
+
+            self._log(f"⏱️ База развернута из дампа за {time.perf_counter() - started:.2f} с")
+
+            # Показываем статистику
+            database = models_module.get_database()
+            database.connect()
+            if self.index_profile:
+                with self._phase(target, PHASE_INDEXES):
+                    self._apply_index_profile(database, models_module, self.index_profile)
+            if self.maintenance and self.maintenance.enabled:
+                with self._phase(target, PHASE_MAINTENANCE):
+                    self._run_maintenance(target, database, models_module.get_models())
+            with self._phase(target, PHASE_STATS):
+                self._show_database_stats(models_module)
+            database.close()
+
+            self.created_databases.append(target)
+            return True
+
+        except OperationCancelled:
+            self._log(f"⛔ Восстановление базы {db_name} отменено, удаляем частично восстановленную базу...")
+            try:
+                conn = self._connect_admin()
+                if restoring == target:
+                    recreate_database(conn.cursor(), target)
+                else:
+                    drop_template(conn.cursor(), restoring)
+                conn.close()
+            except Exception as e:
+                self._log(f"⚠️ Не удалось очистить базу после отмены: {e}")
+
+            latency = self.cancel_token.latency() or 0.0
+            self.events.publish(CancelCompleted(database=target, latency=latency))
+            self._log(f"⏱️ Отмена завершена за {latency * 1000:.0f} мс")
+            return False
+
+        except Exception as e:
+            self._log(f"❌ Ошибка при восстановлении базы {db_name}: {e}")
+            self._log(traceback.format_exc())
+            return False
+
+    def _restore_dump_into(self, target, db_config, dump_path, manifest, jobs):
+        """Восстанавливает дамп в пустую базу target"""
+        if manifest['format'] == FORMAT_DIRECTORY:
+            self._log(f"📥 pg_restore -j {jobs}...")
+            run_pg_tool(
+                pg_tool_command('pg_restore', self.config, '-j', str(jobs), '--no-owner', '--no-privileges',
+                                '-d', target, os.path.join(dump_path, DIRECTORY_DATA)),
+                pg_tool_env(self.config), self.cancel_token
+            )
+            return
+
+        # Формат copy: схема из моделей, данные - параллельно по уровням зависимостей
+        self._log(f"📥 Восстановление таблиц через COPY в {jobs} потоков...")
+        models = importlib.import_module(db_config['models_module']).get_models()
+        database = create_database_connection(target, self.config)
+
+        with database.bind_ctx(models):
+            database.create_tables(models)
+        if any(table in manifest['tables'] for table in SYNC_STORE_COLUMNS):
+            ensure_sync_store(database)
+        database.close()
+
+        def on_table_done(table_name, rows, duration):
+            self.events.publish(TableFinished(
+                database=target, table=table_name, inserted=rows, errors=0, duration=duration
+            ))
+            self._log(f"  ✅ {table_name}: {rows} строк за {duration:.2f} с")
+
+        restore_copy_tables(database, dump_path, manifest, jobs, self.cancel_token, on_table_done)
+
+    # ==================== ПРОФИЛИ ИНДЕКСОВ ====================
+
+    def _switch_single_index_profile(self, db_name, db_config, profile):
+        """Переключает профиль индексов одной базы"""
+        models_module = importlib.import_module(db_config['models_module'])
+        if profile not in get_index_profiles(models_module):
+            self._log(f"❌ Профиль индексов '{profile}' не объявлен для базы {db_name}. "
+                      f"Доступны: {', '.join(get_index_profiles(models_module))}")
+            return False
+
+        database = models_module.get_database()
+        try:
+            database.connect()
+            backend_pid = self._register_backend(database)
+            try:
+                current = detect_profile(database, models_module)
+                self._log(f"\n🗂️ {db_name}: текущий профиль {current or 'нестандартный'}")
+                self._apply_index_profile(database, models_module, profile)
+            finally:
+                self.cancel_token.unregister_backend(backend_pid)
+                database.close()
+            return True
+
+        except Exception as e:
+            if self.cancel_token.is_cancelled:
+                self._log(f"⛔ Переключение профиля {db_name} отменено, индексы не изменены")
+            else:
+                self._log(f"❌ Ошибка при переключении профиля индексов {db_name}: {e}")
+            return False
+
+    def _apply_index_profile(self, database, models_module, profile):
+        """Приводит вторичные индексы базы к профилю и выводит тайминги"""
+        self._log(f"🗂️ Применение профиля индексов '{profile}'...")
+        dropped, created = apply_index_profile(database, models_module, profile)
+
+        for name in dropped:
+            self._log(f"  🗑️ Удален индекс {name}")
+        for name, duration in created:
+            self._log(f"  ✅ Создан индекс {name} за {duration * 1000:.0f} мс")
+        if not dropped and not created:
+            self._log("  ✅ Индексы уже соответствуют профилю")
+
+    # ==================== ОБСЛУЖИВАНИЕ ====================
+
+    def _run_maintenance(self, db_name, database, models):
+        """VACUUM (ANALYZE) и прогрев таблиц в несколько соединений с таймингом каждого шага"""
+        settings = self.maintenance
+        tables = [model._meta.table_name for model in models]
+
+        # Секционированные таблицы обслуживаются по секциям
+        partitioned = get_partitioned_tables(database, tables)
+        partitions = {table: get_leaf_partitions(database, table) if table in partitioned else [table]
+                      for table in tables}
+        tables = [leaf for table in tables for leaf in partitions[table]]
+
+        if settings.vacuum:
+            self._log(f"🧹 VACUUM (ANALYZE) {len(tables)} таблиц в {settings.jobs} потоков...")
+
+            def on_vacuum_done(table, pages, duration):
+                relpages, relallvisible = pages
+                self.events.publish(MaintenanceStep(
+                    database=db_name, table=table, step=STEP_VACUUM, duration=duration,
+                    pages=relpages, visible_pages=relallvisible
+                ))
+                visible = relallvisible * 100 / relpages if relpages else 100
+                self._log(f"  ✅ {table}: {duration * 1000:.0f} мс, "
+                          f"видимых страниц {relallvisible}/{relpages} ({visible:.0f}%)")
+
+            run_parallel(database, tables, settings.jobs, vacuum_analyze, self.cancel_token, on_vacuum_done)
+
+            def on_analyze_done(table, _, duration):
+                self.events.publish(MaintenanceStep(
+                    database=db_name, table=table, step=STEP_ANALYZE, duration=duration
+                ))
+                self._log(f"  ✅ {table}: ANALYZE секционированной таблицы за {duration * 1000:.0f} мс")
+
+            run_parallel(database, partitioned, settings.jobs, analyze_table, self.cancel_token, on_analyze_done)
+
+        if settings.prewarm:
+            unknown = [table for table in settings.prewarm_tables if table not in partitions]
+            if unknown:
+                self._log(f"⚠️ Таблиц {', '.join(unknown)} нет в базе {db_name}, прогрев пропущен для них")
+            prewarm_tables = [leaf for table, leaves in partitions.items()
+                              if not settings.prewarm_tables or table in settings.prewarm_tables
+                              for leaf in leaves]
+
+            if enable_pg_prewarm(database):
+                method, action = 'pg_prewarm', prewarm_table
+            else:
+                self._log("⚠️ Расширение pg_prewarm недоступно, таблицы прогреваются последовательным чтением")
+                method, action = 'seqscan', read_table
+            self._log(f"🔥 Прогрев {len(prewarm_tables)} таблиц ({method})...")
+
+            def on_prewarm_done(table, blocks, duration):
+                self.events.publish(MaintenanceStep(
+                    database=db_name, table=table, step=STEP_PREWARM, duration=duration,
+                    pages=blocks, method=method
+                ))
+                self._log(f"  ✅ {table}: {blocks} блоков за {duration * 1000:.0f} мс")
+
+            run_parallel(database, prewarm_tables, settings.jobs, action, self.cancel_token, on_prewarm_done)
+
+    # ==================== НАБЛЮДЕНИЕ ЗА ДАННЫМИ ====================
+
+    def _watch_single_database(self, db_name, db_config, debounce, polling):
+        """
+        Режим --watch: соединение и модели готовятся один раз, затем каждое
+        изменение файлов перезагружает измененные таблицы и таблицы, которые
+        на них ссылаются
+        """
+        mock_data_path = get_dataset_path(db_config)
+        if not os.path.exists(mock_data_path):
+            self._log(f"⚠️ Папка с данными не найдена: {mock_data_path}")
+            return False
+
+        models_module = importlib.import_module(db_config['models_module'])
+        database = models_module.get_database()
+        models = models_module.get_models()
+        model_mapping = {model._meta.table_name: model for model in models}
+
+        # Базу без таблиц сначала создаем полностью
+        if not self._create_database_if_not_exists(db_config['db_name']):
+            return False
+        database.connect()
+        missing = [table for table in model_mapping if not database.table_exists(table)]
+        database.close()
+        if missing and not self._create_single_database(db_name, db_config):
+            return False
+
+        watcher = create_watcher(mock_data_path, polling)
+        database.connect()
+        backend_pid = self._register_backend(database)
+        try:
+            # Изменения, сделанные до запуска, видны по хешам файлов синхронизации
+            changed = {table for table in model_mapping
+                       if os.path.exists(get_table_file(mock_data_path, table))
+                       and get_stored_file_hash(database, table) != file_sha256(get_table_file(mock_data_path, table))}
+            if changed:
+                self._reload_tables(db_config, models_module, database, changed, time.perf_counter())
+
+            self._log(f"👀 Наблюдение за {mock_data_path} ({watcher.method}). Ctrl+C - выход")
+            while True:
+                batch = wait_for_changes(watcher, self.cancel_token, debounce)
+                if batch is None:
+                    break
+                changed = {split_table_file(name)[0] for name in batch.files} & set(model_mapping)
+                if changed:
+                    self._reload_tables(db_config, models_module, database, changed, batch.first_seen)
+
+            self._log(f"👋 Наблюдение за {db_name} завершено")
+            return True
+
+        except OperationCancelled:
+            self._log(f"⛔ Перезагрузка отменена, изменения откатены. Наблюдение за {db_name} завершено")
+            return True
+
+        except Exception as e:
+            self._log(f"❌ Ошибка наблюдения за базой {db_name}: {e}")
+            self._log(traceback.format_exc())
+            return False
+
+        finally:
+            watcher.close()
+            self.cancel_token.unregister_backend(backend_pid)
+            if not database.is_closed():
+                database.close()
+
+    def _reload_tables(self, db_config, models_module, database, changed, first_seen):
+        """
+        Перезагружает измененные таблицы и зависимые от них в одной
+        транзакции: TRUNCATE ... RESTART IDENTITY и загрузка из файлов.
+        Если файл еще не дописан (JSON не разбирается), перезагрузка
+        откладывается до следующего изменения
+        """
+        mock_data_path = get_dataset_path(db_config)
+        models = models_module.get_models()
+        tables = get_dependent_tables(models, changed)
+        loading_order = [table for table in self._get_loading_order(db_config['db_name']) if table in tables]
+        self._log(f"\n🔄 Изменены: {', '.join(sorted(changed))}. Перезагрузка: {', '.join(loading_order)}")
+
+        with self._phase(db_config['db_name'], PHASE_RELOAD) as outcome:
+            # Записи манифеста измененных таблиц пересобираются: от числа записей
+            # зависит способ загрузки. Разбор файла заодно проверяет JSON
+            manifest, _ = load_valid_manifest(mock_data_path)
+            entries = manifest['tables'] if manifest else {}
+            dependencies = get_table_dependencies(models)
+            model_mapping = {model._meta.table_name: model for model in models}
+            for table_name in changed:
+                file_path = get_table_file(mock_data_path, table_name)
+                if not os.path.exists(file_path):
+                    entries.pop(table_name, None)
+                    continue
+                try:
+                    entries[table_name] = build_table_entry(file_path, dependencies[table_name],
+                                                            model_mapping.get(table_name))
+                except ValueError as e:
+                    self._log(f"  ⚠️ {os.path.basename(file_path)}: JSON не разобран ({e}), ждем следующего сохранения")
+                    outcome['success'] = False
+                    return False
+            if manifest:
+                manifest['tables'] = entries
+                save_manifest(db_config, manifest)
+
+            rejected = {}
+            if self.validation:
+                ok, rejected = self._validate_dataset(db_config)
+                if not ok:
+                    outcome['success'] = False
+                    return False
+
+            started = time.perf_counter()
+            fingerprint = load_fingerprint(dataset_fingerprint(db_config, models), self.layout, self.validation)
+            truncated = ', '.join(f'"{table}"' for table in loading_order)
+            with database.atomic():
+                database.execute_sql(f'TRUNCATE {truncated} RESTART IDENTITY CASCADE')
+                for table_name in loading_order:
+                    clear_table_state(database, table_name)
+                for table_name in loading_order:
+                    self.cancel_token.raise_if_cancelled()
+                    self._load_table_safely(mock_data_path, table_name, model_mapping, models_module, database,
+                                            LoadCheckpoints(database, fingerprint), entries.get(table_name),
+                                            rejected.get(table_name))
+
+        finished = time.perf_counter()
+        self._log(f"⏱️ Перезагрузка заняла {(finished - started) * 1000:.0f} мс, "
+                  f"от сохранения файла до данных в базе - {(finished - first_seen) * 1000:.0f} мс")
+        return True
+
+    # ==================== ШАБЛОНЫ И ПУЛ КОПИЙ ====================
+
+    def _serve_pool(self, databases_list, size, host, port, lease_ttl):
+        """
+        Режим --serve: шаблоны собираются один раз, затем пул копий
+        пополняется в фоне, а HTTP сервер выдает и принимает копии
+        """
+        if not self.build_templates(databases_list):
+            return False
+
+        pool = ProvisioningPool(databases_list, self._connect_admin, size=size, lease_ttl=lease_ttl, log=self._log)
+        try:
+            server = create_pool_server(pool, self.config, host, port)
+        except OSError as e:
+            self._log(f"❌ Не удалось открыть порт {host}:{port}: {e}")
+            return False
+
+        pool.start()
+        server_thread = threading.Thread(target=server.serve_forever, name='pool-http', daemon=True)
+        server_thread.start()
+        self._log(f"🚰 Пул копий ({size} на набор: {', '.join(databases_list)}) - http://{host}:{port}. "
+                  f"Ctrl+C - выход")
+        try:
+            while not self.cancel_token.is_cancelled:
+                time.sleep(0.2)
+        finally:
+            server.shutdown()
+            server.server_close()
+            self._log("🧹 Удаление невыданных копий...")
+            pool.stop()
+
+        for dataset, metrics in pool.metrics_dict().items():
+            acquire = metrics['acquire']
+            if acquire['requests']:
+                self._log(f"📊 {dataset}: выдано {acquire['requests']}, из пула {acquire['hits']}, "
+                          f"p50 {acquire['p50_ms']} мс, p95 {acquire['p95_ms']} мс")
+        self._log("👋 Пул копий остановлен")
+        return True
+
+    def _build_template(self, db_name, db_config):
+        """
+        Собирает шаблон набора (для пула и фикстур pytest): набор загружается
+        как при --create прямо в <база>__template, сама база набора не
+        удаляется и не пересоздается
+        """
+        models_module = importlib.import_module(db_config['models_module'])
+        models = models_module.get_models()
+        schema_hash = model_definition_hash(models, self._get_layout_partitioning(models_module),
+                                            bool(self.index_profile))
+        fingerprint = pool_fingerprint(dataset_fingerprint(db_config, models), schema_hash,
+                                       self.layout, self.index_profile, self.validation)
+        template = get_template_name(db_config['db_name'])
+
+        conn = self._connect_admin()
+        try:
+            cursor = conn.cursor()
+            with template_lock(cursor, template):
+                if get_template_fingerprint(cursor, template) == fingerprint:
+                    self._log(f"♻️ Шаблон {template} актуален")
+                    return True
+
+                self._log(f"📦 Сборка шаблона {template}...")
+                drop_template(cursor, template)
+                if not self._create_single_database(db_name, db_config, target=template):
+                    # Недособранный шаблон не оставляем на сервере
+                    drop_template(cursor, template)
+                    return False
+
+                mark_template(cursor, template, fingerprint)
+                self._log(f"✅ Шаблон {template} собран")
+                return True
+        except Exception as e:
+            self._log(f"❌ Ошибка при сборке шаблона {template}: {e}")
+            return False
+        finally:
+            conn.close()
+
+    # ==================== КОНТРОЛЬНЫЕ ТОЧКИ ====================
+
+    def _read_checkpoints(self, database, fingerprint):
+        """Контрольные точки прерванной загрузки (или None - база пересоздается)"""
+        checkpoints, stale = read_checkpoints(database, fingerprint)
+        if stale:
+            self._log("⚠️ Контрольные точки от другого набора данных или настроек загрузки, "
+                      "база пересоздается полностью")
+        elif checkpoints is None:
+            self._log("ℹ️ Контрольных точек нет, база создается заново")
+        else:
+            loaded = [name for name, checkpoint in checkpoints.tables.items() if checkpoint.completed]
+            self._log(f"🔄 Продолжение загрузки с контрольных точек: загружено таблиц {len(loaded)}")
+        return checkpoints
+
+    # ==================== ПРОВЕРКА ДАННЫХ ====================
+
+    def _validate_dataset(self, db_config):
+        """
+        Проверяет моковые данные по моделям без обращения к серверу.
+        Возвращает (можно ли загружать, {таблица: номера отклоненных записей})
+        """
+        self._log("🔎 Проверка данных по ограничениям моделей...")
+        fail_fast = self.validation == VALIDATION_FAIL
+
+        def on_table_done(result):
+            if not result.rejected:
+                self._log(f"  ✅ {result.table}: {result.records} записей без ошибок")
+                return
+            counts = ', '.join(f"{kind}: {count}" for kind, count in result.counts.items())
+            self._log(f"  ⚠️ {result.table}: отклонено {len(result.rejected)} из {result.records} ({counts})")
+            for violation in result.examples:
+                self._log(f"    • {violation}")
+
+        try:
+            results = validate_dataset(db_config, fail_fast=fail_fast, on_table_done=on_table_done)
+        except ValidationFailed as e:
+            self._log(f"❌ {e}")
+            self._log(f"❌ Данные не прошли проверку, база {db_config['db_name']} не изменена")
+            return False, {}
+
+        return True, {table: result.rejected for table, result in results.items() if result.rejected}
+
+    # ==================== ПРОВЕРКА СОДЕРЖИМОГО ====================
+
+    def _verify_single_database(self, db_name, db_config):
+        """Сверяет содержимое одной существующей базы с моковыми данными"""
+        with self._phase(db_config['db_name'], PHASE_VERIFY) as outcome:
+            outcome['success'] = self._verify_single_database_impl(db_name, db_config)
+            return outcome['success']
+
+    def _verify_single_database_impl(self, db_name, db_config):
+        try:
+            self._log(f"\n🔎 {db_name}: проверка содержимого таблиц")
+
+            # Записи, отклоненные проверкой при загрузке (--prevalidate filter),
+            # в базе отсутствуют - без них считается и ожидаемый хеш
+            rejected = {}
+            if self.validation:
+                ok, rejected = self._validate_dataset(db_config)
+                if not ok:
+                    return False
+
+            models_module = importlib.import_module(db_config['models_module'])
+            database = models_module.get_database()
+            database.connect(reuse_if_open=True)
+            backend_pid = self._register_backend(database)
+            try:
+                return self._verify_database_content(db_config, models_module, database, rejected)
+            finally:
+                self.cancel_token.unregister_backend(backend_pid)
+                database.close()
+
+        except OperationCancelled:
+            self._log(f"⛔ {db_name}: проверка отменена")
+            return False
+
+        except Exception as e:
+            self._log(f"❌ Ошибка при проверке базы {db_name}: {e}")
+            return False
+
+    def _verify_database_content(self, db_config, models_module, database, rejected=None):
+        """
+        Считает хеш каждой таблицы на сервере (один запрос на таблицу) и
+        сравнивает с ожидаемым: из манифеста, если файл не менялся, иначе по
+        моковым данным. Возвращает True, если все таблицы совпали
+        """
+        mock_data_path = get_dataset_path(db_config)
+        manifest, _ = load_valid_manifest(mock_data_path)
+        entries = manifest['tables'] if manifest else {}
+        model_mapping = {model._meta.table_name: model for model in models_module.get_models()}
+
+        results = []
+        for table_name in self._get_loading_order(db_config['db_name']):
+            self.cancel_token.raise_if_cancelled()
+            model = model_mapping[table_name]
+            columns = get_verify_columns(model)
+            table_rejected = (rejected or {}).get(table_name)
+
+            expected = None if table_rejected else manifest_content_hash(entries.get(table_name), columns)
+            source = SOURCE_MANIFEST
+            if expected is None:
+                source = SOURCE_DATA
+                file_path = get_table_file(mock_data_path, table_name)
+                if not os.path.exists(file_path):
+                    expected = ContentHash()
+                else:
+                    records = iter_records(file_path)
+                    if table_rejected:
+                        records = iter_filtered_records(model, records, table_rejected)
+                    expected = source_content_hash(model, records, columns)
+
+            results.append(verify_table(database, model, expected, source))
+
+        self._log(format_benchmark_table(VERIFY_TABLE_HEADERS, [result.to_row() for result in results]))
+
+        mismatched = [result.table for result in results if not result.ok]
+        if mismatched:
+            self._log(f"❌ Содержимое не совпадает с моковыми данными: {', '.join(mismatched)}")
+            return False
+        self._log(f"✅ Все таблицы совпадают с моковыми данными "
+                  f"({sum(result.actual.rows for result in results)} строк, "
+                  f"{sum(result.duration for result in results) * 1000:.0f} мс на сервере)")
+        return True
+
+    # ==================== СЕКЦИОНИРОВАНИЕ ====================
+
+    def _get_layout_partitioning(self, models_module):
+        """Секционируемые таблицы в текущей раскладке ({} для обычной)"""
+        if self.layout != LAYOUT_PARTITIONED:
+            return {}
+        return get_partitioning(models_module)
+
+    def _create_partitions(self, database, table_name, column, file_path):
+        """Создает месячные секции на диапазон дат файла (отдельный потоковый проход)"""
+        span = get_date_span(iter_records(file_path), column)
+        if span is None:
+            return
+        created = create_month_partitions(database, table_name, *span)
+        if created:
+            self._log(f"  🗂️ {table_name}: секции {span[0]:%Y-%m} - {span[1]:%Y-%m} ({len(created)} шт.)")
+
+    def _check_dangling_references(self, database, models_module):
+        """Проверяет ссылки на секционированные таблицы, оставшиеся без FOREIGN KEY"""
+        partitioning = self._get_layout_partitioning(models_module)
+        if not partitioning:
+            return
+        for table, column, count in find_dangling_references(database, models_module.get_models(), partitioning):
+            if count:
+                self._log(f"⚠️ {table}.{column}: {count} ссылок на несуществующие строки")
+            else:
+                self._log(f"✅ {table}.{column}: висячих ссылок нет (проверка вместо FOREIGN KEY)")
+
     # ==================== ВСПОМОГАТЕЛЬНЫЕ МЕТОДЫ ====================
 
-    @staticmethod
-    def _show_database_stats(models_module):
+    def _show_database_stats(self, models_module):
         """Показывает статистику по созданной базе данных"""
-        print(f"\n📊 Статистика базы данных:")
+        self._log(f"\n📊 Статистика базы данных:")
 
         for model in models_module.get_models():
             try:
                 count = model.select().count()
-                print(f"   {model.__name__}: {count} записей")
+                self._log(f"   {model.__name__}: {count} записей")
             except Exception as e:
-                print(f"   {model.__name__}: ошибка при подсчете - {e}")
+                self._log(f"   {model.__name__}: ошибка при подсчете - {e}")
 
     def _show_create_summary(self, success_count, databases_list):
         """Показывает итоговую сводку создания"""
-        print(f"\n{'=' * 60}")
-        print("🎉 ИТОГИ СОЗДАНИЯ БАЗ ДАННЫХ")
-        print(f"{'=' * 60}")
-        print(f"✅ Успешно создано: {success_count} из {len(databases_list)} баз")
+        self._log(f"\n{'=' * 60}")
+        self._log("🎉 ИТОГИ СОЗДАНИЯ БАЗ ДАННЫХ")
+        self._log(f"{'=' * 60}")
+        self._log(f"✅ Успешно создано: {success_count} из {len(databases_list)} баз")
         if self.created_databases:
-            print(f"📁 Созданные базы: {', '.join(self.created_databases)}")
-            print(f"\n💡 Примеры подключения:")
+            self._log(f"📁 Созданные базы: {', '.join(self.created_databases)}")
+            self._log(f"\n💡 Примеры подключения:")
             for db in self.created_databases:
-                print(f"   psql -h {self.config['host']} -U {self.config['user']} -d {db}")
+                self._log(f"   psql -h {self.config['host']} -U {self.config['user']} -d {db}")
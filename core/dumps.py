@@ -0,0 +1,274 @@
+"""
+Артефакты дампов собранных баз: dumps/<база>/.
+
+Дамп содержит схему и данные собранной базы и манифест dump.json, поэтому
+базу можно развернуть без разбора JSON. Поддерживаются два формата:
+  - directory: pg_dump -Fd, восстанавливается параллельно через pg_restore -j N;
+  - copy: по файлу на таблицу в текстовом формате COPY (gzip), восстанавливается
+    в процессе - таблицы одного уровня зависимостей загружаются параллельно
+    в отдельных соединениях.
+Формат copy используется, когда утилиты PostgreSQL недоступны.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from peewee import AutoField
+
+from core.cancellation import OperationCancelled
+from core.config_manager import DUMPS_DIR
+from core.copy_loader import reset_serial_sequence
+from core.manifest import get_table_name, get_table_dependencies, load_valid_manifest, file_sha256
+from core.mock_data import get_dataset_path, get_table_file
+from core.sync import SYNC_TABLES_TABLE, SYNC_ROWS_TABLE
+
+DUMP_MANIFEST_FILENAME = 'dump.json'
+DUMP_VERSION = 1
+
+FORMAT_DIRECTORY = 'directory'
+FORMAT_COPY = 'copy'
+DUMP_FORMATS = (FORMAT_DIRECTORY, FORMAT_COPY)
+
+# Подпапки с данными дампа для каждого формата
+DIRECTORY_DATA = 'pgdump'
+COPY_DATA = 'tables'
+
+DEFAULT_RESTORE_JOBS = 4
+
+# Служебные таблицы синхронизации переносятся вместе с данными
+SYNC_STORE_COLUMNS = {
+    SYNC_TABLES_TABLE: ['table_name', 'file_hash'],
+    SYNC_ROWS_TABLE: ['table_name', 'pk', 'row_hash'],
+}
+
+
+def get_dump_path(db_name):
+    """Возвращает путь к папке дампа базы"""
+    return os.path.join(DUMPS_DIR, db_name)
+
+
+def find_pg_tool(name):
+    """Путь к утилите PostgreSQL (pg_dump, pg_restore) или None"""
+    return shutil.which(name)
+
+
+def choose_dump_format(requested=None):
+    """Формат дампа: запрошенный или directory, если доступен pg_dump"""
+    if requested:
+        return requested
+    return FORMAT_DIRECTORY if find_pg_tool('pg_dump') else FORMAT_COPY
+
+
+def pg_tool_command(tool, config, *args):
+    """Командная строка утилиты PostgreSQL с параметрами подключения"""
+    return [
+        find_pg_tool(tool) or tool,
+        '-h', str(config.get('host', 'localhost')),
+        '-p', str(config.get('port', 5432)),
+        '-U', str(config.get('user', 'postgres')),
+        *args
+    ]
+
+
+def pg_tool_env(config):
+    """Окружение для утилит PostgreSQL (пароль передается через PGPASSWORD)"""
+    env = os.environ.copy()
+    if config.get('password'):
+        env['PGPASSWORD'] = config['password']
+    return env
+
+
+def run_pg_tool(command, env, cancel_token, poll_interval=0.1):
+    """
+    Запускает утилиту PostgreSQL и ждет ее завершения, проверяя токен отмены.
+    При отмене процесс завершается и выбрасывается OperationCancelled.
+    """
+    with tempfile.TemporaryFile() as stderr:
+        process = subprocess.Popen(command, env=env, stdout=subprocess.DEVNULL, stderr=stderr)
+        while process.poll() is None:
+            if cancel_token.is_cancelled:
+                process.terminate()
+                process.wait()
+                raise OperationCancelled("Операция отменена пользователем")
+            time.sleep(poll_interval)
+
+        if process.returncode != 0:
+            stderr.seek(0)
+            message = stderr.read().decode('utf-8', errors='replace').strip()
+            raise RuntimeError(f"{os.path.basename(command[0])} завершился с кодом {process.returncode}: {message}")
+
+
+def dataset_fingerprint(db_config, models):
+    """Отпечаток набора данных: хеши файлов таблиц (из манифеста, если он актуален)"""
+    dataset_path = get_dataset_path(db_config)
+    manifest, _ = load_valid_manifest(dataset_path)
+    entries = manifest['tables'] if manifest else {}
+
+    hashes = {}
+    for model in models:
+        table_name = get_table_name(model)
+        file_path = get_table_file(dataset_path, table_name)
+        if table_name in entries:
+            hashes[table_name] = entries[table_name]['sha256']
+        elif os.path.exists(file_path):
+            hashes[table_name] = file_sha256(file_path)
+
+    return hashlib.sha256(json.dumps(hashes, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def get_dump_tables(database, models):
+    """Описание таблиц дампа: колонки, serial колонка и зависимости"""
+    dependencies = get_table_dependencies(models)
+    tables = {}
+    for model in models:
+        table_name = get_table_name(model)
+        pk = model._meta.primary_key
+        tables[table_name] = {
+            'columns': [field.column_name for field in model._meta.sorted_fields],
+            'serial': pk.column_name if isinstance(pk, AutoField) else None,
+            'depends_on': dependencies[table_name],
+        }
+
+    for table_name, columns in SYNC_STORE_COLUMNS.items():
+        if database.table_exists(table_name):
+            tables[table_name] = {'columns': columns, 'serial': None, 'depends_on': []}
+
+    return tables
+
+
+def count_rows(database, tables):
+    """Дополняет описание таблиц числом строк"""
+    for table_name, entry in tables.items():
+        entry['rows'] = database.execute_sql(f'SELECT COUNT(*) FROM "{table_name}"').fetchone()[0]
+
+
+def _column_list(entry):
+    return ', '.join(f'"{column}"' for column in entry['columns'])
+
+
+def export_copy_tables(database, dump_path, tables):
+    """Выгружает таблицы в файлы COPY (gzip) в процессе"""
+    data_path = os.path.join(dump_path, COPY_DATA)
+    os.makedirs(data_path, exist_ok=True)
+
+    for table_name, entry in tables.items():
+        entry['file'] = f"{table_name}.copy.gz"
+        cursor = database.cursor()
+        with gzip.open(os.path.join(data_path, entry['file']), 'wt', encoding='utf-8') as f:
+            # COPY (SELECT ...) работает и для секционированных таблиц
+            cursor.copy_expert(f'COPY (SELECT {_column_list(entry)} FROM "{table_name}") TO STDOUT', f)
+        entry['rows'] = cursor.rowcount
+
+
+def build_dump_manifest(db_config, dump_format, tables, source_fingerprint):
+    """Манифест дампа. fingerprint однозначно определяет содержимое дампа"""
+    created_at = datetime.now().isoformat(timespec='seconds')
+    fingerprint = hashlib.sha256(
+        f"{db_config['db_name']}|{dump_format}|{created_at}|{source_fingerprint}".encode('utf-8')
+    ).hexdigest()
+
+    return {
+        'version': DUMP_VERSION,
+        'database': db_config['db_name'],
+        'format': dump_format,
+        'created_at': created_at,
+        'dataset_fingerprint': source_fingerprint,
+        'fingerprint': fingerprint,
+        'tables': tables,
+    }
+
+
+def save_dump_manifest(dump_path, manifest):
+    path = os.path.join(dump_path, DUMP_MANIFEST_FILENAME)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+    return path
+
+
+def load_dump_manifest(dump_path):
+    """Читает манифест дампа (или None, если дампа нет)"""
+    path = os.path.join(dump_path, DUMP_MANIFEST_FILENAME)
+    if not os.path.exists(path):
+        return None
+
+    with open(path, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+
+    if manifest.get('version') != DUMP_VERSION:
+        return None
+    return manifest
+
+
+def get_table_levels(tables):
+    """
+    Разбивает таблицы на уровни: таблицы одного уровня не ссылаются друг
+    на друга и могут загружаться параллельно.
+    """
+    remaining = dict(tables)
+    loaded = set()
+    levels = []
+    while remaining:
+        level = [name for name, entry in remaining.items()
+                 if all(dep in loaded or dep not in tables for dep in entry['depends_on'])]
+        if not level:
+            # Циклические ссылки: оставшиеся таблицы загружаются последовательно
+            level = [next(iter(remaining))]
+        levels.append(level)
+        for name in level:
+            loaded.add(name)
+            remaining.pop(name)
+    return levels
+
+
+def restore_copy_tables(database, dump_path, manifest, jobs, cancel_token, on_table_done=None):
+    """
+    Восстанавливает данные формата copy. Таблицы одного уровня загружаются
+    параллельно, каждая в своем соединении и своей транзакции.
+    """
+    tables = manifest['tables']
+    for level in get_table_levels(tables):
+        cancel_token.raise_if_cancelled()
+        with ThreadPoolExecutor(max_workers=max(1, min(jobs, len(level)))) as pool:
+            futures = {
+                name: pool.submit(_restore_copy_table, database, dump_path, name, tables[name], cancel_token)
+                for name in level
+            }
+            for name, future in futures.items():
+                duration = future.result()
+                if on_table_done:
+                    on_table_done(name, tables[name]['rows'], duration)
+
+
+def _restore_copy_table(database, dump_path, table_name, entry, cancel_token):
+    """Загружает одну таблицу в отдельном соединении (соединения peewee привязаны к потоку)"""
+    started = time.perf_counter()
+    database.connect(reuse_if_open=True)
+    pid = database.connection().get_backend_pid()
+    cancel_token.register_backend(pid)
+
+    try:
+        cancel_token.raise_if_cancelled()
+        with database.atomic():
+            with gzip.open(os.path.join(dump_path, COPY_DATA, entry['file']), 'rt', encoding='utf-8') as f:
+                database.cursor().copy_expert(f'COPY "{table_name}" ({_column_list(entry)}) FROM STDIN', f)
+            if entry['serial']:
+                reset_serial_sequence(database, table_name, entry['serial'])
+    except OperationCancelled:
+        raise
+    except Exception:
+        # Запрос, прерванный pg_cancel_backend, означает отмену операции
+        cancel_token.raise_if_cancelled()
+        raise
+    finally:
+        cancel_token.unregister_backend(pid)
+        database.close()
+
+    return time.perf_counter() - started
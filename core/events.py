@@ -0,0 +1,195 @@
+"""
+Шина событий для передачи прогресса операций с базами данных.
+
+DatabaseManager публикует типизированные события (сообщения лога, начало и
+окончание фаз, прогресс загрузки таблиц), а CLI, GUI и JSON отчет
+подписываются на них. Шина потокобезопасна и может использоваться
+одновременно несколькими рабочими потоками.
+"""
+
+import threading
+import time
+import traceback
+from dataclasses import dataclass, field
+
+# Фазы операций
+PHASE_CREATE = 'create'
+PHASE_CLEAN = 'clean'
+PHASE_DROP = 'drop'
+PHASE_DDL = 'ddl'
+PHASE_LOAD = 'load'
+PHASE_STATS = 'stats'
+PHASE_SYNC = 'sync'
+PHASE_EXPORT = 'export'
+PHASE_RESTORE = 'restore'
+PHASE_INDEXES = 'indexes'
+PHASE_MAINTENANCE = 'maintenance'
+PHASE_VALIDATE = 'validate'
+PHASE_RELOAD = 'reload'
+PHASE_VERIFY = 'verify'
+
+
+@dataclass(frozen=True)
+class Event:
+    """Базовое событие шины."""
+    database: str = ''
+    timestamp: float = field(default_factory=time.time)
+
+
+@dataclass(frozen=True)
+class LogMessage(Event):
+    """Текстовое сообщение для вывода пользователю."""
+    text: str = ''
+
+
+@dataclass(frozen=True)
+class PhaseStarted(Event):
+    """Начало фазы операции (создание таблиц, загрузка данных и т.д.)."""
+    phase: str = ''
+
+
+@dataclass(frozen=True)
+class PhaseFinished(Event):
+    """Окончание фазы операции с длительностью в секундах."""
+    phase: str = ''
+    duration: float = 0.0
+    success: bool = True
+
+
+@dataclass(frozen=True)
+class TableStarted(Event):
+    """Начало загрузки таблицы (до чтения файла с данными)."""
+    table: str = ''
+
+
+@dataclass(frozen=True)
+class TableProgress(Event):
+    """Прогресс загрузки таблицы."""
+    table: str = ''
+    done: int = 0
+    total: int = 0
+    errors: int = 0
+    elapsed: float = 0.0
+    # Объем обработанных исходных данных (оценка по среднему размеру записи)
+    bytes: int = 0
+
+    @property
+    def percent(self):
+        """Процент загруженных записей (0-100)."""
+        if self.total <= 0:
+            return 100
+        return min(100, int(self.done * 100 / self.total))
+
+    @property
+    def rate(self):
+        """Скорость загрузки, записей в секунду."""
+        if self.elapsed <= 0:
+            return 0.0
+        return self.done / self.elapsed
+
+    @property
+    def eta(self):
+        """Оценка оставшегося времени в секундах (или None, если неизвестна)."""
+        if self.done <= 0 or self.total <= 0:
+            return None
+        return max(0.0, (self.total - self.done) / self.rate) if self.rate else None
+
+
+@dataclass(frozen=True)
+class TableFinished(Event):
+    """Итог загрузки таблицы."""
+    table: str = ''
+    inserted: int = 0
+    errors: int = 0
+    duration: float = 0.0
+
+
+@dataclass(frozen=True)
+class MaintenanceStep(Event):
+    """Шаг обслуживания таблицы (VACUUM, прогрев) с длительностью в секундах."""
+    table: str = ''
+    step: str = ''
+    duration: float = 0.0
+    pages: int = 0
+    visible_pages: int = 0
+    method: str = ''
+
+
+@dataclass(frozen=True)
+class CancelCompleted(Event):
+    """Отмена завершена: latency - время от запроса отмены до простоя."""
+    latency: float = 0.0
+
+
+class EventBus:
+    """Потокобезопасная шина событий с подпиской по типу события."""
+
+    def __init__(self):
+        self._subscribers = []
+        self._lock = threading.Lock()
+
+    def subscribe(self, callback, event_types=None):
+        """
+        Подписывает callback на события.
+
+        Args:
+            callback: Функция, принимающая событие
+            event_types: Кортеж типов событий (по умолчанию - все события)
+        """
+        with self._lock:
+            self._subscribers.append((callback, event_types or (Event,)))
+        return callback
+
+    def unsubscribe(self, callback):
+        """Отписывает callback от всех событий."""
+        with self._lock:
+            self._subscribers = [(cb, types) for cb, types in self._subscribers if cb is not callback]
+
+    def publish(self, event):
+        """Рассылает событие подписчикам (в потоке публикующего)."""
+        with self._lock:
+            subscribers = list(self._subscribers)
+
+        for callback, event_types in subscribers:
+            if not isinstance(event, event_types):
+                continue
+            try:
+                callback(event)
+            except Exception:
+                # Ошибка подписчика не должна прерывать операцию с БД
+                traceback.print_exc()
+
+
+class ProgressThrottle:
+    """
+    Ограничивает частоту публикации прогресса на стороне источника.
+
+    Для каждого ключа (база, таблица) событие отправляется не чаще, чем раз
+    в min_interval секунд. Финальные события отправляются всегда.
+    """
+
+    def __init__(self, event_bus, min_interval=0.1):
+        self.event_bus = event_bus
+        self.min_interval = min_interval
+        self._last_sent = {}
+        self._lock = threading.Lock()
+
+    def publish(self, event, force=False):
+        """Публикует событие, если прошел интервал или force=True."""
+        key = (event.database, getattr(event, 'table', ''))
+        now = time.monotonic()
+
+        with self._lock:
+            last = self._last_sent.get(key)
+            if not force and last is not None and now - last < self.min_interval:
+                return False
+            self._last_sent[key] = now
+
+        self.event_bus.publish(event)
+        return True
+
+
+def print_log_event(event):
+    """Подписчик для консоли: печатает текстовые сообщения в stdout."""
+    if isinstance(event, LogMessage):
+        print(event.text)
@@ -0,0 +1,313 @@
+"""
+Создание баз на нескольких серверах PostgreSQL одновременно (режим --fan-out).
+
+Серверы перечисляются в JSON файле - списке настроек подключения:
+
+    [
+        {"name": "room-101", "host": "10.0.1.5"},
+        {"name": "room-102", "host": "10.0.2.5", "port": 5433, "password": "secret"}
+    ]
+
+Недостающие параметры берутся из config/postgres.json, name по умолчанию -
+host:port.
+
+Наборы данных читаются и кодируются в текстовый формат COPY один раз:
+подготовленный набор - те же SQL операторы и блоки COPY, что в скрипте
+--emit-sql, но в памяти. Затем он передается на все серверы одновременно.
+У каждого сервера свои потоки (не больше --host-jobs баз одновременно),
+общих блокировок между серверами нет, поэтому медленный или недоступный
+сервер не задерживает остальные.
+
+База на сервере создается одной транзакцией: при ошибке на ней остаются
+прежние таблицы. Служебные таблицы синхронизации не создаются (как у
+--emit-sql).
+"""
+
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+import psycopg2
+from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
+
+from core.cancellation import CancellationToken, OperationCancelled
+from core.sql_script import ScriptCopy, iter_script_parts
+from core.templates import database_exists
+
+DEFAULT_HOST_JOBS = 2
+DEFAULT_CONNECT_TIMEOUT = 10
+
+# Размер куска данных COPY, передаваемого серверу за один раз
+COPY_READ_SIZE = 1 << 20
+
+STATUS_OK = 'ok'
+STATUS_FAILED = 'failed'
+STATUS_CANCELLED = 'cancelled'
+
+FANOUT_TABLE_HEADERS = ['сервер', 'статус', 'баз', 'строк', 'МБ', 'время, с', 'МБ/с', 'строк/с']
+
+
+class PreparedCopy:
+    """Блок данных COPY, закодированный в памяти."""
+
+    def __init__(self, table_name, sql, data, rows):
+        self.table_name = table_name
+        self.sql = sql
+        self.data = data
+        self.rows = rows
+
+
+class PreparedDataset:
+    """Набор данных, готовый к загрузке: SQL операторы и блоки COPY по порядку."""
+
+    def __init__(self, db_name, parts):
+        self.db_name = db_name
+        self.parts = parts
+        self.rows = sum(part.rows for part in parts if isinstance(part, PreparedCopy))
+        self.size = sum(len(part.data) for part in parts if isinstance(part, PreparedCopy))
+
+
+def prepare_dataset(db_config, layout=None, index_profile=None):
+    """Читает и кодирует набор данных один раз для загрузки на все серверы"""
+    parts = []
+    for part in iter_script_parts(db_config, layout, index_profile):
+        if isinstance(part, ScriptCopy):
+            rows = 0
+            buffers = []
+            for buffer, count in part.iter_encoded():
+                buffers.append(buffer)
+                rows += count
+            part = PreparedCopy(part.table_name, part.sql, ''.join(buffers).encode('utf-8'), rows)
+        parts.append(part)
+    return PreparedDataset(db_config['db_name'], parts)
+
+
+def load_hosts(path, defaults):
+    """Серверы из JSON файла с недостающими параметрами из defaults"""
+    with open(path, 'r', encoding='utf-8') as f:
+        entries = json.load(f)
+    if not isinstance(entries, list) or not entries:
+        raise ValueError(f"{path}: ожидается непустой список настроек подключения")
+
+    hosts = []
+    for entry in entries:
+        if not isinstance(entry, dict) or 'host' not in entry:
+            raise ValueError(f"{path}: у каждого сервера должен быть host ({entry!r})")
+        host = {**defaults, **entry}
+        host.setdefault('port', 5432)
+        host.setdefault('name', f"{host['host']}:{host['port']}")
+        hosts.append(host)
+
+    names = [host['name'] for host in hosts]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        raise ValueError(f"{path}: повторяются имена серверов: {', '.join(duplicates)}")
+    return hosts
+
+
+def error_message(error):
+    """Первая строка сообщения об ошибке (без CONTEXT и подсказок сервера)"""
+    lines = str(error).strip().splitlines()
+    return lines[0] if lines else type(error).__name__
+
+
+def connect_host(host, database):
+    """Соединение с базой сервера (с таймаутом подключения)"""
+    return psycopg2.connect(
+        user=host.get('user', 'postgres'),
+        password=host.get('password', ''),
+        host=host['host'],
+        port=host['port'],
+        database=database,
+        connect_timeout=host.get('connect_timeout', DEFAULT_CONNECT_TIMEOUT)
+    )
+
+
+class _CopyReader:
+    """Данные блока COPY для copy_expert: проверяет отмену и считает переданные байты."""
+
+    def __init__(self, data, cancel_token, on_read):
+        self.data = memoryview(data)
+        self.offset = 0
+        self.cancel_token = cancel_token
+        self.on_read = on_read
+
+    def read(self, size=-1):
+        self.cancel_token.raise_if_cancelled()
+        end = len(self.data) if size is None or size < 0 else self.offset + size
+        chunk = self.data[self.offset:end].tobytes()
+        self.offset += len(chunk)
+        self.on_read(len(chunk))
+        return chunk
+
+    def readline(self, size=-1):
+        return self.read(size)
+
+
+class HostResult:
+    """Итог сервера: загруженные базы, строки, переданные байты, время и ошибки."""
+
+    def __init__(self, name):
+        self.name = name
+        self.databases = []
+        self.errors = {}
+        self.rows = 0
+        self.sent = 0
+        self.started = None
+        self.finished = None
+        self.cancelled = False
+        self.unreachable = None
+
+    @property
+    def status(self):
+        if self.cancelled:
+            return STATUS_CANCELLED
+        return STATUS_FAILED if self.errors else STATUS_OK
+
+    @property
+    def duration(self):
+        if self.started is None or self.finished is None:
+            return 0.0
+        return self.finished - self.started
+
+
+class FanOut:
+    """Загрузка подготовленных наборов на несколько серверов."""
+
+    def __init__(self, hosts, jobs=DEFAULT_HOST_JOBS, cancel_token=None, log=print):
+        self.hosts = hosts
+        self.jobs = jobs
+        self.cancel_token = cancel_token or CancellationToken()
+        self.log = log
+        self.results = {host['name']: HostResult(host['name']) for host in hosts}
+
+        self._lock = threading.Lock()
+        self._connections = set()
+
+    def cancel(self):
+        """Отменяет загрузку: запросы на всех серверах прерываются"""
+        self.cancel_token.cancel()
+        self.log("⛔ Запрошена отмена операции...")
+        with self._lock:
+            connections = list(self._connections)
+        for conn in connections:
+            try:
+                conn.cancel()
+            except psycopg2.Error:
+                pass
+
+    def run(self, datasets):
+        """Загружает наборы на все серверы. Возвращает {сервер: HostResult}"""
+        executors = []
+        futures = []
+        for host in self.hosts:
+            executor = ThreadPoolExecutor(max_workers=self.jobs, thread_name_prefix=f"fanout-{host['name']}")
+            executors.append(executor)
+            self.results[host['name']].started = time.perf_counter()
+            futures += [executor.submit(self._load_dataset, host, dataset) for dataset in datasets]
+
+        try:
+            wait(futures)
+        finally:
+            for executor in executors:
+                executor.shutdown(wait=True)
+        return self.results
+
+    def _track(self, conn, active):
+        with self._lock:
+            if active:
+                self._connections.add(conn)
+            else:
+                self._connections.discard(conn)
+
+    def _load_dataset(self, host, dataset):
+        result = self.results[host['name']]
+        started = time.perf_counter()
+        try:
+            self.cancel_token.raise_if_cancelled()
+            if result.unreachable:
+                raise ConnectionError(f"сервер недоступен: {result.unreachable}")
+
+            self._load_on_host(host, dataset, result)
+            duration = time.perf_counter() - started
+            with self._lock:
+                result.databases.append(dataset.db_name)
+                result.rows += dataset.rows
+            self.log(f"✅ {host['name']}: {dataset.db_name} - {dataset.rows} строк, "
+                     f"{dataset.size / 1024 / 1024:.1f} МБ за {duration:.2f} с")
+        except Exception as e:
+            # Отмена приходит как OperationCancelled из чтения данных COPY
+            # или как ошибка прерванного запроса после conn.cancel()
+            if isinstance(e, OperationCancelled) or self.cancel_token.is_cancelled:
+                with self._lock:
+                    result.cancelled = True
+                self.log(f"⛔ {host['name']}: загрузка {dataset.db_name} отменена")
+                return
+            message = error_message(e)
+            with self._lock:
+                result.errors[dataset.db_name] = message
+            self.log(f"❌ {host['name']}: {dataset.db_name} - {message}")
+        finally:
+            with self._lock:
+                result.finished = max(result.finished or 0.0, time.perf_counter())
+
+    def _load_on_host(self, host, dataset, result):
+        """Создает базу на сервере (если ее нет) и загружает набор одной транзакцией"""
+        try:
+            admin = connect_host(host, 'postgres')
+        except psycopg2.OperationalError as e:
+            # Остальные базы этого сервера не ждут таймаута подключения
+            result.unreachable = error_message(e)
+            raise
+        try:
+            admin.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+            cursor = admin.cursor()
+            if not database_exists(cursor, dataset.db_name):
+                cursor.execute(f'CREATE DATABASE "{dataset.db_name}"')
+        finally:
+            admin.close()
+
+        def on_read(size):
+            with self._lock:
+                result.sent += size
+
+        conn = connect_host(host, dataset.db_name)
+        self._track(conn, True)
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SET client_min_messages = warning")
+            for part in dataset.parts:
+                self.cancel_token.raise_if_cancelled()
+                if isinstance(part, PreparedCopy):
+                    cursor.copy_expert(part.sql, _CopyReader(part.data, self.cancel_token, on_read),
+                                       size=COPY_READ_SIZE)
+                else:
+                    cursor.execute(part)
+            conn.commit()
+            return dataset.rows
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            self._track(conn, False)
+            conn.close()
+
+
+def format_host_rows(results):
+    """Строки таблицы серверов: статус, базы, строки, объем, время и скорость"""
+    rows = []
+    for result in results.values():
+        duration = result.duration
+        rows.append([
+            result.name,
+            result.status,
+            len(result.databases),
+            result.rows,
+            f"{result.sent / 1024 / 1024:.1f}",
+            f"{duration:.2f}",
+            f"{result.sent / 1024 / 1024 / duration:.1f}" if duration else '-',
+            f"{result.rows / duration:.0f}" if duration else '-',
+        ])
+    return rows
+
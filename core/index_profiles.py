@@ -0,0 +1,127 @@
+"""
+Профили индексов наборов данных.
+
+Уникальные индексы моделей (ограничения целостности) есть в любом профиле.
+Вторичные индексы выбираются профилем:
+  - minimal: без вторичных индексов;
+  - default: индексы, объявленные в моделях (Meta.indexes и индексы внешних ключей);
+  - профили из INDEX_PROFILES модуля моделей, например oltp и analytical.
+
+Профиль применяется к существующей базе без перезагрузки данных: лишние
+вторичные индексы удаляются, недостающие создаются.
+"""
+
+import time
+
+PROFILE_MINIMAL = 'minimal'
+PROFILE_DEFAULT = 'default'
+
+
+class IndexSpec:
+    """Описание индекса: таблица, колонки, метод доступа, INCLUDE и WHERE."""
+
+    def __init__(self, name, table, columns, method='btree', unique=False, include=None, where=None):
+        self.name = name
+        self.table = table
+        self.columns = list(columns)
+        self.method = method
+        self.unique = unique
+        self.include = list(include or [])
+        self.where = where
+
+    @classmethod
+    def from_model_index(cls, model, index):
+        """Описание индекса, объявленного в модели peewee"""
+        columns = [getattr(expression, 'column_name', str(expression)) for expression in index._expressions]
+        return cls(index._name, model._meta.table_name, columns, unique=index._unique)
+
+    def create_sql(self):
+        unique = 'UNIQUE ' if self.unique else ''
+        columns = ', '.join(f'"{column}"' for column in self.columns)
+        sql = f'CREATE {unique}INDEX IF NOT EXISTS "{self.name}" ON "{self.table}" USING {self.method} ({columns})'
+        if self.include:
+            sql += ' INCLUDE (' + ', '.join(f'"{column}"' for column in self.include) + ')'
+        if self.where:
+            sql += f' WHERE {self.where}'
+        return sql
+
+    def drop_sql(self):
+        return f'DROP INDEX IF EXISTS "{self.name}"'
+
+
+def get_model_indexes(models):
+    """Индексы, объявленные в моделях"""
+    return [IndexSpec.from_model_index(model, index)
+            for model in models for index in model._meta.fields_to_index()]
+
+
+def get_unique_indexes(models):
+    """Уникальные индексы моделей - входят в любой профиль"""
+    return [index for index in get_model_indexes(models) if index.unique]
+
+
+def get_index_profiles(models_module):
+    """Профили индексов набора данных: {имя: [IndexSpec]} (только вторичные индексы)"""
+    models = models_module.get_models()
+    profiles = {
+        PROFILE_MINIMAL: [],
+        PROFILE_DEFAULT: [index for index in get_model_indexes(models) if not index.unique],
+    }
+
+    for name, declaration in getattr(models_module, 'INDEX_PROFILES', {}).items():
+        base = profiles[declaration.get('extends', PROFILE_MINIMAL)]
+        profiles[name] = base + list(declaration['indexes'])
+    return profiles
+
+
+def get_secondary_indexes(database, tables):
+    """Текущие вторичные (неуникальные) индексы таблиц: {имя: таблица}"""
+    cursor = database.execute_sql("""
+        SELECT i.relname, t.relname
+        FROM pg_index x
+        JOIN pg_class i ON i.oid = x.indexrelid
+        JOIN pg_class t ON t.oid = x.indrelid
+        JOIN pg_namespace n ON n.oid = t.relnamespace
+        WHERE n.nspname = 'public' AND t.relname = ANY(%s)
+          AND NOT x.indisunique AND NOT x.indisprimary
+    """, (list(tables),))
+    return dict(cursor.fetchall())
+
+
+def detect_profile(database, models_module):
+    """Имя профиля, которому соответствуют индексы базы (или None)"""
+    tables = [model._meta.table_name for model in models_module.get_models()]
+    current = set(get_secondary_indexes(database, tables))
+    for name, indexes in get_index_profiles(models_module).items():
+        if current == {index.name for index in indexes}:
+            return name
+    return None
+
+
+def create_indexes(database, indexes):
+    """Создает индексы, возвращает [(имя, секунды)]"""
+    timings = []
+    for index in indexes:
+        started = time.perf_counter()
+        database.execute_sql(index.create_sql())
+        timings.append((index.name, time.perf_counter() - started))
+    return timings
+
+
+def apply_index_profile(database, models_module, profile):
+    """
+    Приводит вторичные индексы базы к профилю. Возвращает (удаленные индексы,
+    [(созданный индекс, секунды)]). Выполняется в одной транзакции.
+    """
+    target = get_index_profiles(models_module)[profile]
+    target_names = {index.name for index in target}
+    tables = [model._meta.table_name for model in models_module.get_models()]
+
+    with database.atomic():
+        current = get_secondary_indexes(database, tables)
+        dropped = sorted(name for name in current if name not in target_names)
+        for name in dropped:
+            database.execute_sql(f'DROP INDEX IF EXISTS "{name}"')
+        created = create_indexes(database, [index for index in target if index.name not in current])
+
+    return dropped, created
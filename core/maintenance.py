@@ -0,0 +1,136 @@
+"""
+Обслуживание базы после загрузки данных.
+
+Сразу после загрузки у таблиц нет карты видимости, а данные не в кэше:
+index-only scan обращается к таблице, первые запросы читают с диска.
+Этап обслуживания выполняет:
+  - VACUUM (ANALYZE) - статистика планировщика и карта видимости;
+  - прогрев таблиц и их индексов через pg_prewarm (если расширение
+    недоступно - последовательным чтением таблицы).
+
+Таблицы (у секционированных - каждая секция) обрабатываются параллельно,
+каждая в своем соединении: соединения peewee привязаны к потоку и работают
+в режиме autocommit, поэтому VACUUM выполняется вне транзакции.
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from core.cancellation import OperationCancelled
+
+STEP_VACUUM = 'vacuum'
+STEP_ANALYZE = 'analyze'
+STEP_PREWARM = 'prewarm'
+
+DEFAULT_MAINTENANCE_JOBS = 4
+
+
+class MaintenanceSettings:
+    """Настройки этапа обслуживания: шаги, таблицы для прогрева, число соединений."""
+
+    def __init__(self, vacuum=True, prewarm=False, prewarm_tables=None, jobs=None):
+        self.vacuum = vacuum
+        self.prewarm = prewarm
+        self.prewarm_tables = list(prewarm_tables or [])
+        self.jobs = jobs or DEFAULT_MAINTENANCE_JOBS
+
+    @property
+    def enabled(self):
+        return self.vacuum or self.prewarm
+
+
+def run_parallel(database, tables, jobs, action, cancel_token, on_table_done=None):
+    """
+    Выполняет action(database, table) для таблиц в jobs параллельных
+    соединениях. on_table_done(таблица, результат, секунды) вызывается
+    по мере завершения в порядке таблиц.
+    """
+    if not tables:
+        return
+    with ThreadPoolExecutor(max_workers=max(1, min(jobs, len(tables)))) as pool:
+        futures = {
+            table: pool.submit(_run_table_step, database, table, action, cancel_token)
+            for table in tables
+        }
+        for table, future in futures.items():
+            result, duration = future.result()
+            if on_table_done:
+                on_table_done(table, result, duration)
+
+
+def _run_table_step(database, table, action, cancel_token):
+    """Шаг обслуживания одной таблицы в отдельном соединении"""
+    started = time.perf_counter()
+    database.connect(reuse_if_open=True)
+    pid = database.connection().get_backend_pid()
+    cancel_token.register_backend(pid)
+
+    try:
+        cancel_token.raise_if_cancelled()
+        result = action(database, table)
+    except OperationCancelled:
+        raise
+    except Exception:
+        # Запрос, прерванный pg_cancel_backend, означает отмену операции
+        cancel_token.raise_if_cancelled()
+        raise
+    finally:
+        cancel_token.unregister_backend(pid)
+        database.close()
+
+    return result, time.perf_counter() - started
+
+
+def vacuum_analyze(database, table):
+    """VACUUM (ANALYZE) таблицы. Возвращает (страниц, из них видимых целиком)"""
+    database.execute_sql(f'VACUUM (ANALYZE) "{table}"')
+    cursor = database.execute_sql(
+        "SELECT relpages, relallvisible FROM pg_class WHERE oid = %s::regclass", (f'"{table}"',)
+    )
+    return cursor.fetchone()
+
+
+def analyze_table(database, table):
+    """
+    ANALYZE секционированной таблицы: статистику родителя VACUUM секций не
+    собирает, а без нее планировщик оценивает запросы к таблице по умолчанию
+    """
+    database.execute_sql(f'ANALYZE "{table}"')
+    return 0
+
+
+def enable_pg_prewarm(database):
+    """Создает расширение pg_prewarm, если оно есть на сервере"""
+    cursor = database.execute_sql("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_prewarm'")
+    if cursor.fetchone() is None:
+        return False
+    try:
+        database.execute_sql("CREATE EXTENSION IF NOT EXISTS pg_prewarm")
+    except Exception:
+        # Недостаточно прав для создания расширения
+        return False
+    return True
+
+
+def prewarm_table(database, table):
+    """Загружает таблицу и ее индексы в shared buffers. Возвращает число блоков"""
+    cursor = database.execute_sql("""
+        SELECT COALESCE(SUM(pg_prewarm(rel)), 0)
+        FROM (
+            SELECT %s::regclass AS rel
+            UNION ALL
+            SELECT indexrelid::regclass FROM pg_index WHERE indrelid = %s::regclass
+        ) relations
+    """, (f'"{table}"', f'"{table}"'))
+    return cursor.fetchone()[0]
+
+
+def read_table(database, table):
+    """
+    Прогрев без pg_prewarm: последовательное чтение таблицы. Таблицы больше
+    четверти shared_buffers читаются через кольцевой буфер и в кэше не остаются.
+    Возвращает число блоков таблицы.
+    """
+    database.execute_sql(f'SELECT COUNT(*) FROM "{table}"')
+    cursor = database.execute_sql("SELECT relpages FROM pg_class WHERE oid = %s::regclass", (f'"{table}"',))
+    return cursor.fetchone()[0]
@@ -0,0 +1,201 @@
+"""
+Манифест набора данных: mock_data/<папка>/manifest.json.
+
+Для каждой таблицы хранит число записей, размер файла, контрольную сумму
+и зависимости по внешним ключам. Загрузчик использует манифест, чтобы знать
+объем данных до чтения файлов: для точного прогресса и ETA, выбора
+стратегии загрузки (INSERT или COPY) и размера пакета. Хеш содержимого
+таблицы (content_hash) - ожидаемый результат проверки --verify.
+"""
+
+import hashlib
+import importlib
+import json
+import os
+from datetime import datetime
+
+from core.mock_data import get_dataset_path, get_table_file, get_data_size, iter_records
+from core.verification import get_verify_columns, columns_signature, source_content_hash
+
+MANIFEST_FILENAME = 'manifest.json'
+MANIFEST_VERSION = 1
+
+# Таблицы от этого размера загружаются через COPY, меньшие - построчными INSERT
+COPY_THRESHOLD_RECORDS = 1000
+
+# Целевой объем одного пакета COPY и границы размера пакета в записях
+TARGET_CHUNK_BYTES = 4 * 1024 * 1024
+MIN_CHUNK_RECORDS = 500
+MAX_CHUNK_RECORDS = 50000
+
+STRATEGY_INSERT = 'insert'
+STRATEGY_COPY = 'copy'
+
+
+def get_manifest_path(dataset_path):
+    """Возвращает путь к файлу манифеста набора данных"""
+    return os.path.join(dataset_path, MANIFEST_FILENAME)
+
+
+def get_table_name(model):
+    """Имя таблицы модели"""
+    return getattr(model._meta, 'table_name', model.__name__.lower())
+
+
+def get_table_dependencies(models):
+    """Возвращает зависимости таблиц по внешним ключам: {таблица: [таблицы]}"""
+    dependencies = {}
+    for model in models:
+        table_name = get_table_name(model)
+        refs = []
+        for rel_model in model._meta.refs.values():
+            rel_table = get_table_name(rel_model)
+            if rel_table != table_name and rel_table not in refs:
+                refs.append(rel_table)
+        dependencies[table_name] = refs
+    return dependencies
+
+
+def get_dependent_tables(models, tables):
+    """Таблицы вместе со всеми таблицами, которые ссылаются на них (транзитивно)"""
+    dependencies = get_table_dependencies(models)
+    result = set(tables)
+    added = True
+    while added:
+        added = False
+        for table_name, refs in dependencies.items():
+            if table_name not in result and result.intersection(refs):
+                result.add(table_name)
+                added = True
+    return result
+
+
+def file_sha256(file_path):
+    """Считает SHA-256 файла, читая его блоками"""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def build_table_entry(file_path, depends_on, model=None):
+    """
+    Запись манифеста о файле таблицы. С моделью в нее добавляется хеш
+    содержимого для проверки загруженной таблицы (--verify)
+    """
+    stat = os.stat(file_path)
+    data_size = get_data_size(file_path)
+    content = {}
+    if model is None:
+        records = sum(1 for _ in iter_records(file_path))
+    else:
+        columns = get_verify_columns(model)
+        content_hash = source_content_hash(model, iter_records(file_path), columns)
+        records = content_hash.rows
+        content = {'content_hash': content_hash.hexdigest, 'content_columns': columns_signature(columns)}
+    return {
+        'file': os.path.basename(file_path),
+        'records': records,
+        'bytes': stat.st_size,
+        'avg_record_bytes': data_size // records if records else 0,
+        'sha256': file_sha256(file_path),
+        **content,
+        'mtime': stat.st_mtime,
+        'depends_on': depends_on,
+    }
+
+
+def build_manifest(db_config):
+    """Собирает манифест для набора данных базы (файлы читаются потоково)"""
+    dataset_path = get_dataset_path(db_config)
+    models_module = importlib.import_module(db_config['models_module'])
+    models = {get_table_name(model): model for model in models_module.get_models()}
+    dependencies = get_table_dependencies(models.values())
+
+    tables = {}
+    for table_name, depends_on in dependencies.items():
+        file_path = get_table_file(dataset_path, table_name)
+        if os.path.exists(file_path):
+            tables[table_name] = build_table_entry(file_path, depends_on, models[table_name])
+
+    return {
+        'version': MANIFEST_VERSION,
+        'dataset': db_config['mock_data_folder'],
+        'generated_at': datetime.now().isoformat(timespec='seconds'),
+        'tables': tables,
+    }
+
+
+def save_manifest(db_config, manifest):
+    """Записывает манифест в папку набора данных"""
+    path = get_manifest_path(get_dataset_path(db_config))
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+    return path
+
+
+def load_manifest(dataset_path):
+    """Читает манифест набора данных (или None, если его нет)"""
+    path = get_manifest_path(dataset_path)
+    if not os.path.exists(path):
+        return None
+
+    with open(path, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+
+    if manifest.get('version') != MANIFEST_VERSION:
+        return None
+    return manifest
+
+
+def find_stale_tables(dataset_path, manifest):
+    """
+    Сверяет манифест с файлами. Быстрая проверка - по mtime и размеру;
+    при несовпадении mtime (например, после git checkout) сверяется хеш.
+    """
+    stale = []
+    for table_name, entry in manifest['tables'].items():
+        # Файл таблицы мог смениться на другой формат (например, сжатый)
+        file_path = os.path.join(dataset_path, entry['file'])
+        if not os.path.exists(file_path) or get_table_file(dataset_path, table_name) != file_path:
+            stale.append(table_name)
+            continue
+
+        stat = os.stat(file_path)
+        if stat.st_size != entry['bytes']:
+            stale.append(table_name)
+        elif stat.st_mtime != entry['mtime'] and file_sha256(file_path) != entry['sha256']:
+            stale.append(table_name)
+
+    return stale
+
+
+def load_valid_manifest(dataset_path):
+    """
+    Возвращает (манифест, список устаревших таблиц).
+    Записи об устаревших таблицах из манифеста исключаются.
+    """
+    manifest = load_manifest(dataset_path)
+    if manifest is None:
+        return None, []
+
+    stale = find_stale_tables(dataset_path, manifest)
+    for table_name in stale:
+        manifest['tables'].pop(table_name, None)
+    return manifest, stale
+
+
+def choose_strategy(entry):
+    """Выбирает способ загрузки таблицы по числу записей"""
+    if entry and entry['records'] >= COPY_THRESHOLD_RECORDS:
+        return STRATEGY_COPY
+    return STRATEGY_INSERT
+
+
+def choose_chunk_size(entry):
+    """Подбирает размер пакета COPY по среднему размеру записи"""
+    if not entry or not entry.get('avg_record_bytes'):
+        return MIN_CHUNK_RECORDS
+    size = TARGET_CHUNK_BYTES // entry['avg_record_bytes']
+    return max(MIN_CHUNK_RECORDS, min(MAX_CHUNK_RECORDS, size))
@@ -0,0 +1,245 @@
+"""
+Профилирование памяти операций создания баз (режим --memprofile).
+
+MemoryProfiler подписывается на шину событий и для каждой фазы и каждой
+загружаемой таблицы измеряет:
+  - пик и остаток памяти Python по tracemalloc;
+  - RSS процесса в начале, в конце и пиковое значение (фоновый замер);
+  - для таблиц - места с наибольшим приростом выделенной памяти
+    (разница снимков tracemalloc в начале и в конце загрузки).
+
+tracemalloc учитывает память всего процесса, поэтому замеры корректны для
+последовательных операций (CLI). Области вложены: пик внешней фазы
+учитывает пики вложенных фаз и таблиц.
+"""
+
+import os
+import threading
+import time
+import tracemalloc
+
+from core.config_manager import BASE_DIR
+from core.events import PhaseStarted, PhaseFinished, TableStarted, TableFinished
+
+RSS_SAMPLE_INTERVAL = 0.05
+TOP_ALLOCATIONS = 5
+
+
+def current_rss():
+    """Текущий RSS процесса в байтах (или None, если недоступен)"""
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        pass
+
+    try:
+        import resource
+    except ImportError:
+        return None
+    # ru_maxrss - пиковое значение (в КБ на Linux, в байтах на macOS)
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return usage if os.uname().sysname == 'Darwin' else usage * 1024
+
+
+class _RssSampler(threading.Thread):
+    """Фоновый поток, запоминающий максимальный RSS с последнего сброса."""
+
+    def __init__(self, interval):
+        super().__init__(name='rss-sampler', daemon=True)
+        self.interval = interval
+        self.peak = current_rss() or 0
+        self._stop_event = threading.Event()
+        self._lock = threading.Lock()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            self.sample()
+
+    def sample(self):
+        rss = current_rss() or 0
+        with self._lock:
+            self.peak = max(self.peak, rss)
+        return rss
+
+    def reset_peak(self):
+        """Возвращает пик с последнего сброса и начинает отсчет заново"""
+        rss = current_rss() or 0
+        with self._lock:
+            peak = max(self.peak, rss)
+            self.peak = rss
+        return peak, rss
+
+    def stop(self):
+        self._stop_event.set()
+
+
+class _Scope:
+    """Фаза или таблица, для которой собирается статистика памяти."""
+
+    def __init__(self, kind, database, name, traced_start, rss_start, snapshot=None):
+        self.kind = kind
+        self.database = database
+        self.name = name
+        self.traced_start = traced_start
+        self.rss_start = rss_start
+        self.traced_peak = traced_start
+        self.rss_peak = rss_start
+        self.snapshot = snapshot
+        self.started = time.perf_counter()
+
+
+class MemoryProfiler:
+    """Подписчик шины событий, собирающий статистику памяти по фазам и таблицам."""
+
+    def __init__(self, rss_interval=RSS_SAMPLE_INTERVAL, top_allocations=TOP_ALLOCATIONS):
+        self.rss_interval = rss_interval
+        self.top_allocations = top_allocations
+        self.phases = []
+        self.tables = {}
+        self._stack = []
+        self._sampler = None
+        self._lock = threading.Lock()
+        self._traced_peak = 0
+        self._rss_peak = 0
+
+    def start(self):
+        """Включает tracemalloc и фоновый замер RSS"""
+        tracemalloc.start()
+        self._sampler = _RssSampler(self.rss_interval)
+        self._sampler.start()
+
+    def stop(self):
+        """Выключает tracemalloc и замер RSS"""
+        if self._sampler:
+            self._sampler.stop()
+            self._sampler = None
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    def handle(self, event):
+        """Обрабатывает событие шины."""
+        if not tracemalloc.is_tracing():
+            return
+
+        with self._lock:
+            if isinstance(event, PhaseStarted):
+                self._enter('phase', event.database, event.phase)
+            elif isinstance(event, TableStarted):
+                self._enter('table', event.database, event.table)
+            elif isinstance(event, PhaseFinished):
+                self._exit('phase', event.database, event.phase)
+            elif isinstance(event, TableFinished):
+                self._exit('table', event.database, event.table)
+
+    def _collect_peaks(self):
+        """Переносит пики с последнего сброса во все открытые области"""
+        _, traced_peak = tracemalloc.get_traced_memory()
+        rss_peak, rss = self._sampler.reset_peak()
+        tracemalloc.reset_peak()
+
+        self._traced_peak = max(self._traced_peak, traced_peak)
+        self._rss_peak = max(self._rss_peak, rss_peak)
+        for scope in self._stack:
+            scope.traced_peak = max(scope.traced_peak, traced_peak)
+            scope.rss_peak = max(scope.rss_peak, rss_peak)
+        return rss
+
+    def _enter(self, kind, database, name):
+        rss = self._collect_peaks()
+        traced, _ = tracemalloc.get_traced_memory()
+        snapshot = self._take_snapshot() if kind == 'table' else None
+        self._stack.append(_Scope(kind, database, name, traced, rss, snapshot))
+
+    def _exit(self, kind, database, name):
+        # Области закрываются в обратном порядке; незакрытые (после ошибки) пропускаем
+        index = next((i for i in range(len(self._stack) - 1, -1, -1)
+                      if (self._stack[i].kind, self._stack[i].database, self._stack[i].name) == (kind, database, name)),
+                     None)
+        if index is None:
+            return
+
+        rss = self._collect_peaks()
+        traced, _ = tracemalloc.get_traced_memory()
+        scope = self._stack.pop(index)
+        del self._stack[index:]
+
+        entry = {
+            'duration': round(time.perf_counter() - scope.started, 6),
+            'traced_peak': scope.traced_peak - scope.traced_start,
+            'traced_retained': traced - scope.traced_start,
+            'rss_start': scope.rss_start,
+            'rss_end': rss,
+            'rss_peak': scope.rss_peak,
+        }
+
+        if kind == 'table':
+            entry['top_allocations'] = self._top_allocations(scope.snapshot)
+            self.tables.setdefault(database, {})[name] = entry
+        else:
+            self.phases.append({'database': database, 'phase': name, **entry})
+
+    @staticmethod
+    def _take_snapshot():
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+        ))
+
+    def _top_allocations(self, start_snapshot):
+        """Места с наибольшим приростом памяти за время загрузки таблицы"""
+        stats = self._take_snapshot().compare_to(start_snapshot, 'lineno')
+        stats = sorted((stat for stat in stats if stat.size_diff > 0), key=lambda stat: stat.size_diff, reverse=True)
+        top = []
+        for stat in stats[:self.top_allocations]:
+            frame = stat.traceback[0]
+            top.append({
+                'site': f"{_short_path(frame.filename)}:{frame.lineno}",
+                'size': stat.size_diff,
+                'count': stat.count_diff,
+            })
+        return top
+
+    def to_dict(self):
+        """Возвращает статистику памяти для JSON отчета."""
+        with self._lock:
+            return {
+                'rss_sample_interval': self.rss_interval,
+                'traced_peak': self._traced_peak,
+                'rss_peak': self._rss_peak,
+                'phases': list(self.phases),
+                'tables': {db: dict(tables) for db, tables in self.tables.items()},
+            }
+
+    def summary_lines(self):
+        """Краткая сводка по таблицам для вывода в консоль"""
+        lines = []
+        with self._lock:
+            for database, tables in self.tables.items():
+                for table, entry in tables.items():
+                    line = (f"  🧠 {database}.{table}: пик {format_bytes(entry['traced_peak'])}, "
+                            f"остаток {format_bytes(entry['traced_retained'])}, "
+                            f"RSS пик {format_bytes(entry['rss_peak'])}")
+                    if entry['top_allocations']:
+                        top = entry['top_allocations'][0]
+                        line += f" (больше всего: {top['site']}, {format_bytes(top['size'])})"
+                    lines.append(line)
+        return lines
+
+
+def _short_path(filename):
+    """Путь относительно проекта, для библиотек - пакет и модуль"""
+    if filename.startswith(BASE_DIR + os.sep):
+        return os.path.relpath(filename, BASE_DIR)
+    parts = filename.replace('\\', '/').split('/')
+    return '/'.join(parts[-2:])
+
+
+def format_bytes(size):
+    """Размер в удобных единицах"""
+    for unit in ('Б', 'КБ', 'МБ'):
+        if abs(size) < 1024:
+            return f"{size:.0f} {unit}"
+        size /= 1024
+    return f"{size:.1f} ГБ"
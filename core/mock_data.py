@@ -0,0 +1,259 @@
+"""
+Потоковое чтение файлов с моковыми данными.
+
+Файлы mock_data/<папка>/<таблица>.json содержат JSON массив записей,
+<таблица>.jsonl - по одной записи JSON в строке. Оба формата могут быть
+сжаты: .gz, .xz или .zst (для .zst нужен пакет zstandard). iter_records
+разбирает файл по одной записи, распаковывая его потоком, - ни сжатый, ни
+распакованный файл не загружается в память целиком, поэтому подходит и
+для масштабированных наборов данных.
+"""
+
+import gzip
+import io
+import json
+import lzma
+import os
+
+from core.config_manager import MOCK_DATA_DIR
+
+READ_SIZE = 1 << 16
+
+FORMAT_JSON = '.json'
+FORMAT_JSON_LINES = '.jsonl'
+TABLE_FORMATS = (FORMAT_JSON, FORMAT_JSON_LINES)
+COMPRESSIONS = ('', '.gz', '.xz', '.zst')
+
+# Расширения файлов таблиц в порядке предпочтения (если есть несколько файлов одной таблицы)
+TABLE_FILE_SUFFIXES = tuple(table_format + compression
+                            for table_format in TABLE_FORMATS for compression in COMPRESSIONS)
+
+
+def get_dataset_path(db_config):
+    """Возвращает путь к папке с данными базы"""
+    return os.path.join(MOCK_DATA_DIR, db_config['mock_data_folder'])
+
+
+def get_table_file(dataset_path, table_name):
+    """
+    Возвращает путь к файлу с данными таблицы: первый существующий из
+    поддерживаемых форматов (если файла нет - <таблица>.json)
+    """
+    for suffix in TABLE_FILE_SUFFIXES:
+        file_path = os.path.join(dataset_path, table_name + suffix)
+        if os.path.exists(file_path):
+            return file_path
+    return os.path.join(dataset_path, f"{table_name}.json")
+
+
+def split_table_file(file_name):
+    """Имя таблицы и расширение файла данных, или (None, None) для других файлов"""
+    for suffix in sorted(TABLE_FILE_SUFFIXES, key=len, reverse=True):
+        if file_name.endswith(suffix) and len(file_name) > len(suffix):
+            return file_name[:-len(suffix)], suffix
+    return None, None
+
+
+def get_compression(file_path):
+    """Сжатие файла данных по расширению: .gz, .xz, .zst или '' """
+    extension = os.path.splitext(file_path)[1]
+    return extension if extension in COMPRESSIONS else ''
+
+
+class DigestReader(io.RawIOBase):
+    """Поток байтов файла, передающий все прочитанные байты в хеш."""
+
+    def __init__(self, raw, digest):
+        super().__init__()
+        self.raw = raw
+        self.digest = digest
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        size = self.raw.readinto(buffer)
+        if size:
+            self.digest.update(memoryview(buffer)[:size])
+        return size
+
+
+def import_zstandard(file_path):
+    """Модуль zstandard (нужен только для файлов .zst)"""
+    try:
+        import zstandard
+    except ImportError:
+        raise RuntimeError(f"{os.path.basename(file_path)}: для файлов .zst нужен пакет zstandard "
+                           f"(pip install zstandard)") from None
+    return zstandard
+
+
+def open_binary(file_path, source=None):
+    """
+    Открывает файл данных для чтения байтов, распаковывая его потоком.
+    source - уже открытый поток байтов файла (закрывает вызывающий)
+    """
+    compression = get_compression(file_path)
+    if compression == '.gz':
+        return gzip.open(source or file_path, 'rb')
+    if compression == '.xz':
+        return lzma.open(source or file_path, 'rb')
+    if compression == '.zst':
+        zstandard = import_zstandard(file_path)
+        return zstandard.ZstdDecompressor().stream_reader(source or open(file_path, 'rb'), closefd=source is None)
+    return source or open(file_path, 'rb')
+
+
+def open_table_file(file_path, source=None):
+    """Открывает файл данных как текстовый поток (сжатый - с потоковой распаковкой)"""
+    if not get_compression(file_path) and source is None:
+        return open(file_path, 'r', encoding='utf-8')
+    return io.TextIOWrapper(open_binary(file_path, source), encoding='utf-8')
+
+
+def create_table_file(file_path):
+    """Открывает файл данных на запись как текстовый поток (со сжатием по расширению)"""
+    compression = get_compression(file_path)
+    if compression == '.gz':
+        return gzip.open(file_path, 'wt', encoding='utf-8')
+    if compression == '.xz':
+        return lzma.open(file_path, 'wt', encoding='utf-8')
+    if compression == '.zst':
+        zstandard = import_zstandard(file_path)
+        writer = zstandard.ZstdCompressor().stream_writer(open(file_path, 'wb'), closefd=True)
+        return io.TextIOWrapper(writer, encoding='utf-8')
+    return open(file_path, 'w', encoding='utf-8')
+
+
+def write_records(file_path, records):
+    """Записывает записи потоком в файл JSON или JSON Lines (формат и сжатие - по расширению)"""
+    _, suffix = split_table_file(os.path.basename(file_path))
+    json_lines = suffix and suffix.startswith(FORMAT_JSON_LINES)
+    with create_table_file(file_path) as f:
+        if json_lines:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False))
+                f.write('\n')
+            return
+        f.write('[')
+        for i, record in enumerate(records):
+            f.write(',\n  ' if i else '\n  ')
+            f.write(json.dumps(record, ensure_ascii=False))
+        f.write('\n]\n')
+
+
+def get_data_size(file_path):
+    """Размер данных файла после распаковки, в байтах (сжатый файл читается потоком)"""
+    if not get_compression(file_path):
+        return os.path.getsize(file_path)
+    size = 0
+    with open_binary(file_path) as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            size += len(block)
+    return size
+
+
+def iter_records(file_path, digest=None):
+    """
+    Построчно (по записям) читает записи из файла JSON или JSON Lines.
+    digest (объект hashlib) получает байты файла по мере чтения - хеш
+    файла считается без отдельного чтения
+    """
+    _, suffix = split_table_file(os.path.basename(file_path))
+    parse = iter_json_lines if suffix and suffix.startswith(FORMAT_JSON_LINES) else iter_json_array
+    if digest is None:
+        with open_table_file(file_path) as f:
+            yield from parse(f)
+        return
+
+    with open(file_path, 'rb') as raw:
+        source = io.BufferedReader(DigestReader(raw, digest), READ_SIZE)
+        with open_table_file(file_path, source) as f:
+            yield from parse(f)
+            # Байты после конца массива тоже входят в хеш файла
+            for _ in iter(lambda: source.read(READ_SIZE), b''):
+                pass
+
+
+def iter_json_lines(stream):
+    """Разбирает JSON Lines: одна запись в строке, пустые строки пропускаются"""
+    for line_number, line in enumerate(stream, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Строка {line_number}: {e}") from None
+
+
+def iter_json_array(stream, read_size=READ_SIZE):
+    """
+    Разбирает JSON массив из текстового потока, возвращая элементы по одному.
+    В памяти держится только текущий фрагмент файла.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ''
+    pos = 0
+    eof = False
+    started = False
+
+    def refill():
+        nonlocal buffer, pos, eof
+        chunk = stream.read(read_size)
+        if not chunk:
+            eof = True
+        buffer = buffer[pos:] + chunk
+        pos = 0
+
+    while True:
+        # Пропускаем пробелы, разделители и находим начало следующего элемента
+        if pos >= len(buffer):
+            if eof:
+                raise ValueError("Неожиданный конец файла: JSON массив не закрыт")
+            refill()
+            continue
+
+        char = buffer[pos]
+        if char.isspace():
+            pos += 1
+            continue
+        if not started:
+            if char != '[':
+                raise ValueError("Ожидался JSON массив записей")
+            started = True
+            pos += 1
+            continue
+        if char == ',':
+            pos += 1
+            continue
+        if char == ']':
+            return
+
+        try:
+            item, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            refill()
+            continue
+
+        # Число на границе фрагмента могло быть прочитано не полностью
+        if end == len(buffer) and not eof:
+            refill()
+            continue
+
+        pos = end
+        yield item
+
+
+def iter_chunks(records, chunk_size):
+    """Группирует поток записей в списки по chunk_size"""
+    chunk = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
@@ -0,0 +1,233 @@
+"""
+Загрузка одной таблицы через COPY в несколько соединений (--copy-jobs).
+
+Записи таблицы читаются одним потоком и делятся на пакеты, пакеты
+разбирают N потоков: у каждого свое соединение, в котором пакет
+кодируется и загружается своим COPY. Сервер обрабатывает пакеты в N
+процессах одновременно.
+
+Загрузка идет в промежуточную таблицу <таблица>__staging (UNLOGGED, без
+индексов и ограничений, только типы, NOT NULL и значения по умолчанию):
+ее не читают другие соединения, а неудачная загрузка оставляет основную
+таблицу нетронутой. Когда загружены все пакеты, строки переносятся в
+таблицу одним INSERT ... SELECT в транзакции загрузки - таблица получает
+все строки или ни одной, ограничения и внешние ключи проверяются как при
+обычной загрузке.
+
+Промежуточная таблица создается вне транзакции, иначе соединения потоков
+ее не увидят. Поэтому таблицы, загружаемые внутри общей транзакции
+(перезагрузка --watch), загружаются в одном соединении.
+
+Порядок пакетов в промежуточной таблице не определен, поэтому
+автоинкрементный ключ, которого нет в записях, проставляется явно -
+порядковый номер записи (как при загрузке в одном соединении).
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from peewee import AutoField
+
+from core.binary_copy import BinaryCopyEncoder, copy_binary_chunk, supports_binary_copy
+from core.copy_loader import CopyColumn, get_copy_columns, copy_text_chunk, COPY_FORMAT_TEXT, COPY_FORMAT_BINARY
+from core.mock_data import iter_chunks
+from core.sync import record_key
+
+DEFAULT_COPY_JOBS = 1
+
+STAGING_SUFFIX = '__staging'
+
+# Пакетов в очереди на одно соединение: чтение файла не уходит далеко вперед загрузки
+QUEUE_CHUNKS_PER_JOB = 2
+
+# Как часто ожидающие потоки проверяют ошибки и отмену, секунд
+POLL_INTERVAL = 0.1
+
+
+def staging_table_name(table):
+    return f"{table}{STAGING_SUFFIX}"
+
+
+def keyed_records(model, records):
+    """Записи с явным автоинкрементным ключом: если его нет в записи - порядковый номер"""
+    pk = model._meta.primary_key
+    if not isinstance(pk, AutoField):
+        yield from records
+        return
+
+    pk_column = CopyColumn(pk)
+    for position, record in enumerate(records, start=1):
+        if any(key in record for key in pk_column.keys):
+            yield record
+        else:
+            yield dict(record, **{pk_column.name: record_key(pk_column, record, position)})
+
+
+class ParallelCopy:
+    """Загрузка таблицы в несколько соединений через промежуточную таблицу."""
+
+    def __init__(self, database, model, jobs, cancel_token, copy_format=COPY_FORMAT_TEXT, table=None,
+                 log=print, on_progress=None):
+        self.database = database
+        self.model = model
+        self.jobs = max(1, jobs)
+        self.cancel_token = cancel_token
+        self.copy_format = copy_format
+        self.table = table or model._meta.table_name
+        self.staging = staging_table_name(self.table)
+        self.log = log
+        self.on_progress = on_progress
+
+        self.columns = None
+        self.encoder = None
+        self.rows = 0
+        self.errors = 0
+        self.copy_duration = 0.0
+        self.merge_duration = 0.0
+
+        self._lock = threading.Lock()
+        self._failed = threading.Event()
+
+    def _create_staging(self):
+        # Создается в autocommit: промежуточная таблица должна быть видна соединениям потоков.
+        # В открытой транзакции она не видна им до фиксации, и все пакеты завершились бы ошибкой
+        if self.database.in_transaction():
+            raise RuntimeError("загрузка в несколько соединений невозможна внутри транзакции")
+        self.database.execute_sql(f'DROP TABLE IF EXISTS "{self.staging}"')
+        self.database.execute_sql(
+            f'CREATE UNLOGGED TABLE "{self.staging}" (LIKE "{self.table}" INCLUDING DEFAULTS)'
+        )
+
+    def drop_staging(self):
+        """Удаляет промежуточную таблицу"""
+        self.database.execute_sql(f'DROP TABLE IF EXISTS "{self.staging}"')
+
+    def copy_to_staging(self, records, chunk_size):
+        """
+        Загружает записи в промежуточную таблицу в jobs соединений.
+        Возвращает (загружено, ошибок): пакет с ошибкой загружается построчно
+        """
+        started = time.perf_counter()
+        chunks = iter_chunks(keyed_records(self.model, records), chunk_size)
+        first = next(chunks, None)
+        if first is None:
+            return 0, 0
+
+        self.columns = get_copy_columns(self.model, first[0])
+        if self.copy_format == COPY_FORMAT_BINARY and supports_binary_copy(self.columns):
+            self.encoder = BinaryCopyEncoder(self.columns)
+        self._create_staging()
+
+        tasks = queue.Queue(maxsize=self.jobs * QUEUE_CHUNKS_PER_JOB)
+        with ThreadPoolExecutor(max_workers=self.jobs, thread_name_prefix=f"copy-{self.table}") as pool:
+            futures = [pool.submit(self._worker, tasks) for _ in range(self.jobs)]
+            try:
+                self._put(tasks, (0, first))
+                offset = len(first)
+                for chunk in chunks:
+                    self._put(tasks, (offset, chunk))
+                    offset += len(chunk)
+                for _ in futures:
+                    self._put(tasks, None)
+            except BaseException:
+                self._failed.set()
+                raise
+            finally:
+                # Ошибка потока важнее ошибки постановки в очередь, которую она вызвала
+                for future in futures:
+                    future.result()
+
+        self.copy_duration = time.perf_counter() - started
+        return self.rows, self.errors
+
+    def _put(self, tasks, item):
+        """Ставит пакет в очередь, пока ни один поток не завершился с ошибкой"""
+        while True:
+            self.cancel_token.raise_if_cancelled()
+            if self._failed.is_set():
+                raise RuntimeError("загрузка пакета не удалась")
+            try:
+                tasks.put(item, timeout=POLL_INTERVAL)
+                return
+            except queue.Full:
+                continue
+
+    def _worker(self, tasks):
+        """Загружает пакеты из очереди в своем соединении (соединения peewee привязаны к потоку)"""
+        self.database.connect(reuse_if_open=True)
+        pid = self.database.connection().get_backend_pid()
+        self.cancel_token.register_backend(pid)
+        cursor = self.database.cursor()
+        try:
+            while not self._failed.is_set():
+                try:
+                    item = tasks.get(timeout=POLL_INTERVAL)
+                except queue.Empty:
+                    continue
+                if item is None:
+                    return
+                self.cancel_token.raise_if_cancelled()
+                self._copy_chunk(cursor, *item)
+        except BaseException:
+            self._failed.set()
+            raise
+        finally:
+            self.cancel_token.unregister_backend(pid)
+            self.database.close()
+
+    def _copy(self, cursor, chunk):
+        if self.encoder:
+            copy_binary_chunk(cursor, self.model, self.encoder, chunk, table=self.staging)
+        else:
+            copy_text_chunk(cursor, self.model, self.columns, chunk, table=self.staging)
+
+    def _copy_chunk(self, cursor, offset, chunk):
+        errors = 0
+        try:
+            with self.database.atomic():
+                self._copy(cursor, chunk)
+        except Exception as e:
+            # Запрос прерван через pg_cancel_backend
+            self.cancel_token.raise_if_cancelled()
+            self.log(f"    ⚠️ COPY записей {offset + 1}-{offset + len(chunk)} не удался, "
+                     f"загружаем пакет построчно: {str(e).splitlines()[0]}")
+            errors = self._copy_rows(cursor, offset, chunk)
+
+        with self._lock:
+            self.rows += len(chunk) - errors
+            self.errors += errors
+            done = self.rows + self.errors
+            total_errors = self.errors
+        if self.on_progress:
+            self.on_progress(done, total_errors)
+
+    def _copy_rows(self, cursor, offset, chunk):
+        """Построчная загрузка пакета с ошибкой: плохие записи пропускаются. Возвращает число ошибок"""
+        errors = 0
+        for i, record in enumerate(chunk, start=offset + 1):
+            try:
+                with self.database.atomic():
+                    self._copy(cursor, [record])
+            except Exception as e:
+                self.cancel_token.raise_if_cancelled()
+                errors += 1
+                self.log(f"    ⚠️ Ошибка в записи {i}: {str(e).splitlines()[0]}")
+        return errors
+
+    def merge(self):
+        """
+        Переносит строки из промежуточной таблицы в основную. Вызывается в
+        транзакции загрузки. Возвращает число перенесенных строк
+        """
+        if self.columns is None:
+            return 0
+        self.cancel_token.raise_if_cancelled()
+        started = time.perf_counter()
+        column_list = ', '.join(f'"{column.name}"' for column in self.columns)
+        cursor = self.database.execute_sql(
+            f'INSERT INTO "{self.table}" ({column_list}) SELECT {column_list} FROM "{self.staging}"'
+        )
+        self.merge_duration = time.perf_counter() - started
+        return cursor.rowcount
@@ -0,0 +1,161 @@
+"""
+Секционированная раскладка таблиц.
+
+Таблицы-временные ряды (рейсы, заказы) создаются секционированными по
+месяцам (PARTITION BY RANGE). Модуль моделей объявляет их в PARTITIONING:
+{таблица: колонка с датой}. Секции создаются перед загрузкой по диапазону
+дат в файле данных, строки распределяются по секциям сервером при COPY.
+
+Ограничения PostgreSQL:
+  - первичный ключ секционированной таблицы включает ключ секционирования:
+    PRIMARY KEY (id, <колонка>);
+  - внешний ключ может ссылаться только на уникальный ключ целиком, поэтому
+    ссылки на секционированные таблицы (passengers.flight_id,
+    order_items.order_id) создаются без ограничения FOREIGN KEY, остается
+    только индекс. Висячие ссылки проверяет find_dangling_references.
+"""
+
+from datetime import date
+
+from peewee import SQL, Entity, NodeList, EnclosedNodeList, ForeignKeyField
+
+LAYOUT_PLAIN = 'plain'
+LAYOUT_PARTITIONED = 'partitioned'
+LAYOUTS = (LAYOUT_PLAIN, LAYOUT_PARTITIONED)
+
+
+def get_partitioning(models_module):
+    """Секционируемые таблицы набора данных: {таблица: колонка ключа}"""
+    return dict(getattr(models_module, 'PARTITIONING', {}))
+
+
+def get_dangling_references(models, partitioning):
+    """Внешние ключи на секционированные таблицы: [(поле, таблица, колонка)]"""
+    return [(field, model._meta.table_name, field.column_name)
+            for model in models for field in model._meta.sorted_fields
+            if isinstance(field, ForeignKeyField) and field.rel_model._meta.table_name in partitioning]
+
+
+def table_ddl(model, partitioning):
+    """
+    CREATE TABLE для секционированной раскладки: без внешних ключей на
+    секционированные таблицы, для самой секционированной таблицы - составной
+    первичный ключ и PARTITION BY RANGE.
+    """
+    schema = model._schema
+    meta = model._meta
+    column = partitioning.get(meta.table_name)
+
+    ctx = schema._create_context()
+    ctx.literal('CREATE TABLE IF NOT EXISTS ').sql(model).literal(' ')
+
+    columns = []
+    constraints = []
+    for field in meta.sorted_fields:
+        ddl = field.ddl(ctx)
+        if column and field.primary_key:
+            ddl = NodeList([node for node in ddl.nodes if not (isinstance(node, SQL) and node.sql == 'PRIMARY KEY')])
+        columns.append(ddl)
+        if isinstance(field, ForeignKeyField) and field.rel_model._meta.table_name not in partitioning:
+            constraints.append(field.foreign_key_constraint())
+
+    if column:
+        constraints.append(NodeList((SQL('PRIMARY KEY'),
+                                     EnclosedNodeList([Entity(meta.primary_key.column_name), Entity(column)]))))
+    ctx.sql(EnclosedNodeList(columns + constraints))
+
+    if column:
+        ctx.literal(' PARTITION BY RANGE (').sql(Entity(column)).literal(')')
+    return ctx
+
+
+def check_unique_indexes(models, partitioning):
+    """Уникальные индексы секционированной таблицы должны включать ключ секционирования"""
+    for model in models:
+        table = model._meta.table_name
+        unique = [index for index in model._meta.fields_to_index() if index._unique]
+        if table in partitioning and unique:
+            raise ValueError(f"Уникальные индексы таблицы {table} не включают ключ секционирования")
+
+
+def get_date_span(records, column):
+    """Первая и последняя дата колонки в записях (или None)"""
+    first = last = None
+    for record in records:
+        value = record.get(column)
+        if value is None:
+            continue
+        day = value if isinstance(value, date) else date.fromisoformat(str(value)[:10])
+        if first is None or day < first:
+            first = day
+        if last is None or day > last:
+            last = day
+    return (first, last) if first else None
+
+
+def month_ranges(first, last):
+    """Месяцы от first до last включительно: [(начало, начало следующего)]"""
+    ranges = []
+    start = first.replace(day=1)
+    while start <= last:
+        following = date(start.year + start.month // 12, start.month % 12 + 1, 1)
+        ranges.append((start, following))
+        start = following
+    return ranges
+
+
+def partition_name(table, start):
+    return f"{table}_p{start:%Y_%m}"
+
+
+def partition_sql(table, start, end):
+    """CREATE TABLE месячной секции"""
+    return (f'CREATE TABLE "{partition_name(table, start)}" PARTITION OF "{table}" '
+            f'FOR VALUES FROM (\'{start}\') TO (\'{end}\')')
+
+
+def create_month_partitions(database, table, first, last):
+    """Создает недостающие месячные секции на диапазон дат. Возвращает имена созданных"""
+    existing = set(get_leaf_partitions(database, table)) - {table}
+    created = []
+    for start, end in month_ranges(first, last):
+        name = partition_name(table, start)
+        if name in existing:
+            continue
+        database.execute_sql(partition_sql(table, start, end))
+        created.append(name)
+    return created
+
+
+def get_leaf_partitions(database, table):
+    """Секции таблицы (для обычной таблицы - она сама)"""
+    cursor = database.execute_sql(
+        "SELECT relid::regclass::text FROM pg_partition_tree(%s::regclass) WHERE isleaf ORDER BY 1",
+        (f'"{table}"',)
+    )
+    # Для несекционированной таблицы pg_partition_tree ничего не возвращает
+    return [name.strip('"') for name, in cursor.fetchall()] or [table]
+
+
+def get_partitioned_tables(database, tables):
+    """Какие из таблиц базы секционированы"""
+    cursor = database.execute_sql("""
+        SELECT c.relname
+        FROM pg_class c
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE n.nspname = 'public' AND c.relkind = 'p' AND c.relname = ANY(%s)
+    """, (list(tables),))
+    return [name for name, in cursor.fetchall()]
+
+
+def find_dangling_references(database, models, partitioning):
+    """Число ссылок на несуществующие строки секционированных таблиц: [(таблица, колонка, число)]"""
+    result = []
+    for field, table, column in get_dangling_references(models, partitioning):
+        target = field.rel_model._meta
+        cursor = database.execute_sql(
+            f'SELECT COUNT(*) FROM "{table}" t WHERE t."{column}" IS NOT NULL AND NOT EXISTS '
+            f'(SELECT 1 FROM "{target.table_name}" r WHERE r."{field.rel_field.column_name}" = t."{column}")'
+        )
+        result.append((table, column, cursor.fetchone()[0]))
+    return result
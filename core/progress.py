@@ -0,0 +1,201 @@
+"""
+Сводка прогресса операций по базам и таблицам (для панели прогресса GUI).
+
+ProgressBoard - подписчик шины событий: состояние обновляется в потоке,
+публикующем событие, под блокировкой и без вывода. Панель забирает снимок
+состояния по своему таймеру с ограниченной частотой кадров, поэтому
+отрисовка не задерживает загрузку, а частота событий - отрисовку.
+
+Текущая скорость считается по прогрессу за последние RATE_WINDOW секунд
+(средняя с начала таблицы отстает от изменений), оставшееся время - по
+текущей скорости.
+"""
+
+import threading
+from collections import deque
+
+from core.events import (
+    PHASE_CREATE, PHASE_CLEAN, PHASE_DROP, PHASE_DDL, PHASE_LOAD, PHASE_STATS, PHASE_SYNC, PHASE_EXPORT,
+    PHASE_RESTORE, PHASE_INDEXES, PHASE_MAINTENANCE, PHASE_VALIDATE, PHASE_RELOAD, PHASE_VERIFY,
+    PhaseStarted, PhaseFinished, TableStarted, TableProgress, TableFinished,
+)
+
+# Окно для текущей скорости, секунд
+RATE_WINDOW = 3.0
+
+# Фазы, с которых начинается новая операция над базой: прогресс прошлой сбрасывается
+OPERATION_PHASES = (PHASE_CREATE, PHASE_CLEAN, PHASE_SYNC, PHASE_EXPORT, PHASE_RESTORE, PHASE_RELOAD)
+
+PHASE_TITLES = {
+    PHASE_CREATE: 'создание',
+    PHASE_CLEAN: 'очистка',
+    PHASE_DROP: 'удаление таблиц',
+    PHASE_DDL: 'DDL',
+    PHASE_LOAD: 'загрузка',
+    PHASE_STATS: 'статистика',
+    PHASE_SYNC: 'синхронизация',
+    PHASE_EXPORT: 'экспорт дампа',
+    PHASE_RESTORE: 'восстановление дампа',
+    PHASE_INDEXES: 'построение индексов',
+    PHASE_MAINTENANCE: 'VACUUM (ANALYZE)',
+    PHASE_VALIDATE: 'проверка данных',
+    PHASE_RELOAD: 'перезагрузка таблиц',
+    PHASE_VERIFY: 'сверка хешей',
+}
+
+STATE_LOADING = 'loading'
+STATE_DONE = 'done'
+STATE_FAILED = 'failed'
+STATE_STOPPED = 'stopped'
+
+
+class TableState:
+    """Прогресс таблицы: строки, объем данных и отметки для текущей скорости."""
+
+    def __init__(self, table):
+        self.table = table
+        self.done = 0
+        self.total = 0
+        self.errors = 0
+        self.bytes = 0
+        self.elapsed = 0.0
+        self.state = STATE_LOADING
+        self.samples = deque()
+
+    def update(self, event, rate_window):
+        self.done = event.done
+        self.total = event.total
+        self.errors = event.errors
+        self.bytes = event.bytes
+        self.elapsed = event.elapsed
+        self.samples.append((event.elapsed, event.done, event.bytes))
+        while len(self.samples) > 2 and event.elapsed - self.samples[1][0] >= rate_window:
+            self.samples.popleft()
+
+    def finish(self, event):
+        self.done = max(self.done, event.inserted + event.errors)
+        self.total = max(self.total, self.done)
+        self.errors = event.errors
+        self.elapsed = event.duration
+        self.state = STATE_DONE if event.errors == 0 else STATE_FAILED
+
+    def rates(self):
+        """Текущая скорость: (строк/с, байт/с); после загрузки - средняя"""
+        if self.state == STATE_LOADING and len(self.samples) >= 2:
+            first_at, first_done, first_bytes = self.samples[0]
+            last_at, last_done, last_bytes = self.samples[-1]
+            if last_at > first_at:
+                interval = last_at - first_at
+                return (last_done - first_done) / interval, (last_bytes - first_bytes) / interval
+        if self.elapsed > 0:
+            return self.done / self.elapsed, self.bytes / self.elapsed
+        return 0.0, 0.0
+
+    def to_row(self):
+        rows_per_sec, bytes_per_sec = self.rates()
+        eta = None
+        if self.state == STATE_LOADING and self.total > self.done and rows_per_sec > 0:
+            eta = (self.total - self.done) / rows_per_sec
+        return {
+            'table': self.table,
+            'state': self.state,
+            'done': self.done,
+            'total': self.total,
+            'errors': self.errors,
+            'percent': min(100, int(self.done * 100 / self.total)) if self.total else 0,
+            'rows_per_sec': rows_per_sec,
+            'bytes_per_sec': bytes_per_sec,
+            'eta': eta,
+        }
+
+
+class DatabaseState:
+    """Прогресс базы: выполняющиеся фазы (вложенные) и таблицы в порядке загрузки."""
+
+    def __init__(self, name):
+        self.name = name
+        self.phases = []
+        self.tables = {}
+        self.success = None
+
+    @property
+    def phase(self):
+        return self.phases[-1] if self.phases else None
+
+
+class ProgressBoard:
+    """Подписчик шины событий, собирающий прогресс баз и таблиц для панели."""
+
+    def __init__(self, rate_window=RATE_WINDOW):
+        self.rate_window = rate_window
+        self.databases = {}
+        self.version = 0
+        self._lock = threading.Lock()
+
+    def handle(self, event):
+        """Обрабатывает событие шины."""
+        with self._lock:
+            if isinstance(event, TableProgress):
+                self._table(event.database, event.table).update(event, self.rate_window)
+            elif isinstance(event, TableStarted):
+                database = self._database(event.database)
+                database.tables[event.table] = TableState(event.table)
+            elif isinstance(event, TableFinished):
+                self._table(event.database, event.table).finish(event)
+            elif isinstance(event, PhaseStarted):
+                database = self._database(event.database)
+                if event.phase in OPERATION_PHASES and not database.phases:
+                    database.tables.clear()
+                    database.success = None
+                database.phases.append(event.phase)
+            elif isinstance(event, PhaseFinished):
+                database = self._database(event.database)
+                if event.phase in database.phases:
+                    # Фазы вложены: снимаем фазу и все незакрытые внутри нее
+                    del database.phases[database.phases.index(event.phase):]
+                if not database.phases:
+                    database.success = event.success
+                    # Операция прервана (отмена, ошибка) посреди загрузки таблицы
+                    for table in database.tables.values():
+                        if table.state == STATE_LOADING:
+                            table.state = STATE_STOPPED
+            else:
+                return
+            self.version += 1
+
+    def _database(self, name):
+        database = self.databases.get(name)
+        if database is None:
+            database = self.databases[name] = DatabaseState(name)
+        return database
+
+    def _table(self, database, table):
+        tables = self._database(database).tables
+        state = tables.get(table)
+        if state is None:
+            state = tables[table] = TableState(table)
+        return state
+
+    def snapshot(self):
+        """
+        Снимок состояния: список баз со строками таблиц. Фаза - текущая
+        (самая вложенная) или None, если операция над базой завершена
+        """
+        with self._lock:
+            return [
+                {
+                    'database': database.name,
+                    'phase': database.phase,
+                    'phase_title': PHASE_TITLES.get(database.phase, database.phase),
+                    'success': database.success,
+                    'tables': [table.to_row() for table in database.tables.values()],
+                }
+                for database in self.databases.values()
+            ]
+
+    def clear(self):
+        """Убирает базы, операции над которыми завершены"""
+        with self._lock:
+            for name in [name for name, database in self.databases.items() if not database.phases]:
+                del self.databases[name]
+            self.version += 1
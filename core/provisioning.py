@@ -0,0 +1,389 @@
+"""
+Пул готовых копий баз данных (режим --serve).
+
+Для каждого набора данных собирается шаблонная база (<база>__template),
+а из нее заранее создаются неиспользуемые копии <база>__pool_<id>
+командой CREATE DATABASE ... TEMPLATE. Клиент (CI, лабораторная работа)
+запрашивает базу по HTTP и сразу получает готовую копию из пула; пул
+пополняется в фоне. Если готовых копий нет, копия создается во время
+запроса (промах).
+
+Возвращенные базы и базы, срок аренды которых истек, удаляются фоновым
+потоком (DROP DATABASE ... WITH (FORCE) - забытые соединения клиента
+закрываются). При запуске удаляются копии, оставшиеся от прошлого запуска.
+
+HTTP API (JSON):
+    POST /acquire  {"dataset": "school_world"}  -> параметры подключения к копии
+    POST /release  {"database": "school_world__pool_1a2b3c4d"}
+    GET  /status   -> копии в пуле и в аренде по наборам
+    GET  /metrics  -> попадания и промахи пула, задержки выдачи
+"""
+
+import hashlib
+import json
+import secrets
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from core.query_pack import percentile
+from core.templates import get_template_name
+
+POOL_INFIX = '__pool_'
+
+DEFAULT_POOL_SIZE = 2
+DEFAULT_SERVE_HOST = '127.0.0.1'
+DEFAULT_SERVE_PORT = 8765
+DEFAULT_LEASE_TTL = 3600
+
+# Как часто фоновый поток проверяет пул, если его не будят
+MAINTAIN_INTERVAL = 1.0
+
+# Сколько последних задержек хранится для перцентилей
+LATENCY_WINDOW = 1000
+
+
+def pool_fingerprint(dataset_fingerprint, schema_hash, layout, index_profile, validation):
+    """
+    Отпечаток шаблона пула: данные набора, определение моделей
+    (schema_ddl.model_definition_hash) и настройки создания базы
+    """
+    payload = f"pool|{dataset_fingerprint}|{schema_hash}|{layout}|{index_profile or ''}|{validation or ''}"
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def get_pool_prefix(db_name):
+    return f"{db_name}{POOL_INFIX}"
+
+
+def new_pool_name(db_name):
+    """Имя новой копии набора"""
+    return f"{get_pool_prefix(db_name)}{secrets.token_hex(4)}"
+
+
+def clone_database(cursor, db_name, template):
+    """Создает копию шаблона"""
+    cursor.execute(f'CREATE DATABASE "{db_name}" TEMPLATE "{template}"')
+
+
+def drop_database(cursor, db_name):
+    """Удаляет базу, закрывая соединения с ней"""
+    cursor.execute(f'DROP DATABASE IF EXISTS "{db_name}" WITH (FORCE)')
+
+
+def find_pool_databases(cursor, db_name):
+    """Копии набора, существующие на сервере"""
+    # _ в LIKE - любой символ, поэтому имена сравниваются по префиксу
+    prefix = get_pool_prefix(db_name)
+    cursor.execute(
+        "SELECT datname FROM pg_catalog.pg_database WHERE left(datname, %s) = %s ORDER BY 1",
+        (len(prefix), prefix)
+    )
+    return [name for name, in cursor.fetchall()]
+
+
+class PoolError(Exception):
+    """Запрос к пулу не может быть выполнен."""
+
+
+class Lease:
+    """Выданная копия: набор данных и время выдачи."""
+
+    def __init__(self, dataset, database):
+        self.dataset = dataset
+        self.database = database
+        self.leased_at = time.time()
+
+
+class PoolMetrics:
+    """Попадания и промахи пула, задержки выдачи и создания копий."""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.released = 0
+        self.expired = 0
+        self.clones = 0
+        self.acquire_latencies = deque(maxlen=LATENCY_WINDOW)
+        self.clone_latencies = deque(maxlen=LATENCY_WINDOW)
+
+    @staticmethod
+    def _latency_summary(latencies):
+        if not latencies:
+            return {'p50_ms': None, 'p95_ms': None, 'max_ms': None}
+        values = [value * 1000 for value in latencies]
+        return {
+            'p50_ms': round(percentile(values, 50), 3),
+            'p95_ms': round(percentile(values, 95), 3),
+            'max_ms': round(max(values), 3),
+        }
+
+    def to_dict(self):
+        requests = self.hits + self.misses
+        return {
+            'acquire': {
+                'requests': requests,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / requests, 4) if requests else None,
+                **self._latency_summary(self.acquire_latencies),
+            },
+            'clone': {'count': self.clones, **self._latency_summary(self.clone_latencies)},
+            'released': self.released,
+            'expired': self.expired,
+        }
+
+
+class ProvisioningPool:
+    """
+    Пул копий наборов данных. Шаблоны должны быть собраны до start().
+    connect() открывает autocommit-соединение psycopg2 с базой postgres.
+    """
+
+    def __init__(self, datasets, connect, size=DEFAULT_POOL_SIZE, lease_ttl=DEFAULT_LEASE_TTL, log=print):
+        self.datasets = list(datasets)
+        self.connect = connect
+        self.size = size
+        self.lease_ttl = lease_ttl
+        self.log = log
+
+        self.ready = {dataset: deque() for dataset in self.datasets}
+        self.leases = {}
+        self.doomed = deque()
+        self.metrics = {dataset: PoolMetrics() for dataset in self.datasets}
+
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    # ---------- запуск и остановка ----------
+
+    def start(self):
+        """Удаляет копии прошлого запуска и запускает фоновое пополнение"""
+        conn = self.connect()
+        try:
+            cursor = conn.cursor()
+            for dataset in self.datasets:
+                for name in find_pool_databases(cursor, dataset):
+                    drop_database(cursor, name)
+                    self.log(f"🧹 Удалена копия прошлого запуска {name}")
+        finally:
+            conn.close()
+
+        self._thread = threading.Thread(target=self._maintain, name='pool-maintainer', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Останавливает пополнение и удаляет невыданные копии (выданные остаются клиентам)"""
+        self._stopped.set()
+        self._wakeup.set()
+        if self._thread:
+            self._thread.join()
+
+        with self._lock:
+            names = [name for ready in self.ready.values() for name in ready] + list(self.doomed)
+            for ready in self.ready.values():
+                ready.clear()
+            self.doomed.clear()
+        self._drop(names)
+
+        if self.leases:
+            self.log(f"ℹ️ Выданные копии не удалены: {', '.join(sorted(self.leases))}")
+
+    # ---------- запросы клиентов ----------
+
+    def acquire(self, dataset):
+        """Выдает копию набора: из пула или, если он пуст, создает ее. Возвращает (имя, попадание, задержка)"""
+        if dataset not in self.ready:
+            raise PoolError(f"Набор '{dataset}' не обслуживается (доступны: {', '.join(self.datasets)})")
+
+        started = time.perf_counter()
+        with self._lock:
+            name = self.ready[dataset].popleft() if self.ready[dataset] else None
+            hit = name is not None
+            if hit:
+                self.leases[name] = Lease(dataset, name)
+
+        if not hit:
+            name = self._clone(dataset)
+            with self._lock:
+                self.leases[name] = Lease(dataset, name)
+
+        latency = time.perf_counter() - started
+        with self._lock:
+            metrics = self.metrics[dataset]
+            if hit:
+                metrics.hits += 1
+            else:
+                metrics.misses += 1
+            metrics.acquire_latencies.append(latency)
+        self.log(f"📤 Выдана {name} ({'из пула' if hit else 'пул пуст, создана'}) за {latency * 1000:.2f} мс")
+
+        # Пополнение пула после выдачи
+        self._wakeup.set()
+        return name, hit, latency
+
+    def release(self, name):
+        """Возвращает копию: она будет удалена в фоне"""
+        with self._lock:
+            lease = self.leases.pop(name, None)
+            if lease is None:
+                raise PoolError(f"База '{name}' не выдавалась пулом")
+            self.doomed.append(name)
+            self.metrics[lease.dataset].released += 1
+        self.log(f"📥 Возвращена {name}")
+        self._wakeup.set()
+        return lease
+
+    def status(self):
+        """Копии в пуле и в аренде по наборам"""
+        now = time.time()
+        with self._lock:
+            return {
+                dataset: {
+                    'template': get_template_name(dataset),
+                    'ready': len(self.ready[dataset]),
+                    'target': self.size,
+                    'leased': [{'database': lease.database, 'age_s': round(now - lease.leased_at, 1)}
+                               for lease in self.leases.values() if lease.dataset == dataset],
+                }
+                for dataset in self.datasets
+            }
+
+    def metrics_dict(self):
+        with self._lock:
+            return {dataset: metrics.to_dict() for dataset, metrics in self.metrics.items()}
+
+    # ---------- фоновое обслуживание ----------
+
+    def _clone(self, dataset):
+        """Создает копию шаблона набора"""
+        name = new_pool_name(dataset)
+        started = time.perf_counter()
+        conn = self.connect()
+        try:
+            clone_database(conn.cursor(), name, get_template_name(dataset))
+        finally:
+            conn.close()
+
+        with self._lock:
+            metrics = self.metrics[dataset]
+            metrics.clones += 1
+            metrics.clone_latencies.append(time.perf_counter() - started)
+        return name
+
+    def _drop(self, names):
+        if not names:
+            return
+        conn = self.connect()
+        try:
+            cursor = conn.cursor()
+            for name in names:
+                drop_database(cursor, name)
+                self.log(f"🧹 Копия {name} удалена")
+        finally:
+            conn.close()
+
+    def _reap(self):
+        """Удаляет возвращенные копии и копии с истекшей арендой"""
+        now = time.time()
+        with self._lock:
+            for name, lease in list(self.leases.items()):
+                if self.lease_ttl and now - lease.leased_at > self.lease_ttl:
+                    del self.leases[name]
+                    self.doomed.append(name)
+                    self.metrics[lease.dataset].expired += 1
+                    self.log(f"⏰ Аренда {name} истекла")
+            names = list(self.doomed)
+            self.doomed.clear()
+        self._drop(names)
+
+    def _refill(self):
+        """Доводит число готовых копий каждого набора до size"""
+        for dataset in self.datasets:
+            while not self._stopped.is_set():
+                with self._lock:
+                    if len(self.ready[dataset]) >= self.size:
+                        break
+                name = self._clone(dataset)
+                with self._lock:
+                    self.ready[dataset].append(name)
+
+    def _maintain(self):
+        while not self._stopped.is_set():
+            self._wakeup.clear()
+            try:
+                self._reap()
+                self._refill()
+            except Exception as e:
+                self.log(f"⚠️ Ошибка обслуживания пула: {e}")
+            self._wakeup.wait(MAINTAIN_INTERVAL)
+
+
+class _PoolRequestHandler(BaseHTTPRequestHandler):
+    """JSON API пула (экземпляр сервера хранит pool и параметры подключения)"""
+
+    def _send(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_json(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        if not length:
+            return {}
+        return json.loads(self.rfile.read(length))
+
+    def do_GET(self):
+        pool = self.server.pool
+        if self.path == '/status':
+            self._send(200, pool.status())
+        elif self.path == '/metrics':
+            self._send(200, pool.metrics_dict())
+        else:
+            self._send(404, {'error': f"Неизвестный путь {self.path}"})
+
+    def do_POST(self):
+        pool = self.server.pool
+        try:
+            request = self._read_json()
+            if self.path == '/acquire':
+                name, hit, latency = pool.acquire(request.get('dataset'))
+                self._send(200, {
+                    'database': name,
+                    'dataset': request.get('dataset'),
+                    'hit': hit,
+                    'latency_ms': round(latency * 1000, 3),
+                    **self.server.connection_info,
+                })
+            elif self.path == '/release':
+                lease = pool.release(request.get('database'))
+                self._send(200, {'database': lease.database, 'released': True})
+            else:
+                self._send(404, {'error': f"Неизвестный путь {self.path}"})
+        except (PoolError, ValueError) as e:
+            self._send(400, {'error': str(e)})
+        except Exception as e:
+            self._send(500, {'error': str(e)})
+
+    def log_message(self, format, *args):
+        # Запросы не пишутся в консоль - выдача и возврат логируются пулом
+        pass
+
+
+def create_pool_server(pool, config, host=DEFAULT_SERVE_HOST, port=DEFAULT_SERVE_PORT):
+    """HTTP сервер пула (запускается serve_forever в отдельном потоке)"""
+    server = ThreadingHTTPServer((host, port), _PoolRequestHandler)
+    server.daemon_threads = True
+    server.pool = pool
+    server.connection_info = {
+        'host': config.get('host', 'localhost'),
+        'port': config.get('port', 5432),
+        'user': config.get('user', 'postgres'),
+    }
+    return server
@@ -0,0 +1,275 @@
+"""
+Плагин pytest: базы наборов данных для тестов учебных запросов.
+
+Подключение (из корня проекта или с ним в PYTHONPATH):
+
+    pytest -p core.pytest_plugin
+
+или в conftest.py: pytest_plugins = ['core.pytest_plugin'].
+
+Фикстуры <набор>_db (school_world_db, air_travel_db, games_shop_db,
+games_easy_db) дают тесту DatasetDatabase: имя базы, параметры
+подключения и открытое соединение psycopg2.
+
+Набор собирается один раз, как шаблон <набор>__template (тот же, что у
+--serve): если отпечаток данных и настроек совпадает, готовый шаблон
+используется без пересборки. Каждый процесс pytest (каждый воркер
+pytest-xdist) создает из шаблона свою копию <набор>__test_<воркер> и
+держит к ней одно соединение.
+
+Изоляция тестов (--dataset-isolation):
+  - transaction (по умолчанию): тест работает в транзакции копии воркера,
+    после теста она откатывается. Тест не должен вызывать commit();
+  - clone: каждому тесту - новая копия шаблона, после теста она удаляется.
+Маркер @pytest.mark.dataset_isolation('clone') задает изоляцию одного теста.
+
+Время подготовки базы для каждого теста сохраняется в user_properties
+(попадает в отчет --junitxml), сводка печатается в конце сессии.
+"""
+
+import os
+import time
+
+import psycopg2
+import pytest
+from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
+
+from core.config_manager import DATABASES_CONFIG, get_postgres_config
+from core.database_manager import DatabaseManager
+from core.events import EventBus, LogMessage
+from core.provisioning import clone_database, drop_database
+from core.query_pack import percentile
+from core.templates import get_template_name
+
+ISOLATION_TRANSACTION = 'transaction'
+ISOLATION_CLONE = 'clone'
+ISOLATIONS = (ISOLATION_TRANSACTION, ISOLATION_CLONE)
+
+TEST_INFIX = '__test_'
+
+SETUP_PROPERTY = 'dataset_db_setup_ms'
+TEARDOWN_PROPERTY = 'dataset_db_teardown_ms'
+
+# Сколько самых долгих подготовок показывать в сводке
+SLOWEST_SETUPS = 5
+
+# Сколько последних сообщений сборки показывать при ошибке
+ERROR_LOG_LINES = 20
+
+
+def get_worker_id():
+    """Имя воркера pytest-xdist (main без xdist)"""
+    return os.environ.get('PYTEST_XDIST_WORKER', 'main')
+
+
+def connect_admin(config):
+    """Autocommit-соединение с базой postgres"""
+    conn = psycopg2.connect(
+        user=config.get('user', 'postgres'),
+        password=config.get('password', ''),
+        host=config.get('host', 'localhost'),
+        port=config.get('port', 5432),
+        database='postgres'
+    )
+    conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+    return conn
+
+
+class DatasetDatabase:
+    """База набора данных для теста: имя, параметры подключения и соединение."""
+
+    def __init__(self, dataset, name, config):
+        self.dataset = dataset
+        self.name = name
+        self.dsn = {
+            'host': config.get('host', 'localhost'),
+            'port': config.get('port', 5432),
+            'user': config.get('user', 'postgres'),
+            'password': config.get('password', ''),
+            'dbname': name,
+        }
+        self.connection = psycopg2.connect(**self.dsn)
+
+    def fetchall(self, sql, params=None):
+        """Выполняет запрос в соединении теста и возвращает все строки"""
+        with self.connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return cursor.fetchall()
+
+
+class DatasetProvider:
+    """
+    Шаблоны и копии баз наборов для одного процесса pytest. Шаблон и копия
+    воркера создаются при первом обращении к набору
+    """
+
+    def __init__(self, config):
+        self.config = config
+        self.worker = get_worker_id()
+        self.messages = []
+        self.templates = set()
+        self.worker_databases = {}
+        self.clones = 0
+
+        events = EventBus()
+        events.subscribe(lambda event: self.messages.append(event.text), (LogMessage,))
+        self.manager = DatabaseManager(config, event_bus=events)
+
+    def _template(self, dataset):
+        """Имя актуального шаблона набора (собирается один раз за сессию)"""
+        if dataset not in self.templates:
+            if not self.manager.build_templates([dataset]):
+                log = '\n'.join(self.messages[-ERROR_LOG_LINES:])
+                pytest.fail(f"Не удалось собрать шаблон набора {dataset}:\n{log}", pytrace=False)
+            self.templates.add(dataset)
+        return get_template_name(dataset)
+
+    def _clone(self, dataset, name):
+        template = self._template(dataset)
+        conn = connect_admin(self.config)
+        try:
+            cursor = conn.cursor()
+            drop_database(cursor, name)
+            clone_database(cursor, name, template)
+        finally:
+            conn.close()
+        return DatasetDatabase(dataset, name, self.config)
+
+    def worker_database(self, dataset):
+        """Копия набора этого воркера (для изоляции транзакцией)"""
+        database = self.worker_databases.get(dataset)
+        if database is None:
+            database = self._clone(dataset, f"{dataset}{TEST_INFIX}{self.worker}")
+            self.worker_databases[dataset] = database
+        elif database.connection.closed:
+            # Тест закрыл соединение - открываем заново
+            database.connection = psycopg2.connect(**database.dsn)
+        return database
+
+    def clone(self, dataset):
+        """Новая копия набора для одного теста"""
+        self.clones += 1
+        return self._clone(dataset, f"{dataset}{TEST_INFIX}{self.worker}_{self.clones}")
+
+    def drop(self, database):
+        """Закрывает соединение и удаляет копию"""
+        if not database.connection.closed:
+            database.connection.close()
+        conn = connect_admin(self.config)
+        try:
+            drop_database(conn.cursor(), database.name)
+        finally:
+            conn.close()
+
+    def close(self):
+        """Удаляет копии воркера (шаблоны остаются для следующих сессий)"""
+        for database in self.worker_databases.values():
+            self.drop(database)
+        self.worker_databases.clear()
+
+
+def get_isolation(request):
+    """Изоляция теста: маркер dataset_isolation или --dataset-isolation"""
+    marker = request.node.get_closest_marker('dataset_isolation')
+    isolation = marker.args[0] if marker and marker.args else request.config.getoption('dataset_isolation')
+    if isolation not in ISOLATIONS:
+        raise pytest.UsageError(f"Неизвестная изоляция '{isolation}' (доступны: {', '.join(ISOLATIONS)})")
+    return isolation
+
+
+@pytest.fixture(scope='session')
+def dataset_provider():
+    """Шаблоны и копии баз наборов данных процесса pytest"""
+    provider = DatasetProvider(get_postgres_config())
+    yield provider
+    provider.close()
+
+
+def _dataset_fixture(dataset):
+    """Фикстура <набор>_db"""
+
+    @pytest.fixture(name=f'{dataset}_db')
+    def fixture(request, dataset_provider):
+        isolation = get_isolation(request)
+        started = time.perf_counter()
+        if isolation == ISOLATION_CLONE:
+            database = dataset_provider.clone(dataset)
+        else:
+            database = dataset_provider.worker_database(dataset)
+        request.node.user_properties.append((SETUP_PROPERTY, (time.perf_counter() - started) * 1000))
+
+        try:
+            yield database
+        finally:
+            started = time.perf_counter()
+            if isolation == ISOLATION_CLONE:
+                dataset_provider.drop(database)
+            elif not database.connection.closed:
+                database.connection.rollback()
+            request.node.user_properties.append((TEARDOWN_PROPERTY, (time.perf_counter() - started) * 1000))
+
+    fixture.__doc__ = f"База набора {dataset} для теста (изоляция - см. --dataset-isolation)"
+    return fixture
+
+
+for _dataset in DATABASES_CONFIG:
+    globals()[f'{_dataset}_db'] = _dataset_fixture(_dataset)
+
+
+class SetupOverheadReport:
+    """Собирает время подготовки баз из отчетов тестов (в том числе от воркеров xdist)."""
+
+    def __init__(self):
+        self.setups = []
+        self.teardowns = []
+
+    @staticmethod
+    def _property(report, name):
+        for key, value in report.user_properties:
+            if key == name:
+                return value
+        return None
+
+    def pytest_runtest_logreport(self, report):
+        if report.when == 'setup':
+            value = self._property(report, SETUP_PROPERTY)
+            if value is not None:
+                self.setups.append((value, report.nodeid))
+        elif report.when == 'teardown':
+            value = self._property(report, TEARDOWN_PROPERTY)
+            if value is not None:
+                self.teardowns.append(value)
+
+    def pytest_terminal_summary(self, terminalreporter, config):
+        if not self.setups:
+            return
+        setups = [value for value, _ in self.setups]
+        terminalreporter.write_sep('=', 'подготовка баз наборов данных')
+        terminalreporter.write_line(
+            f"Изоляция: {config.getoption('dataset_isolation')}; тестов с базой: {len(setups)}"
+        )
+        terminalreporter.write_line(
+            f"Подготовка: всего {sum(setups):.1f} мс, p50 {percentile(setups, 50):.2f} мс, "
+            f"p95 {percentile(setups, 95):.2f} мс, макс {max(setups):.1f} мс"
+        )
+        if self.teardowns:
+            terminalreporter.write_line(
+                f"Очистка: всего {sum(self.teardowns):.1f} мс, p50 {percentile(self.teardowns, 50):.2f} мс"
+            )
+        terminalreporter.write_line("Самые долгие (первый тест набора включает шаблон и копию воркера):")
+        for value, nodeid in sorted(self.setups, reverse=True)[:SLOWEST_SETUPS]:
+            terminalreporter.write_line(f"  {value:9.2f} мс  {nodeid}")
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup('psql-mock-creator', 'базы наборов данных PSQL Mock Creator')
+    group.addoption('--dataset-isolation', choices=ISOLATIONS, default=ISOLATION_TRANSACTION,
+                    help='Изоляция фикстур <набор>_db: transaction - откат транзакции копии воркера '
+                         '(по умолчанию), clone - новая копия шаблона для каждого теста')
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        'markers', 'dataset_isolation(mode): изоляция базы набора для теста (transaction или clone)'
+    )
+    config.pluginmanager.register(SetupOverheadReport(), 'dataset-setup-overhead')
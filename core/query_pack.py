@@ -0,0 +1,203 @@
+"""
+Учебные наборы запросов и замер их производительности.
+
+Для каждой базы из DATABASES_CONFIG в папке queries/<база>/ лежат запросы
+(по одному в файле .sql, первые строки-комментарии - описание). Раннер
+выполняет каждый запрос N раз, считает p50/p95 времени выполнения и
+сохраняет план EXPLAIN (ANALYZE, BUFFERS). Результаты последнего запуска
+хранятся в query_runs/<база>.json: если структура плана запроса
+изменилась (другие узлы, таблицы или индексы), это отмечается в отчете.
+"""
+
+import json
+import math
+import os
+import time
+from datetime import datetime
+
+from core.config_manager import BASE_DIR, create_database_connection
+
+QUERIES_DIR = os.path.join(BASE_DIR, 'queries')
+QUERY_RUNS_DIR = os.path.join(BASE_DIR, 'query_runs')
+
+DEFAULT_QUERY_RUNS = 10
+DEFAULT_WARMUP_RUNS = 1
+
+PLAN_NEW = 'new'
+PLAN_SAME = 'same'
+PLAN_CHANGED = 'changed'
+
+
+class Query:
+    """Запрос из набора: имя файла, описание и текст."""
+
+    def __init__(self, name, description, sql):
+        self.name = name
+        self.description = description
+        self.sql = sql
+
+
+def get_query_pack_path(db_config):
+    """Папка с запросами базы"""
+    return os.path.join(QUERIES_DIR, db_config['db_name'])
+
+
+def parse_query_file(file_path):
+    """Читает запрос: описание - начальные строки-комментарии"""
+    with open(file_path, 'r', encoding='utf-8') as f:
+        text = f.read()
+
+    description = []
+    for line in text.splitlines():
+        if not line.startswith('--'):
+            break
+        description.append(line[2:].strip())
+
+    name = os.path.splitext(os.path.basename(file_path))[0]
+    return Query(name, ' '.join(description), text.strip().rstrip(';'))
+
+
+def load_query_pack(db_config, names=None):
+    """Запросы набора базы (все или только указанные по имени)"""
+    pack_path = get_query_pack_path(db_config)
+    if not os.path.isdir(pack_path):
+        return []
+
+    queries = [parse_query_file(os.path.join(pack_path, filename))
+               for filename in sorted(os.listdir(pack_path)) if filename.endswith('.sql')]
+    if names:
+        queries = [query for query in queries if query.name in names]
+    return queries
+
+
+def percentile(values, p):
+    """Перцентиль методом ближайшего ранга"""
+    ordered = sorted(values)
+    rank = max(1, math.ceil(p / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def plan_signature(node):
+    """
+    Структура плана без оценок и времени: типы узлов, таблицы, индексы и
+    стратегии соединений. Совпадение сигнатур означает тот же план.
+    """
+    label = node['Node Type']
+    details = [node[key] for key in ('Join Type', 'Strategy', 'Relation Name', 'Index Name') if key in node]
+    if details:
+        label += f"({', '.join(details)})"
+
+    children = node.get('Plans', [])
+    if children:
+        label += '[' + ', '.join(plan_signature(child) for child in children) + ']'
+    return label
+
+
+def get_table_rows(database):
+    """Оценка числа строк таблиц (для сравнения запусков на разных масштабах)"""
+    cursor = database.execute_sql(
+        "SELECT relname, n_live_tup FROM pg_stat_user_tables WHERE schemaname = 'public' ORDER BY relname"
+    )
+    return dict(cursor.fetchall())
+
+
+def run_query(database, query, runs, warmup=DEFAULT_WARMUP_RUNS):
+    """Выполняет запрос runs раз (после прогрева) и снимает план EXPLAIN (ANALYZE, BUFFERS)"""
+    cursor = database.cursor()
+
+    for _ in range(warmup):
+        cursor.execute(query.sql)
+        cursor.fetchall()
+
+    latencies = []
+    rows = 0
+    for _ in range(runs):
+        started = time.perf_counter()
+        cursor.execute(query.sql)
+        rows = len(cursor.fetchall())
+        latencies.append((time.perf_counter() - started) * 1000)
+
+    cursor.execute(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {query.sql}")
+    explain = cursor.fetchone()[0]
+    if isinstance(explain, str):
+        explain = json.loads(explain)
+    plan = explain[0]
+
+    return {
+        'name': query.name,
+        'description': query.description,
+        'runs': runs,
+        'rows': rows,
+        'p50_ms': round(percentile(latencies, 50), 3),
+        'p95_ms': round(percentile(latencies, 95), 3),
+        'min_ms': round(min(latencies), 3),
+        'max_ms': round(max(latencies), 3),
+        'shared_hit_blocks': plan['Plan'].get('Shared Hit Blocks', 0),
+        'shared_read_blocks': plan['Plan'].get('Shared Read Blocks', 0),
+        'plan_signature': plan_signature(plan['Plan']),
+        'plan': plan,
+    }
+
+
+def get_query_run_path(db_config):
+    return os.path.join(QUERY_RUNS_DIR, f"{db_config['db_name']}.json")
+
+
+def load_previous_run(db_config):
+    """Результаты прошлого запуска набора (или None)"""
+    path = get_query_run_path(db_config)
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_run(db_config, result):
+    """Сохраняет результаты запуска для сравнения со следующим"""
+    os.makedirs(QUERY_RUNS_DIR, exist_ok=True)
+    path = get_query_run_path(db_config)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(result, f, indent=2, ensure_ascii=False)
+    return path
+
+
+def compare_plans(previous, result):
+    """Отмечает для каждого запроса, изменился ли план с прошлого запуска"""
+    previous_plans = {}
+    if previous:
+        previous_plans = {query['name']: query['plan_signature'] for query in previous.get('queries', [])}
+
+    for query in result['queries']:
+        old = previous_plans.get(query['name'])
+        if old is None:
+            query['plan_status'] = PLAN_NEW
+        elif old == query['plan_signature']:
+            query['plan_status'] = PLAN_SAME
+        else:
+            query['plan_status'] = PLAN_CHANGED
+            query['previous_plan_signature'] = old
+
+
+def run_query_pack(config, db_config, runs=DEFAULT_QUERY_RUNS, names=None, warmup=DEFAULT_WARMUP_RUNS):
+    """
+    Выполняет набор запросов базы и сравнивает планы с прошлым запуском.
+    Результат сохраняется в query_runs/<база>.json.
+    """
+    queries = load_query_pack(db_config, names)
+
+    database = create_database_connection(db_config['db_name'], config)
+    database.connect()
+    try:
+        result = {
+            'database': db_config['db_name'],
+            'started_at': datetime.now().isoformat(timespec='seconds'),
+            'runs': runs,
+            'table_rows': get_table_rows(database),
+            'queries': [run_query(database, query, runs, warmup) for query in queries],
+        }
+    finally:
+        database.close()
+
+    compare_plans(load_previous_run(db_config), result)
+    save_run(db_config, result)
+    return result
@@ -0,0 +1,96 @@
+"""
+JSON отчет о выполнении операций, собираемый из событий шины.
+"""
+
+import json
+import os
+import threading
+from datetime import datetime
+
+from core.events import CancelCompleted, MaintenanceStep, PhaseFinished, TableFinished, TableProgress
+
+
+class RunReport:
+    """Подписчик шины событий, собирающий тайминги фаз и статистику таблиц."""
+
+    def __init__(self):
+        self.started_at = datetime.now()
+        self.phases = []
+        self.tables = {}
+        self.cancellations = []
+        self.maintenance = []
+        self.sections = {}
+        self._lock = threading.Lock()
+
+    def add_section(self, name, provider):
+        """Добавляет в отчет раздел, значение которого возвращает provider()."""
+        self.sections[name] = provider
+
+    def handle(self, event):
+        """Обрабатывает событие шины."""
+        with self._lock:
+            if isinstance(event, PhaseFinished):
+                self.phases.append({
+                    'database': event.database,
+                    'phase': event.phase,
+                    'duration': round(event.duration, 6),
+                    'success': event.success,
+                })
+            elif isinstance(event, TableProgress):
+                table = self._table_entry(event.database, event.table)
+                table['total'] = event.total
+                table['done'] = event.done
+                table['errors'] = event.errors
+            elif isinstance(event, TableFinished):
+                table = self._table_entry(event.database, event.table)
+                table['inserted'] = event.inserted
+                table['errors'] = event.errors
+                table['duration'] = round(event.duration, 6)
+            elif isinstance(event, MaintenanceStep):
+                step = {
+                    'database': event.database,
+                    'table': event.table,
+                    'step': event.step,
+                    'duration': round(event.duration, 6),
+                    'pages': event.pages,
+                }
+                if event.step == 'vacuum':
+                    step['visible_pages'] = event.visible_pages
+                if event.method:
+                    step['method'] = event.method
+                self.maintenance.append(step)
+            elif isinstance(event, CancelCompleted):
+                self.cancellations.append({
+                    'database': event.database,
+                    'latency': round(event.latency, 6),
+                })
+
+    def _table_entry(self, database, table):
+        return self.tables.setdefault(database, {}).setdefault(table, {})
+
+    def to_dict(self):
+        """Возвращает отчет в виде словаря."""
+        with self._lock:
+            report = {
+                'started_at': self.started_at.isoformat(timespec='seconds'),
+                'finished_at': datetime.now().isoformat(timespec='seconds'),
+                'phases': list(self.phases),
+                'tables': {db: dict(tables) for db, tables in self.tables.items()},
+                'cancellations': list(self.cancellations),
+            }
+            if self.maintenance:
+                report['maintenance'] = list(self.maintenance)
+
+        for name, provider in self.sections.items():
+            report[name] = provider()
+        return report
+
+    def save(self, path):
+        """Сохраняет отчет в JSON файл."""
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=4, ensure_ascii=False)
+
+        print(f"📝 Отчет сохранен в {path}")
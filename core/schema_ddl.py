@@ -0,0 +1,199 @@
+"""
+Предкомпилированный DDL наборов данных.
+
+peewee формирует CREATE TABLE и CREATE INDEX заново при каждом запуске и
+выполняет каждый оператор отдельным запросом к серверу. Здесь DDL набора
+(создание и удаление таблиц) формируется по моделям один раз и хранится
+в cache/ddl/<база>.create.json и <база>.drop.json вместе с хешем
+определения моделей: таблицы, колонки, типы, ограничения, внешние ключи,
+индексы и раскладка. Пока хеш совпадает, DDL берется из кэша без
+генерации peewee.
+
+Создание и удаление выполняются одним пакетом операторов - одним
+запросом к серверу в текущей транзакции.
+"""
+
+import hashlib
+import json
+import os
+
+import peewee
+from peewee import ForeignKeyField, sort_models
+
+from core.checkpoints import CHECKPOINT_STORE_DDL, CHECKPOINT_STORE_DROP_SQL
+from core.config_manager import CACHE_DIR
+from core.index_profiles import get_unique_indexes
+from core.parallel_copy import staging_table_name
+from core.partitioning import table_ddl, check_unique_indexes
+from core.sql_script import render_sql
+from core.sync import SYNC_STORE_DDL, SYNC_STORE_DROP_SQL
+
+DDL_CACHE_DIR = os.path.join(CACHE_DIR, 'ddl')
+
+# Версия формата: увеличивается при изменении того, как собирается DDL
+DDL_FORMAT_VERSION = 2
+
+# Удаление всех представлений схемы public (их список известен только на сервере)
+DROP_VIEWS_SQL = """DO $$
+DECLARE
+    view_name TEXT;
+BEGIN
+    FOR view_name IN SELECT table_name FROM information_schema.views WHERE table_schema = 'public' LOOP
+        EXECUTE format('DROP VIEW IF EXISTS %I CASCADE', view_name);
+    END LOOP;
+END $$"""
+
+
+DDL_CREATE = 'create'
+DDL_DROP = 'drop'
+
+# Скомпилированный DDL в памяти процесса: {(база, вид, хеш): операторы}
+_compiled = {}
+
+
+def _describe_field(field):
+    """Свойства поля, от которых зависит DDL"""
+    description = [
+        field.name, field.column_name, field.field_type, field.null, field.unique, field.index,
+        field.primary_key, field.sequence,
+        [str(getattr(constraint, 'sql', constraint)) for constraint in field.constraints or []],
+    ]
+    for attribute in ('max_length', 'max_digits', 'decimal_places'):
+        description.append(getattr(field, attribute, None))
+    if isinstance(field, ForeignKeyField):
+        description += [field.rel_model._meta.table_name, field.rel_field.column_name,
+                        field.on_delete, field.on_update]
+    return description
+
+
+def model_definition_hash(models, partitioning, unique_indexes_only):
+    """Хеш определения моделей и настроек, от которых зависит DDL набора"""
+    definition = {
+        'format': DDL_FORMAT_VERSION,
+        'peewee': peewee.__version__,
+        'partitioning': partitioning or {},
+        'unique_indexes_only': unique_indexes_only,
+        'models': [
+            [model._meta.table_name,
+             [_describe_field(field) for field in model._meta.sorted_fields],
+             repr(model._meta.indexes),
+             [str(getattr(constraint, 'sql', constraint)) for constraint in model._meta.constraints or []]]
+            for model in sort_models(models)
+        ],
+    }
+    payload = json.dumps(definition, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def compile_create_ddl(models, partitioning=None, unique_indexes_only=False):
+    """
+    Операторы создания таблиц набора. С unique_indexes_only (задан профиль
+    индексов) создаются только уникальные индексы - вторичные индексы
+    профиля строятся по загруженным данным
+    """
+    models = sort_models(models)
+    if partitioning:
+        check_unique_indexes(models, partitioning)
+
+    statements = []
+    for model in models:
+        schema = model._schema
+        for field in model._meta.sorted_fields:
+            if field.sequence:
+                statements.append(render_sql(schema._create_sequence(field)))
+        if partitioning:
+            statements.append(render_sql(table_ddl(model, partitioning)))
+        else:
+            statements.append(render_sql(schema._create_table(safe=True)))
+        if not unique_indexes_only:
+            statements += [render_sql(ctx) for ctx in schema._create_indexes(safe=True)]
+
+    if unique_indexes_only:
+        statements += [index.create_sql() for index in get_unique_indexes(models)]
+
+    statements += SYNC_STORE_DDL
+    statements.append(CHECKPOINT_STORE_DDL)
+    return statements
+
+
+def compile_drop_ddl(models):
+    """
+    Операторы удаления представлений, таблиц набора и служебных таблиц,
+    в том числе промежуточных таблиц --copy-jobs, оставшихся после сбоя
+    """
+    statements = [DROP_VIEWS_SQL]
+    for model in reversed(sort_models(models)):
+        statements.append(f'DROP TABLE IF EXISTS "{model._meta.table_name}"')
+        statements.append(f'DROP TABLE IF EXISTS "{staging_table_name(model._meta.table_name)}"')
+    statements += [SYNC_STORE_DROP_SQL, CHECKPOINT_STORE_DROP_SQL]
+    return statements
+
+
+def get_ddl_cache_path(db_name, kind):
+    return os.path.join(DDL_CACHE_DIR, f"{db_name}.{kind}.json")
+
+
+def _load_cached(db_name, kind, definition_hash):
+    try:
+        with open(get_ddl_cache_path(db_name, kind), 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if data.get('definition_hash') != definition_hash:
+        return None
+    return data['statements']
+
+
+def _save_cached(db_name, kind, definition_hash, statements):
+    try:
+        os.makedirs(DDL_CACHE_DIR, exist_ok=True)
+        path = get_ddl_cache_path(db_name, kind)
+        with open(path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump({'definition_hash': definition_hash, 'statements': statements}, f,
+                      ensure_ascii=False, indent=2)
+        os.replace(path + '.tmp', path)
+    except OSError:
+        # Кэш - только ускорение: без права записи DDL компилируется при каждом запуске
+        pass
+
+
+def _get_ddl(db_name, kind, definition_hash, compile_ddl):
+    """Операторы из кэша (в памяти или на диске) или скомпилированные заново: (операторы, источник)"""
+    key = (db_name, kind, definition_hash)
+    if key in _compiled:
+        return _compiled[key], 'memory'
+
+    statements = _load_cached(db_name, kind, definition_hash)
+    source = 'cache'
+    if statements is None:
+        statements = compile_ddl()
+        _save_cached(db_name, kind, definition_hash, statements)
+        source = 'compiled'
+
+    _compiled[key] = statements
+    return statements, source
+
+
+def get_create_ddl(db_name, models, partitioning=None, unique_indexes_only=False):
+    """DDL создания таблиц набора: (операторы, источник: memory, cache или compiled)"""
+    definition_hash = model_definition_hash(models, partitioning, unique_indexes_only)
+    return _get_ddl(db_name, DDL_CREATE, definition_hash,
+                    lambda: compile_create_ddl(models, partitioning, unique_indexes_only))
+
+
+def get_drop_ddl(db_name, models):
+    """DDL удаления таблиц набора: (операторы, источник)"""
+    definition_hash = model_definition_hash(models, None, False)
+    return _get_ddl(db_name, DDL_DROP, definition_hash, lambda: compile_drop_ddl(models))
+
+
+def execute_batch(database, statements):
+    """
+    Выполняет операторы одним запросом к серверу. Курсор psycopg2 без
+    параметров: текст не проходит подстановку %s, поэтому % в DDL допустим
+    """
+    cursor = database.cursor()
+    try:
+        cursor.execute(';\n'.join(statements))
+    finally:
+        cursor.close()
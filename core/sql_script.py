@@ -0,0 +1,206 @@
+"""
+Автономный SQL скрипт набора данных: <папка>/<база>.sql (или .sql.gz).
+
+Скрипт содержит DDL, сгенерированный по peewee моделям, и данные таблиц
+в блоках COPY ... FROM stdin, поэтому базу можно собрать без Python и без
+этой программы - одной командой psql в одной транзакции:
+
+    createdb air_travel
+    psql -d air_travel -1 -f air_travel.sql
+
+Порядок скрипта: удаление таблиц набора, CREATE TABLE, уникальные индексы,
+данные (у секционированной раскладки - перед данными таблицы ее месячные
+секции), последовательности serial, вторичные индексы профиля. Вторичные
+индексы строятся по загруженным данным, как при --index-profile.
+
+Файл пишется потоком: записи читаются из JSON пакетами и сразу кодируются
+в текстовый формат COPY, в памяти находится только текущий пакет.
+Служебные таблицы синхронизации в скрипт не входят.
+"""
+
+import gzip
+import importlib
+import itertools
+import os
+from datetime import datetime
+
+from peewee import AutoField, sort_models
+
+from core.copy_loader import get_copy_columns, copy_sql, encode_text_rows, serial_sequence_sql
+from core.index_profiles import get_unique_indexes, get_index_profiles, PROFILE_DEFAULT
+from core.manifest import get_table_name, load_valid_manifest, choose_chunk_size
+from core.mock_data import get_dataset_path, get_table_file, iter_records, iter_chunks
+from core.partitioning import (
+    LAYOUT_PARTITIONED, get_partitioning, table_ddl, check_unique_indexes,
+    get_date_span, month_ranges, partition_sql
+)
+
+SCRIPT_EXTENSION = '.sql'
+GZIP_EXTENSION = '.gz'
+
+# Уровень сжатия gzip: по умолчанию модуль gzip сжимает с уровнем 9,
+# что в несколько раз медленнее при почти том же размере
+SCRIPT_COMPRESSLEVEL = 6
+
+
+def get_script_path(out_dir, db_name, compress=False):
+    """Путь к скрипту базы в папке out_dir"""
+    return os.path.join(out_dir, db_name + SCRIPT_EXTENSION + (GZIP_EXTENSION if compress else ''))
+
+
+def open_script(path, compress=False):
+    """Открывает файл скрипта на запись (gzip, если compress)"""
+    if compress:
+        return gzip.open(path, 'wt', encoding='utf-8', compresslevel=SCRIPT_COMPRESSLEVEL)
+    return open(path, 'w', encoding='utf-8')
+
+
+def sql_literal(value):
+    """Значение как литерал SQL"""
+    if value is None:
+        return 'NULL'
+    if isinstance(value, bool):
+        return 'TRUE' if value else 'FALSE'
+    if isinstance(value, (int, float)):
+        return str(value)
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def render_sql(ctx):
+    """Текст запроса peewee с подставленными параметрами"""
+    sql, params = ctx.query()
+    if not params:
+        return sql
+    return sql % tuple(sql_literal(value) for value in params)
+
+
+def write_copy_block(f, model, columns, records, chunk_size, table=None):
+    """
+    Пишет блок COPY ... FROM stdin с записями (пакетами по chunk_size).
+    Возвращает число записанных строк.
+    """
+    f.write(copy_sql(model, columns, table=table) + ';\n')
+    rows = 0
+    for chunk in iter_chunks(records, chunk_size):
+        f.write(encode_text_rows(columns, chunk))
+        rows += len(chunk)
+    f.write('\\.\n\n')
+    return rows
+
+
+class ScriptCopy:
+    """Блок данных скрипта: таблица, колонки COPY и записи из файла."""
+
+    def __init__(self, table_name, model, columns, records, chunk_size):
+        self.table_name = table_name
+        self.model = model
+        self.columns = columns
+        self.records = records
+        self.chunk_size = chunk_size
+
+    @property
+    def sql(self):
+        return copy_sql(self.model, self.columns)
+
+    def iter_encoded(self):
+        """Данные блока в текстовом формате COPY, пакетами"""
+        for chunk in iter_chunks(self.records, self.chunk_size):
+            yield encode_text_rows(self.columns, chunk), len(chunk)
+
+
+def iter_script_parts(db_config, layout=None, index_profile=None):
+    """
+    Части скрипта набора по порядку: SQL операторы (строки без ';') и
+    блоки данных ScriptCopy. Записи блока читаются из файла при обходе
+    """
+    models_module = importlib.import_module(db_config['models_module'])
+    models = sort_models(models_module.get_models())
+    partitioning = get_partitioning(models_module) if layout == LAYOUT_PARTITIONED else {}
+    check_unique_indexes(models, partitioning)
+
+    profiles = get_index_profiles(models_module)
+    profile = index_profile or PROFILE_DEFAULT
+    if profile not in profiles:
+        raise ValueError(f"Профиль индексов '{profile}' не объявлен для базы {db_config['db_name']}")
+
+    dataset_path = get_dataset_path(db_config)
+    manifest, _ = load_valid_manifest(dataset_path)
+    entries = manifest['tables'] if manifest else {}
+
+    for model in reversed(models):
+        yield f'DROP TABLE IF EXISTS "{get_table_name(model)}" CASCADE'
+
+    for model in models:
+        ddl = table_ddl(model, partitioning) if partitioning else model._schema._create_table(safe=False)
+        yield render_sql(ddl)
+    for index in get_unique_indexes(models):
+        yield index.create_sql()
+
+    for model in models:
+        table_name = get_table_name(model)
+        file_path = get_table_file(dataset_path, table_name)
+        if not os.path.exists(file_path):
+            continue
+
+        if table_name in partitioning:
+            span = get_date_span(iter_records(file_path), partitioning[table_name])
+            if span:
+                for start, end in month_ranges(*span):
+                    yield partition_sql(table_name, start, end)
+
+        records = iter_records(file_path)
+        first = next(records, None)
+        if first is None:
+            continue
+
+        columns = get_copy_columns(model, first)
+        yield ScriptCopy(table_name, model, columns, itertools.chain([first], records),
+                         choose_chunk_size(entries.get(table_name)))
+
+        pk = model._meta.primary_key
+        if isinstance(pk, AutoField) and pk.column_name in [column.name for column in columns]:
+            # PERFORM вместо SELECT: psql не выводит результат
+            sql = serial_sequence_sql(table_name, pk.column_name).removeprefix('SELECT ')
+            yield f"DO $$ BEGIN PERFORM {sql}; END $$"
+
+    for index in profiles[profile]:
+        yield index.create_sql()
+
+
+def write_sql_script(f, db_config, layout=None, index_profile=None, on_table_done=None):
+    """
+    Пишет скрипт набора данных в открытый текстовый файл.
+    on_table_done(таблица, строк) вызывается после блока данных каждой таблицы.
+    Возвращает {таблица: строк}.
+    """
+    f.write(f"-- {db_config['description']}\n")
+    f.write(f"-- Сгенерировано PSQL Mock Creator {datetime.now().isoformat(timespec='seconds')}\n")
+    f.write(f"-- Загрузка: psql -d {db_config['db_name']} -1 -f <файл>\n\n")
+    f.write("\\set ON_ERROR_STOP on\n")
+    f.write("SET client_encoding = 'UTF8';\n")
+    f.write("SET client_min_messages = warning;\n\n")
+
+    tables = {}
+    for part in iter_script_parts(db_config, layout, index_profile):
+        if not isinstance(part, ScriptCopy):
+            f.write(part + ';\n')
+            continue
+
+        f.write('\n')
+        tables[part.table_name] = write_copy_block(f, part.model, part.columns, part.records, part.chunk_size)
+        if on_table_done:
+            on_table_done(part.table_name, tables[part.table_name])
+
+    return tables
+
+
+def emit_sql_script(db_config, out_dir, compress=False, layout=None, index_profile=None, on_table_done=None):
+    """
+    Сохраняет скрипт набора данных в out_dir.
+    Возвращает (путь, {таблица: строк}, размер файла в байтах).
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    path = get_script_path(out_dir, db_config['db_name'], compress)
+    with open_script(path, compress) as f:
+        tables = write_sql_script(f, db_config, layout, index_profile, on_table_done)
+    return path, tables, os.path.getsize(path)
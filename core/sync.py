@@ -0,0 +1,272 @@
+"""
+Инкрементальная синхронизация базы с моковыми данными (режим --sync).
+
+Вместо удаления и полной перезагрузки таблиц применяются только отличия:
+каждая запись хешируется по первичному ключу, хеши сравниваются с
+сохраненными на сервере в служебных таблицах, после чего выполняются
+INSERT ... ON CONFLICT DO UPDATE для новых и измененных записей и
+точечные DELETE для удаленных.
+
+Ключ записи - явный первичный ключ ("id"), если он есть в данных, иначе
+порядковый номер записи в файле (так же id назначаются последовательностью
+при создании базы). Таблицы, у которых хеш файла совпадает с сохраненным,
+пропускаются без чтения, поэтому стоимость синхронизации зависит от
+объема изменений, а не от размера набора данных.
+"""
+
+import hashlib
+import io
+import json
+
+from peewee import fn
+
+from core.copy_loader import CopyColumn, reset_sequence
+from core.mock_data import iter_records
+
+SYNC_TABLES_TABLE = '_mock_sync_tables'
+SYNC_ROWS_TABLE = '_mock_sync_rows'
+
+# Размер пакета для INSERT ... ON CONFLICT и DELETE
+SYNC_BATCH_SIZE = 1000
+
+
+class TableDiff:
+    """Отличия данных таблицы от состояния на сервере."""
+
+    def __init__(self, model, file_hash):
+        self.model = model
+        self.file_hash = file_hash
+        self.upserts = []
+        self.deletes = []
+        self.hashes = {}
+        self.unchanged = False
+
+    @property
+    def table_name(self):
+        return self.model._meta.table_name
+
+    @property
+    def is_empty(self):
+        return not self.upserts and not self.deletes
+
+
+def record_hash(record):
+    """Хеш записи, не зависящий от порядка ключей"""
+    payload = json.dumps(record, sort_keys=True, ensure_ascii=False, separators=(',', ':'), default=str)
+    return hashlib.md5(payload.encode('utf-8')).hexdigest()
+
+
+def record_key(pk_column, record, position):
+    """Ключ записи: явный первичный ключ или порядковый номер (с 1)"""
+    for key in pk_column.keys:
+        if key in record:
+            return int(record[key])
+    return position
+
+
+# DDL служебных таблиц (выполняется и в пакете DDL набора, см. core/schema_ddl.py)
+SYNC_STORE_DDL = [
+    f'''CREATE TABLE IF NOT EXISTS "{SYNC_TABLES_TABLE}" (
+            table_name TEXT PRIMARY KEY,
+            file_hash TEXT NOT NULL
+        )''',
+    f'''CREATE TABLE IF NOT EXISTS "{SYNC_ROWS_TABLE}" (
+            table_name TEXT NOT NULL,
+            pk BIGINT NOT NULL,
+            row_hash TEXT NOT NULL,
+            PRIMARY KEY (table_name, pk)
+        )''',
+]
+SYNC_STORE_DROP_SQL = f'DROP TABLE IF EXISTS "{SYNC_ROWS_TABLE}", "{SYNC_TABLES_TABLE}"'
+
+
+def ensure_sync_store(database):
+    """Создает служебные таблицы с хешами, если их нет"""
+    for sql in SYNC_STORE_DDL:
+        database.execute_sql(sql)
+
+
+def drop_sync_store(database):
+    """Удаляет служебные таблицы с хешами"""
+    database.execute_sql(SYNC_STORE_DROP_SQL)
+
+
+def clear_table_state(database, table_name):
+    """Удаляет сохраненные хеши таблицы (таблица перезагружается целиком)"""
+    database.execute_sql(f'DELETE FROM "{SYNC_ROWS_TABLE}" WHERE table_name = %s', (table_name,))
+    database.execute_sql(f'DELETE FROM "{SYNC_TABLES_TABLE}" WHERE table_name = %s', (table_name,))
+
+
+def get_stored_file_hash(database, table_name):
+    cursor = database.execute_sql(
+        f'SELECT file_hash FROM "{SYNC_TABLES_TABLE}" WHERE table_name = %s', (table_name,)
+    )
+    row = cursor.fetchone()
+    return row[0] if row else None
+
+
+def get_stored_row_hashes(database, table_name):
+    cursor = database.execute_sql(
+        f'SELECT pk, row_hash FROM "{SYNC_ROWS_TABLE}" WHERE table_name = %s', (table_name,)
+    )
+    return dict(cursor.fetchall())
+
+
+def iter_keyed_records(model, file_path):
+    """Возвращает (ключ, хеш, запись) для каждой записи файла"""
+    pk_column = CopyColumn(model._meta.primary_key)
+    for position, record in enumerate(iter_records(file_path), start=1):
+        yield record_key(pk_column, record, position), record_hash(record), record
+
+
+def compute_table_diff(database, model, file_path, file_hash):
+    """
+    Сравнивает данные файла с сохраненными хешами. Если хеш файла не изменился,
+    файл не читается.
+    """
+    diff = TableDiff(model, file_hash)
+    if get_stored_file_hash(database, diff.table_name) == file_hash:
+        diff.unchanged = True
+        return diff
+
+    stored = get_stored_row_hashes(database, diff.table_name)
+    if not stored:
+        # Состояние не сохранялось (база создана старой версией или загрузка
+        # была с ошибками): лишние строки определяем по ключам на сервере
+        pk = model._meta.primary_key
+        stored = {key: None for (key,) in model.select(pk).tuples()}
+
+    for key, row_hash, record in iter_keyed_records(model, file_path):
+        diff.hashes[key] = row_hash
+        if key not in stored or stored.pop(key) != row_hash:
+            diff.upserts.append((key, record))
+
+    # Ключи, оставшиеся в сохраненном состоянии, исчезли из файла
+    diff.deletes = sorted(stored)
+    return diff
+
+
+def _row_for_upsert(model, columns, key, record):
+    row = {column.field: column.value(record) for column in columns}
+    row[model._meta.primary_key] = key
+    return row
+
+
+def apply_upserts(database, diff):
+    """INSERT ... ON CONFLICT DO UPDATE для новых и измененных записей"""
+    model = diff.model
+    pk = model._meta.primary_key
+    columns = [CopyColumn(field) for field in model._meta.sorted_fields]
+    preserve = [field for field in model._meta.sorted_fields if field is not pk]
+
+    for start in range(0, len(diff.upserts), SYNC_BATCH_SIZE):
+        batch = diff.upserts[start:start + SYNC_BATCH_SIZE]
+        rows = [_row_for_upsert(model, columns, key, record) for key, record in batch]
+        (model
+         .insert_many(rows)
+         .on_conflict(conflict_target=[pk], preserve=preserve)
+         .execute())
+
+    if diff.upserts:
+        reset_sequence(database, model, columns)
+
+
+def apply_deletes(database, diff):
+    """Точечные DELETE для записей, удаленных из файла"""
+    model = diff.model
+    pk = model._meta.primary_key
+    for start in range(0, len(diff.deletes), SYNC_BATCH_SIZE):
+        batch = diff.deletes[start:start + SYNC_BATCH_SIZE]
+        model.delete().where(pk.in_(batch)).execute()
+
+
+def save_table_state(database, table_name, file_hash, hashes):
+    """Полностью заменяет сохраненные хеши таблицы (загружаются через COPY)"""
+    database.execute_sql(f'DELETE FROM "{SYNC_ROWS_TABLE}" WHERE table_name = %s', (table_name,))
+
+    buffer = io.StringIO(''.join(f"{table_name}\t{key}\t{row_hash}\n" for key, row_hash in hashes.items()))
+    database.cursor().copy_expert(
+        f'COPY "{SYNC_ROWS_TABLE}" (table_name, pk, row_hash) FROM STDIN', buffer
+    )
+    _save_file_hash(database, table_name, file_hash)
+
+
+def save_table_diff_state(database, diff):
+    """Обновляет сохраненные хеши только для измененных записей"""
+    table_name = diff.table_name
+    for start in range(0, len(diff.upserts), SYNC_BATCH_SIZE):
+        batch = diff.upserts[start:start + SYNC_BATCH_SIZE]
+        values = [(table_name, key, diff.hashes[key]) for key, _ in batch]
+        placeholders = ', '.join(['(%s, %s, %s)'] * len(values))
+        database.execute_sql(
+            f'INSERT INTO "{SYNC_ROWS_TABLE}" (table_name, pk, row_hash) VALUES {placeholders} '
+            f'ON CONFLICT (table_name, pk) DO UPDATE SET row_hash = EXCLUDED.row_hash',
+            [value for row in values for value in row]
+        )
+
+    for start in range(0, len(diff.deletes), SYNC_BATCH_SIZE):
+        batch = diff.deletes[start:start + SYNC_BATCH_SIZE]
+        database.execute_sql(
+            f'DELETE FROM "{SYNC_ROWS_TABLE}" WHERE table_name = %s AND pk = ANY(%s)',
+            (table_name, batch)
+        )
+
+    _save_file_hash(database, table_name, diff.file_hash)
+
+
+def _save_file_hash(database, table_name, file_hash):
+    database.execute_sql(
+        f'INSERT INTO "{SYNC_TABLES_TABLE}" (table_name, file_hash) VALUES (%s, %s) '
+        f'ON CONFLICT (table_name) DO UPDATE SET file_hash = EXCLUDED.file_hash',
+        (table_name, file_hash)
+    )
+
+
+class LoadBaseline:
+    """
+    Хеши записей и файла таблицы, собираемые при загрузке: записи хешируются
+    по мере чтения файла загрузчиком, поэтому для состояния синхронизации
+    файл не читается повторно.
+    """
+
+    def __init__(self, model, file_hash=None):
+        self.model = model
+        self.pk_column = CopyColumn(model._meta.primary_key)
+        self.known_file_hash = file_hash
+        self.file_hash = file_hash
+        self.hashes = {}
+
+    def read(self, file_path):
+        """
+        Читает записи файла, запоминая их ключи и хеши. Хеш файла (если он
+        не известен из манифеста) считается по тем же прочитанным байтам
+        """
+        self.hashes = {}
+        self.file_hash = self.known_file_hash
+        digest = None if self.known_file_hash else hashlib.sha256()
+        for position, record in enumerate(iter_records(file_path, digest), start=1):
+            self.hashes[record_key(self.pk_column, record, position)] = record_hash(record)
+            yield record
+        if digest:
+            self.file_hash = digest.hexdigest()
+
+
+def record_baseline(database, baseline):
+    """
+    Сохраняет хеши всех записей таблицы после полной загрузки. Если ключи
+    записей не совпадают с первичными ключами на сервере (например, часть
+    записей не загрузилась), состояние не сохраняется - тогда следующая
+    синхронизация сверит таблицу целиком. Ключи сверяются по числу и
+    границам одним агрегатным запросом, без выборки ключей с сервера.
+    """
+    if baseline.file_hash is None or not baseline.hashes:
+        return False
+
+    model = baseline.model
+    pk = model._meta.primary_key
+    server = model.select(fn.COUNT(pk), fn.MIN(pk), fn.MAX(pk)).tuples().get()
+    if server != (len(baseline.hashes), min(baseline.hashes), max(baseline.hashes)):
+        return False
+
+    save_table_state(database, model._meta.table_name, baseline.file_hash, baseline.hashes)
+    return True
@@ -0,0 +1,71 @@
+"""
+Кэш шаблонных баз данных.
+
+Собранная база сохраняется на сервере как шаблон (<база>__template) с
+отпечатком источника в комментарии. Новая копия создается командой
+CREATE DATABASE ... TEMPLATE, которая копирует файлы базы на сервере и
+не требует повторной загрузки данных. Если отпечаток источника изменился,
+шаблон пересобирается.
+
+Функции принимают курсор autocommit-соединения с базой postgres.
+"""
+
+from contextlib import contextmanager
+
+TEMPLATE_SUFFIX = '__template'
+
+
+def get_template_name(db_name):
+    """Имя шаблонной базы для базы db_name"""
+    return f"{db_name}{TEMPLATE_SUFFIX}"
+
+
+def database_exists(cursor, db_name):
+    cursor.execute("SELECT 1 FROM pg_catalog.pg_database WHERE datname = %s", (db_name,))
+    return cursor.fetchone() is not None
+
+
+def get_template_fingerprint(cursor, template_name):
+    """Отпечаток источника шаблона (или None, если шаблона нет)"""
+    cursor.execute(
+        "SELECT shobj_description(oid, 'pg_database') FROM pg_catalog.pg_database WHERE datname = %s",
+        (template_name,)
+    )
+    row = cursor.fetchone()
+    return row[0] if row else None
+
+
+def drop_template(cursor, template_name):
+    """Удаляет шаблонную базу (шаблон нельзя удалить, не сняв флаг)"""
+    if not database_exists(cursor, template_name):
+        return
+    cursor.execute(f'ALTER DATABASE "{template_name}" IS_TEMPLATE false')
+    cursor.execute(f'DROP DATABASE "{template_name}"')
+
+
+def mark_template(cursor, template_name, fingerprint):
+    """Помечает базу как шаблон и сохраняет отпечаток источника"""
+    cursor.execute(f'COMMENT ON DATABASE "{template_name}" IS %s', (fingerprint,))
+    cursor.execute(f'ALTER DATABASE "{template_name}" IS_TEMPLATE true')
+
+
+def recreate_database(cursor, db_name, template=None):
+    """Удаляет базу (если есть) и создает ее заново, при необходимости из шаблона"""
+    cursor.execute(f'DROP DATABASE IF EXISTS "{db_name}"')
+    if template:
+        cursor.execute(f'CREATE DATABASE "{db_name}" TEMPLATE "{template}"')
+    else:
+        cursor.execute(f'CREATE DATABASE "{db_name}"')
+
+
+@contextmanager
+def template_lock(cursor, template_name):
+    """
+    Блокировка сборки шаблона между процессами (например, воркерами
+    pytest-xdist): пока один процесс собирает шаблон, остальные ждут
+    """
+    cursor.execute("SELECT pg_advisory_lock(hashtext(%s))", (template_name,))
+    try:
+        yield
+    finally:
+        cursor.execute("SELECT pg_advisory_unlock(hashtext(%s))", (template_name,))
@@ -0,0 +1,275 @@
+"""
+Проверка моковых данных до обращения к серверу.
+
+Набор данных читается один раз, потоково, таблицы - в порядке зависимостей.
+Для каждой записи проверяются ограничения моделей:
+  - NOT NULL: обязательное поле без значения и без значения по умолчанию;
+  - max_length: строка длиннее CharField(max_length=...);
+  - уникальность: первичный ключ, unique поля и уникальные индексы моделей,
+    включая составные (Passenger: flight, seat_number); NULL не совпадает
+    ни с чем, как в PostgreSQL;
+  - внешние ключи: ссылка на запись, которой нет среди принятых записей
+    родительской таблицы.
+
+В памяти хранятся только множества ключей: порядковые первичные ключи -
+диапазоном с пропусками, значения уникальных и ссылочных колонок -
+64-битными хешами, поэтому объем памяти не зависит от длины строк.
+Отклоненные записи в множества не попадают, так что ссылки на них тоже
+считаются ошибкой - как при загрузке.
+
+Ключ записи без явного id - ее порядковый номер (см. core/sync.py). При
+фильтрации принятым записям проставляется явный id, чтобы после удаления
+ошибочных записей ссылки дочерних таблиц указывали на те же строки.
+"""
+
+import importlib
+import os
+
+from peewee import AutoField, ForeignKeyField, sort_models
+
+from core.copy_loader import CopyColumn
+from core.index_profiles import get_unique_indexes
+from core.manifest import get_table_name
+from core.mock_data import get_dataset_path, get_table_file, iter_records
+from core.sync import record_key
+
+VALIDATION_FAIL = 'fail'
+VALIDATION_FILTER = 'filter'
+VALIDATION_MODES = (VALIDATION_FAIL, VALIDATION_FILTER)
+
+KIND_NOT_NULL = 'not_null'
+KIND_MAX_LENGTH = 'max_length'
+KIND_UNIQUE = 'unique'
+KIND_FOREIGN_KEY = 'foreign_key'
+
+# Сколько примеров нарушений сохранять для каждой таблицы
+MAX_EXAMPLES = 5
+
+
+class Violation:
+    """Нарушение ограничения в записи файла."""
+
+    def __init__(self, table, position, kind, columns, value=None):
+        self.table = table
+        self.position = position
+        self.kind = kind
+        self.columns = list(columns)
+        self.value = value
+
+    def __str__(self):
+        columns = ', '.join(self.columns)
+        prefix = f"{self.table}, запись {self.position}"
+        if self.kind == KIND_NOT_NULL:
+            return f"{prefix}: нет значения обязательного поля {columns}"
+        if self.kind == KIND_MAX_LENGTH:
+            return f"{prefix}: {columns} длиннее допустимого ({self.value!r})"
+        if self.kind == KIND_UNIQUE:
+            return f"{prefix}: повтор уникального значения ({columns}) = {self.value!r}"
+        return f"{prefix}: {columns} = {self.value!r} ссылается на несуществующую запись"
+
+
+class ValidationFailed(Exception):
+    """Найдено нарушение в режиме остановки на первой ошибке."""
+
+    def __init__(self, violation):
+        super().__init__(str(violation))
+        self.violation = violation
+
+
+class TableValidation:
+    """Итог проверки таблицы: число записей, отклоненные записи, нарушения по видам."""
+
+    def __init__(self, table):
+        self.table = table
+        self.records = 0
+        self.rejected = set()
+        self.counts = {}
+        self.examples = []
+
+    def add(self, violation):
+        self.rejected.add(violation.position)
+        self.counts[violation.kind] = self.counts.get(violation.kind, 0) + 1
+        if len(self.examples) < MAX_EXAMPLES:
+            self.examples.append(violation)
+
+    def to_dict(self):
+        return {
+            'records': self.records,
+            'rejected': len(self.rejected),
+            'violations': dict(self.counts),
+            'examples': [str(violation) for violation in self.examples],
+        }
+
+
+class PrimaryKeys:
+    """
+    Принятые первичные ключи таблицы. Порядковые ключи идут подряд, поэтому
+    хранятся как последний ключ и множество пропусков (отклоненных записей)
+    """
+
+    def __init__(self):
+        self.explicit = set()
+        self.last = 0
+        self.gaps = set()
+
+    def __contains__(self, key):
+        if key in self.explicit:
+            return True
+        return isinstance(key, int) and 0 < key <= self.last and key not in self.gaps
+
+    def add(self, key, positional):
+        if not positional:
+            self.explicit.add(key)
+            return
+        self.gaps.update(range(self.last + 1, key))
+        self.last = key
+
+
+def key_digest(values):
+    """
+    64-битный хеш значений ключа (1 и '1' совпадают, как после приведения
+    типов). Хеши строк Python стабильны в пределах процесса - этого достаточно
+    """
+    return hash(tuple(str(value) for value in values))
+
+
+def normalize_reference(field, value):
+    """Значение ссылки в виде ключа родительской таблицы"""
+    if field.rel_field.primary_key:
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            return value
+    return key_digest([value])
+
+
+class _TableChecker:
+    """Проверка записей одной таблицы по ограничениям модели."""
+
+    def __init__(self, model, keys):
+        self.model = model
+        self.table = get_table_name(model)
+        self.keys = keys
+        meta = model._meta
+
+        self.pk_column = CopyColumn(meta.primary_key)
+        self.required = [CopyColumn(field) for field in meta.sorted_fields
+                         if not field.null and not isinstance(field, AutoField)]
+        self.limited = [(CopyColumn(field), field.max_length) for field in meta.sorted_fields
+                        if getattr(field, 'max_length', None)]
+        self.references = [(CopyColumn(field), field) for field in meta.sorted_fields
+                           if isinstance(field, ForeignKeyField)]
+
+        columns = {field.column_name: CopyColumn(field) for field in meta.sorted_fields}
+        self.unique = [(index.columns, [columns[name] for name in index.columns])
+                       for index in get_unique_indexes([model])]
+        self.unique_sets = [set() for _ in self.unique]
+
+        # Колонки, на которые ссылаются другие таблицы не по первичному ключу
+        self.referenced = [column for name, column in columns.items()
+                           if (self.table, name) in keys and not column.field.primary_key]
+
+    def check(self, record, position):
+        """Нарушения записи. Принятая запись регистрирует свои ключи"""
+        violations = []
+        key = record_key(self.pk_column, record, position)
+        positional = not any(name in record for name in self.pk_column.keys)
+        pk_set = self.keys[(self.table, None)]
+
+        if key in pk_set:
+            violations.append(Violation(self.table, position, KIND_UNIQUE, [self.pk_column.name], key))
+
+        for column in self.required:
+            if column.value(record) is None:
+                violations.append(Violation(self.table, position, KIND_NOT_NULL, [column.name]))
+
+        for column, max_length in self.limited:
+            value = column.value(record)
+            if value is not None and len(str(value)) > max_length:
+                violations.append(Violation(self.table, position, KIND_MAX_LENGTH, [column.name], value))
+
+        unique_keys = []
+        for (names, columns), seen in zip(self.unique, self.unique_sets):
+            values = [column.value(record) for column in columns]
+            if any(value is None for value in values):
+                unique_keys.append(None)
+                continue
+            digest = key_digest(values)
+            if digest in seen:
+                violations.append(Violation(self.table, position, KIND_UNIQUE, names,
+                                            values[0] if len(values) == 1 else tuple(values)))
+            unique_keys.append(digest)
+
+        for column, field in self.references:
+            value = column.value(record)
+            if value is None:
+                continue
+            target = (get_table_name(field.rel_model),
+                      None if field.rel_field.primary_key else field.rel_field.column_name)
+            # Ссылка на свою таблицу может указывать на эту же запись
+            if target == (self.table, None) and normalize_reference(field, value) == key:
+                continue
+            if normalize_reference(field, value) not in self.keys[target]:
+                violations.append(Violation(self.table, position, KIND_FOREIGN_KEY, [column.name], value))
+
+        if not violations:
+            pk_set.add(key, positional)
+            for digest, seen in zip(unique_keys, self.unique_sets):
+                if digest is not None:
+                    seen.add(digest)
+            for column in self.referenced:
+                value = column.value(record)
+                if value is not None:
+                    self.keys[(self.table, column.name)].add(key_digest([value]))
+        return violations
+
+
+def validate_models(models, dataset_path, fail_fast=False, on_table_done=None):
+    """
+    Проверяет файлы таблиц набора. Возвращает {таблица: TableValidation}.
+    С fail_fast выбрасывает ValidationFailed на первом нарушении.
+    """
+    # Множества ключей: (таблица, None) - первичные ключи, (таблица, колонка) - прочие ссылочные колонки
+    keys = {}
+    for model in models:
+        keys[(get_table_name(model), None)] = PrimaryKeys()
+        for field in model._meta.sorted_fields:
+            if isinstance(field, ForeignKeyField) and not field.rel_field.primary_key:
+                keys[(get_table_name(field.rel_model), field.rel_field.column_name)] = set()
+
+    results = {}
+    for model in sort_models(models):
+        table = get_table_name(model)
+        file_path = get_table_file(dataset_path, table)
+        if not os.path.exists(file_path):
+            continue
+
+        checker = _TableChecker(model, keys)
+        result = TableValidation(table)
+        for position, record in enumerate(iter_records(file_path), start=1):
+            result.records = position
+            for violation in checker.check(record, position):
+                if fail_fast:
+                    raise ValidationFailed(violation)
+                result.add(violation)
+
+        results[table] = result
+        if on_table_done:
+            on_table_done(result)
+    return results
+
+
+def validate_dataset(db_config, fail_fast=False, on_table_done=None):
+    """Проверяет набор данных базы по ее моделям"""
+    models_module = importlib.import_module(db_config['models_module'])
+    return validate_models(models_module.get_models(), get_dataset_path(db_config), fail_fast, on_table_done)
+
+
+def iter_filtered_records(model, records, rejected):
+    """Записи без отклоненных; принятым проставляется явный первичный ключ"""
+    pk_column = CopyColumn(model._meta.primary_key)
+    for position, record in enumerate(records, start=1):
+        if position in rejected:
+            continue
+        key = record_key(pk_column, record, position)
+        yield dict(record, **{pk_column.name: key})
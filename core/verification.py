@@ -0,0 +1,247 @@
+"""
+Проверка содержимого загруженных таблиц по хешу (режим --verify).
+
+Хеш таблицы не зависит от порядка строк: каждая строка приводится к
+каноническому тексту, от него берутся первые 64 бита md5, и значения
+складываются по модулю 2^64. На сервере хеш считается одним запросом на
+таблицу (count и sum по md5 строк, без сортировки и без передачи строк
+клиенту), ожидаемый - по моковым данным тем же способом или берется из
+манифеста (content_hash, считается при --build-manifest).
+
+Канонический текст значения не зависит от того, как строка попала в базу
+(INSERT, COPY text или binary): числа, даты и время на сервере
+форматируются явно (to_char, приведение к numeric). Строка - запись
+ROW(...)::text из этих значений: значения с запятыми, кавычками, скобками
+и пробелами берутся в кавычки, NULL - пустое значение, поэтому разные
+строки не склеиваются в один текст.
+
+Колонки, значение по умолчанию которых вычисляется при загрузке
+(default=datetime.now и т.п.), в хеш не входят: их нельзя предсказать по
+данным.
+"""
+
+import hashlib
+import time
+from datetime import date, datetime
+from decimal import Decimal, ROUND_HALF_UP
+
+from peewee import AutoField
+
+from core.copy_loader import CopyColumn
+
+HASH_MODULUS = 1 << 64
+
+SOURCE_MANIFEST = 'manifest'
+SOURCE_DATA = 'data'
+
+# Значащих цифр при приведении float к numeric на сервере (DBL_DIG)
+FLOAT_DIGITS = 15
+
+KIND_INT = 'int'
+KIND_BOOL = 'bool'
+KIND_DATE = 'date'
+KIND_DATETIME = 'datetime'
+KIND_DECIMAL = 'decimal'
+KIND_FLOAT = 'float'
+KIND_TEXT = 'text'
+
+FIELD_KINDS = {
+    'AUTO': KIND_INT, 'BIGAUTO': KIND_INT, 'INT': KIND_INT, 'BIGINT': KIND_INT, 'SMALLINT': KIND_INT,
+    'BOOL': KIND_BOOL,
+    'DATE': KIND_DATE,
+    'DATETIME': KIND_DATETIME,
+    'DECIMAL': KIND_DECIMAL,
+    'FLOAT': KIND_FLOAT, 'DOUBLE': KIND_FLOAT,
+}
+
+# Символы, из-за которых значение записи берется в кавычки (как в record_out)
+RECORD_QUOTED_CHARS = frozenset('"\\(),') | frozenset(' \t\n\r\v\f')
+
+VERIFY_TABLE_HEADERS = ['таблица', 'строк в базе', 'ожидается', 'хеш в базе', 'ожидается', 'источник', 'мс', '']
+
+
+def _truth(value):
+    if isinstance(value, str):
+        return value.strip().lower() in ('t', 'true', 'y', 'yes', 'on', '1')
+    return bool(value)
+
+
+def _format_decimal(value, places):
+    number = Decimal(str(value))
+    if places is not None:
+        number = number.quantize(Decimal(1).scaleb(-places), rounding=ROUND_HALF_UP)
+    return format(number, 'f')
+
+
+def _format_float(value):
+    # Сервер приводит float к numeric через printf("%.15g")
+    return format(Decimal(format(float(value), f'.{FLOAT_DIGITS}g')), 'f')
+
+
+def _format_date(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()[:10]
+    return date.fromisoformat(str(value)[:10]).isoformat()
+
+
+def _format_datetime(value):
+    if not isinstance(value, datetime):
+        if isinstance(value, date):
+            value = datetime(value.year, value.month, value.day)
+        else:
+            value = datetime.fromisoformat(str(value))
+    return value.strftime('%Y-%m-%d %H:%M:%S.%f')
+
+
+class VerifyColumn:
+    """Колонка в хеше таблицы: SQL выражение канонического текста и то же на клиенте."""
+
+    def __init__(self, field):
+        self.field = field
+        self.copy_column = CopyColumn(field)
+        self.name = field.column_name
+        self.kind = FIELD_KINDS.get(field.field_type, KIND_TEXT)
+        self.places = getattr(field, 'decimal_places', None) if self.kind == KIND_DECIMAL else None
+
+    @property
+    def signature(self):
+        return f"{self.name}:{self.kind}" + (f"({self.places})" if self.places is not None else '')
+
+    @property
+    def text_sql(self):
+        column = f'"{self.name}"'
+        if self.kind == KIND_BOOL:
+            return f"CASE WHEN {column} THEN 't' WHEN NOT {column} THEN 'f' END"
+        if self.kind == KIND_DATE:
+            return f"to_char({column}, 'YYYY-MM-DD')"
+        if self.kind == KIND_DATETIME:
+            return f"to_char({column}, 'YYYY-MM-DD HH24:MI:SS.US')"
+        if self.kind == KIND_FLOAT:
+            return f"{column}::numeric::text"
+        return f"{column}::text"
+
+    def text(self, value):
+        """Значение из моковых данных в записи ROW(...)::text"""
+        if value is None:
+            return ''
+        try:
+            value = self._canonical(value)
+        except (ValueError, TypeError, ArithmeticError):
+            # Запись не загрузится (ее отклонит сервер или проверка) - хеш
+            # таблицы все равно считается, он просто не совпадет
+            value = str(value)
+        if value and RECORD_QUOTED_CHARS.isdisjoint(value):
+            return value
+        return '"' + value.replace('\\', '\\\\').replace('"', '""') + '"'
+
+    def _canonical(self, value):
+        if self.kind == KIND_INT:
+            return str(int(value))
+        if self.kind == KIND_BOOL:
+            return 't' if _truth(value) else 'f'
+        if self.kind == KIND_DATE:
+            return _format_date(value)
+        if self.kind == KIND_DATETIME:
+            return _format_datetime(value)
+        if self.kind == KIND_DECIMAL:
+            return _format_decimal(value, self.places)
+        if self.kind == KIND_FLOAT:
+            return _format_float(value)
+        return str(value)
+
+
+def get_verify_columns(model):
+    """Колонки таблицы, входящие в хеш (без вычисляемых значений по умолчанию)"""
+    return [VerifyColumn(field) for field in model._meta.sorted_fields if not callable(field.default)]
+
+
+def columns_signature(columns):
+    """Описание колонок хеша: хеш из манифеста верен, только пока оно не изменилось"""
+    return ','.join(column.signature for column in columns)
+
+
+class ContentHash:
+    """Хеш содержимого таблицы: число строк и сумма 64-битных хешей строк."""
+
+    def __init__(self, rows=0, total=0):
+        self.rows = rows
+        self.total = total % HASH_MODULUS
+
+    def add(self, row_text):
+        digest = hashlib.md5(row_text.encode('utf-8')).hexdigest()
+        self.total = (self.total + int(digest[:16], 16)) % HASH_MODULUS
+        self.rows += 1
+
+    @property
+    def hexdigest(self):
+        return f"{self.total:016x}"
+
+
+def source_content_hash(model, records, columns=None):
+    """
+    Ожидаемый хеш таблицы по записям моковых данных. Автоинкрементный
+    ключ, которого нет в записи, - ее порядковый номер (как при загрузке)
+    """
+    columns = columns or get_verify_columns(model)
+    pk = model._meta.primary_key
+    content = ContentHash()
+    for position, record in enumerate(records, start=1):
+        parts = []
+        for column in columns:
+            value = column.copy_column.value(record)
+            if value is None and column.field is pk and isinstance(pk, AutoField):
+                value = position
+            parts.append(column.text(value))
+        content.add('(' + ','.join(parts) + ')')
+    return content
+
+
+def content_hash_sql(model, columns):
+    """Запрос хеша таблицы на сервере: одна строка (число строк, сумма хешей)"""
+    row = f"ROW({', '.join(column.text_sql for column in columns)})::text"
+    return (f"SELECT count(*), COALESCE(sum(('x' || left(md5({row}), 16))::bit(64)::bigint), 0)::text "
+            f'FROM "{model._meta.table_name}"')
+
+
+def server_content_hash(database, model, columns=None):
+    """Хеш таблицы, посчитанный на сервере одним запросом"""
+    columns = columns or get_verify_columns(model)
+    cursor = database.execute_sql(content_hash_sql(model, columns))
+    rows, total = cursor.fetchone()
+    return ContentHash(rows, int(total))
+
+
+class TableVerification:
+    """Итог проверки таблицы: строки и хеш в базе и ожидаемые."""
+
+    def __init__(self, table, expected, actual, source, duration):
+        self.table = table
+        self.expected = expected
+        self.actual = actual
+        self.source = source
+        self.duration = duration
+
+    @property
+    def ok(self):
+        return self.actual.rows == self.expected.rows and self.actual.total == self.expected.total
+
+    def to_row(self):
+        return [
+            self.table, self.actual.rows, self.expected.rows,
+            self.actual.hexdigest, self.expected.hexdigest, self.source,
+            f"{self.duration * 1000:.1f}", '✅' if self.ok else '❌',
+        ]
+
+
+def manifest_content_hash(entry, columns):
+    """Ожидаемый хеш из записи манифеста (или None, если его нет или колонки изменились)"""
+    if not entry or 'content_hash' not in entry or entry.get('content_columns') != columns_signature(columns):
+        return None
+    return ContentHash(entry['records'], int(entry['content_hash'], 16))
+
+
+def verify_table(database, model, expected, source):
+    """Считает хеш таблицы на сервере и сравнивает с ожидаемым"""
+    started = time.perf_counter()
+    actual = server_content_hash(database, model)
+    return TableVerification(model._meta.table_name, expected, actual, source, time.perf_counter() - started)
@@ -0,0 +1,144 @@
+"""
+Наблюдение за папкой набора данных (режим --watch).
+
+На Linux используется inotify (через ctypes, без сторонних пакетов):
+событие приходит сразу после записи файла. На других системах, или если
+inotify недоступен, папка опрашивается - сравниваются размер и mtime файлов.
+
+Редакторы сохраняют файл несколькими операциями (запись во временный файл,
+переименование, повторная запись), поэтому изменения собираются, пока в
+папке не наступит тишина на debounce секунд, и обрабатываются одним пакетом.
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+
+DEFAULT_DEBOUNCE = 0.3
+DEFAULT_POLL_INTERVAL = 0.5
+
+WATCHER_INOTIFY = 'inotify'
+WATCHER_POLLING = 'polling'
+
+# Константы inotify из <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+INOTIFY_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE
+INOTIFY_EVENT = struct.Struct('iIII')
+INOTIFY_READ_SIZE = 1 << 16
+
+
+class ChangeBatch:
+    """Пакет изменений: имена измененных файлов и время первого изменения."""
+
+    def __init__(self, files, first_seen):
+        self.files = set(files)
+        self.first_seen = first_seen
+
+
+class InotifyWatcher:
+    """Изменения файлов папки через inotify."""
+
+    method = WATCHER_INOTIFY
+
+    def __init__(self, path):
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 не удался")
+
+        if libc.inotify_add_watch(self.fd, os.fsencode(path), INOTIFY_MASK) < 0:
+            error = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(error, f"inotify_add_watch не удался для {path}")
+
+    def read(self, timeout):
+        """Имена файлов, измененных за время ожидания (до timeout секунд)"""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+
+        data = os.read(self.fd, INOTIFY_READ_SIZE)
+        names = set()
+        offset = 0
+        while offset < len(data):
+            _, _, _, length = INOTIFY_EVENT.unpack_from(data, offset)
+            offset += INOTIFY_EVENT.size
+            name = data[offset:offset + length].rstrip(b'\0')
+            offset += length
+            if name:
+                names.add(os.fsdecode(name))
+        return names
+
+    def close(self):
+        os.close(self.fd)
+
+
+class PollingWatcher:
+    """Изменения файлов папки опросом: размер и mtime."""
+
+    method = WATCHER_POLLING
+
+    def __init__(self, path, interval=DEFAULT_POLL_INTERVAL):
+        self.path = path
+        self.interval = interval
+        self.snapshot = self._scan()
+
+    def _scan(self):
+        snapshot = {}
+        for entry in os.scandir(self.path):
+            if entry.is_file():
+                stat = entry.stat()
+                snapshot[entry.name] = (stat.st_size, stat.st_mtime_ns)
+        return snapshot
+
+    def read(self, timeout):
+        """Имена файлов, измененных с прошлого опроса (опрос не чаще interval)"""
+        time.sleep(min(timeout, self.interval))
+        snapshot = self._scan()
+        names = {name for name in snapshot.keys() | self.snapshot.keys()
+                 if snapshot.get(name) != self.snapshot.get(name)}
+        self.snapshot = snapshot
+        return names
+
+    def close(self):
+        pass
+
+
+def create_watcher(path, polling=False):
+    """inotify на Linux, иначе (или если polling) - опрос папки"""
+    if not polling and sys.platform.startswith('linux'):
+        try:
+            return InotifyWatcher(path)
+        except (OSError, AttributeError):
+            # Нет inotify (или исчерпан лимит наблюдателей) - переходим на опрос
+            pass
+    return PollingWatcher(path)
+
+
+def wait_for_changes(watcher, cancel_token, debounce=DEFAULT_DEBOUNCE, tick=0.2):
+    """
+    Ждет изменений и собирает их, пока не наступит тишина на debounce секунд.
+    Возвращает ChangeBatch или None, если операция отменена.
+    """
+    files = set()
+    first_seen = None
+    while not cancel_token.is_cancelled:
+        changed = watcher.read(debounce if files else tick)
+        if changed:
+            if first_seen is None:
+                first_seen = time.perf_counter()
+            files |= changed
+        elif files:
+            return ChangeBatch(files, first_seen)
+    return None
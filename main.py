@@ -1,21 +1,56 @@
+import json
 import sys
+import time
+
+# Начало отсчета для --startup-benchmark: до импорта Qt и интерфейса
+STARTED = time.perf_counter()
+STARTED_WALL = time.time()
 
 from PyQt6.QtWidgets import QApplication
 
 from ui.main_window import MainWindow
 from ui.utils import get_app_icon
 
+STARTUP_BENCHMARK_FLAG = '--startup-benchmark'
+
+
+def report_startup(window, imported, created):
+    """Печатает тайминги запуска (JSON строкой в stdout) и закрывает окно"""
+    monitor = window.startup_monitor
+    ms = lambda seconds: round(seconds * 1000, 2)
+    report = {
+        'imports_ms': ms(imported - STARTED),
+        'window_ms': ms(created - imported),
+        'first_paint_ms': ms(monitor.first_paint_at - STARTED),
+        'first_paint_wall': STARTED_WALL + (monitor.first_paint_at - STARTED),
+        'warm_up_ms': ms(monitor.warm_up_duration),
+        'warmed_up_ms': ms(monitor.warmed_up_at - STARTED),
+        'loaded_before_paint': monitor.loaded_before_paint,
+        'warm_up_error': monitor.warm_up_error,
+    }
+    # stdout перенаправлен в консоль окна
+    sys.__stdout__.write(json.dumps(report) + '\n')
+    sys.__stdout__.flush()
+    window.close()
+
 
 def main():
+    imported = time.perf_counter()
+
     # Создаем приложение PyQt
     app = QApplication(sys.argv)
 
     # Создаем и показываем главное окно
     window = MainWindow()
+    created = time.perf_counter()
 
     app.setApplicationName("PSQL Mock Creator")
     app.setWindowIcon(get_app_icon())
 
+    if STARTUP_BENCHMARK_FLAG in sys.argv:
+        # Замер запуска: окно закрывается, когда слой работы с БД загружен
+        window.startup_monitor.warmed_up.connect(lambda: report_startup(window, imported, created))
+
     window.show()
 
     # Запускаем главный цикл приложения
@@ -1,6 +1,7 @@
 from peewee import *
 
 from core.config_manager import create_database_connection
+from core.index_profiles import IndexSpec
 
 # Создаем подключение к базе данных
 database = create_database_connection('air_travel')
@@ -102,6 +103,32 @@ class Passenger(BaseModel):
 # Список всех моделей для этой БД
 MODELS = [Airline, Airport, Aircraft, Flight, Passenger]
 
+# Профили вторичных индексов (см. core/index_profiles.py)
+INDEX_PROFILES = {
+    'oltp': {
+        'extends': 'default',
+        'indexes': [
+            IndexSpec('flights_flight_number', 'flights', ['flight_number']),
+            IndexSpec('passengers_name', 'passengers', ['last_name', 'first_name']),
+            IndexSpec('passengers_booking_reference', 'passengers', ['booking_reference']),
+        ],
+    },
+    'analytical': {
+        'indexes': [
+            IndexSpec('flights_departure_time_brin', 'flights', ['departure_time'], method='brin'),
+            IndexSpec('passengers_flight_id_covering', 'passengers', ['flight_id'], include=['class_type']),
+            IndexSpec('flights_active_departure_time', 'flights', ['departure_time'],
+                      where="status IN ('scheduled', 'boarding', 'delayed')"),
+        ],
+    },
+}
+
+# Секционирование по месяцам в раскладке partitioned (см. core/partitioning.py).
+# У пассажиров нет собственной даты, таблица остается несекционированной
+PARTITIONING = {
+    'flights': 'departure_time',
+}
+
 
 def get_models():
     return MODELS
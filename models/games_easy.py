@@ -1,6 +1,7 @@
 from peewee import *
 
 from core.config_manager import create_database_connection
+from core.index_profiles import IndexSpec
 
 # Создаем подключение к базе данных
 database = create_database_connection('games_easy')
@@ -27,6 +28,23 @@ class Game(BaseModel):
 # Список всех моделей для этой БД
 MODELS = [Game]
 
+# Профили вторичных индексов (см. core/index_profiles.py)
+INDEX_PROFILES = {
+    'oltp': {
+        'extends': 'default',
+        'indexes': [
+            IndexSpec('games_title', 'games', ['title']),
+            IndexSpec('games_platform_rating', 'games', ['platform', 'rating']),
+        ],
+    },
+    'analytical': {
+        'indexes': [
+            IndexSpec('games_release_year_brin', 'games', ['release_year'], method='brin'),
+            IndexSpec('games_genre_covering', 'games', ['genre'], include=['rating', 'price']),
+        ],
+    },
+}
+
 
 def get_models():
     return MODELS
@@ -1,6 +1,7 @@
 from peewee import *
 
 from core.config_manager import create_database_connection
+from core.index_profiles import IndexSpec
 
 # Создаем подключение к базе данных
 database = create_database_connection('games_shop')
@@ -62,6 +63,31 @@ class OrderItem(BaseModel):
 # Список всех моделей для этой БД
 MODELS = [Game, Customer, Order, OrderItem]
 
+# Профили вторичных индексов (см. core/index_profiles.py)
+INDEX_PROFILES = {
+    'oltp': {
+        'extends': 'default',
+        'indexes': [
+            IndexSpec('customers_name', 'customers', ['last_name', 'first_name']),
+            IndexSpec('orders_customer_id_order_date', 'orders', ['customer_id', 'order_date']),
+            IndexSpec('orders_pending', 'orders', ['order_date'], where="status = 'pending'"),
+        ],
+    },
+    'analytical': {
+        'indexes': [
+            IndexSpec('orders_order_date_brin', 'orders', ['order_date'], method='brin'),
+            IndexSpec('order_items_order_id_covering', 'order_items', ['order_id'],
+                      include=['game_id', 'quantity', 'unit_price']),
+            IndexSpec('orders_completed_order_date', 'orders', ['order_date'], where="status = 'completed'"),
+        ],
+    },
+}
+
+# Секционирование по месяцам в раскладке partitioned (см. core/partitioning.py)
+PARTITIONING = {
+    'orders': 'order_date',
+}
+
 
 def get_models():
     return MODELS
@@ -1,6 +1,7 @@
 from peewee import *
 
 from core.config_manager import create_database_connection
+from core.index_profiles import IndexSpec
 
 # Создаем подключение к базе данных
 database = create_database_connection('school_world')
@@ -59,6 +60,23 @@ class Grade(BaseModel):
 # Список всех моделей для этой БД
 MODELS = [Teacher, Class, Student, Subject, Grade]
 
+# Профили вторичных индексов (см. core/index_profiles.py)
+INDEX_PROFILES = {
+    'oltp': {
+        'extends': 'default',
+        'indexes': [
+            IndexSpec('students_name', 'students', ['last_name', 'first_name']),
+            IndexSpec('grades_student_id_date', 'grades', ['student_id', 'date']),
+        ],
+    },
+    'analytical': {
+        'indexes': [
+            IndexSpec('grades_date_brin', 'grades', ['date'], method='brin'),
+            IndexSpec('grades_subject_id_covering', 'grades', ['subject_id'], include=['grade']),
+        ],
+    },
+}
+
 
 def get_models():
     return MODELS
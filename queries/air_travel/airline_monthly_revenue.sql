@@ -0,0 +1,12 @@
+-- Оценка выручки авиакомпаний по месяцам вылета
+-- по базовой цене класса обслуживания пассажира
+SELECT al.name AS airline,
+       date_trunc('month', f.departure_time) AS month,
+       COUNT(p.id) AS tickets,
+       SUM(CASE WHEN p.class_type = 'business' THEN f.base_price_business
+                ELSE f.base_price_economy END) AS revenue
+FROM passengers p
+JOIN flights f ON f.id = p.flight_id
+JOIN airlines al ON al.id = f.airline_id
+GROUP BY al.name, date_trunc('month', f.departure_time)
+ORDER BY month, revenue DESC NULLS LAST;
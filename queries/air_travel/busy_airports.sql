@@ -0,0 +1,17 @@
+-- Самые загруженные аэропорты: вылеты и прилеты вместе
+SELECT ap.iata_code, ap.city, movements.departures, movements.arrivals,
+       movements.departures + movements.arrivals AS total
+FROM (
+    SELECT airport_id,
+           COUNT(*) FILTER (WHERE kind = 'departure') AS departures,
+           COUNT(*) FILTER (WHERE kind = 'arrival') AS arrivals
+    FROM (
+        SELECT departure_airport_id AS airport_id, 'departure' AS kind FROM flights
+        UNION ALL
+        SELECT arrival_airport_id, 'arrival' FROM flights
+    ) m
+    GROUP BY airport_id
+) movements
+JOIN airports ap ON ap.id = movements.airport_id
+ORDER BY total DESC
+LIMIT 10;
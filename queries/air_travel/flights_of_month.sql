@@ -0,0 +1,10 @@
+-- Рейсы за июнь 2024 по статусам. В раскладке partitioned план читает
+-- только секцию flights_p2024_06 (отсечение секций)
+SELECT f.status,
+       COUNT(*) AS flights,
+       MIN(f.departure_time) AS first_departure,
+       MAX(f.departure_time) AS last_departure
+FROM flights f
+WHERE f.departure_time >= '2024-06-01' AND f.departure_time < '2024-07-01'
+GROUP BY f.status
+ORDER BY f.status;
@@ -0,0 +1,19 @@
+-- Загрузка маршрутов: число рейсов и пассажиров по направлениям
+-- и средняя заполненность относительно вместимости самолетов
+SELECT dep.iata_code AS departure,
+       arr.iata_code AS arrival,
+       COUNT(*) AS flights,
+       SUM(COALESCE(pax.passengers, 0)) AS passengers,
+       ROUND(100.0 * SUM(COALESCE(pax.passengers, 0))
+             / NULLIF(SUM(COALESCE(a.capacity_economy, 0) + COALESCE(a.capacity_business, 0)), 0), 1) AS load_percent
+FROM flights f
+JOIN airports dep ON dep.id = f.departure_airport_id
+JOIN airports arr ON arr.id = f.arrival_airport_id
+LEFT JOIN aircrafts a ON a.id = f.aircraft_id
+LEFT JOIN (
+    SELECT flight_id, COUNT(*) AS passengers
+    FROM passengers
+    GROUP BY flight_id
+) pax ON pax.flight_id = f.id
+GROUP BY dep.iata_code, arr.iata_code
+ORDER BY passengers DESC, flights DESC;
@@ -0,0 +1,8 @@
+-- Статистика по жанрам: число игр, средний рейтинг и цена
+SELECT genre,
+       COUNT(*) AS games,
+       ROUND(AVG(rating)::numeric, 2) AS avg_rating,
+       ROUND(AVG(price)::numeric, 2) AS avg_price
+FROM games
+GROUP BY genre
+ORDER BY avg_rating DESC;
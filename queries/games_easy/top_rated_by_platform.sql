@@ -0,0 +1,9 @@
+-- Лучшие игры каждой платформы (оконная функция)
+SELECT platform, title, rating
+FROM (
+    SELECT platform, title, rating,
+           ROW_NUMBER() OVER (PARTITION BY platform ORDER BY rating DESC) AS place
+    FROM games
+) ranked
+WHERE place <= 3
+ORDER BY platform, place;
@@ -0,0 +1,8 @@
+-- Продажи по месяцам и статусам заказов
+SELECT date_trunc('month', o.order_date) AS month,
+       o.status,
+       COUNT(*) AS orders,
+       SUM(o.total_amount) AS amount
+FROM orders o
+GROUP BY date_trunc('month', o.order_date), o.status
+ORDER BY month, o.status;
@@ -0,0 +1,9 @@
+-- Заказы за март 2024. В раскладке partitioned план читает только
+-- секцию orders_p2024_03 (отсечение секций)
+SELECT o.status,
+       COUNT(*) AS orders,
+       SUM(o.total_amount) AS amount
+FROM orders o
+WHERE o.order_date >= '2024-03-01' AND o.order_date < '2024-04-01'
+GROUP BY o.status
+ORDER BY o.status;
@@ -0,0 +1,11 @@
+-- Выручка по покупателям: число заказов, сумма и средний чек
+-- (только выполненные заказы)
+SELECT c.id, c.first_name, c.last_name, c.city,
+       COUNT(DISTINCT o.id) AS orders,
+       SUM(oi.quantity * oi.unit_price) AS revenue,
+       ROUND(SUM(oi.quantity * oi.unit_price) / COUNT(DISTINCT o.id), 2) AS avg_order
+FROM customers c
+JOIN orders o ON o.customer_id = c.id AND o.status = 'completed'
+JOIN order_items oi ON oi.order_id = o.id
+GROUP BY c.id, c.first_name, c.last_name, c.city
+ORDER BY revenue DESC;
@@ -0,0 +1,10 @@
+-- Самые продаваемые игры и их доля в выручке жанра
+SELECT g.title, g.genre,
+       SUM(oi.quantity) AS sold,
+       SUM(oi.quantity * oi.unit_price) AS revenue,
+       ROUND(100 * SUM(oi.quantity * oi.unit_price)
+             / SUM(SUM(oi.quantity * oi.unit_price)) OVER (PARTITION BY g.genre), 1) AS genre_share
+FROM order_items oi
+JOIN games g ON g.id = oi.game_id
+GROUP BY g.id, g.title, g.genre
+ORDER BY revenue DESC;
@@ -0,0 +1,9 @@
+-- Средний балл учеников по всем предметам с местом в классе
+SELECT cl.name AS class, s.last_name, s.first_name,
+       ROUND(AVG(g.grade), 2) AS avg_grade,
+       RANK() OVER (PARTITION BY cl.id ORDER BY AVG(g.grade) DESC) AS place
+FROM students s
+JOIN classes cl ON cl.id = s.class_id
+JOIN grades g ON g.student_id = s.id
+GROUP BY cl.id, cl.name, s.id, s.last_name, s.first_name
+ORDER BY cl.name, place;
@@ -0,0 +1,9 @@
+-- Средние оценки по предметам и учителям
+SELECT sub.name AS subject, t.last_name AS teacher,
+       COUNT(g.id) AS grades,
+       ROUND(AVG(g.grade), 2) AS avg_grade
+FROM subjects sub
+JOIN teachers t ON t.id = sub.teacher_id
+LEFT JOIN grades g ON g.subject_id = sub.id
+GROUP BY sub.id, sub.name, t.last_name
+ORDER BY avg_grade DESC NULLS LAST;
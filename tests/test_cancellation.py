@@ -0,0 +1,267 @@
+"""
+Отмена операций: токен отмены, pg_cancel_backend и задержка от запроса
+отмены до остановки загрузки (cancel-to-idle).
+
+Сервер PostgreSQL не нужен: соединения заменены заглушками, у которых
+"запрос" выполняется, пока его не прервет pg_cancel_backend.
+"""
+
+import threading
+import time
+from contextlib import nullcontext
+
+import pytest
+from peewee import CharField, IntegerField, Model
+from psycopg2.extensions import QueryCanceledError
+
+from core.cancellation import CancellationToken, OperationCancelled
+from core.checkpoints import LoadCheckpoints
+from core.database_manager import DatabaseManager
+from core.events import EventBus, LogMessage
+
+# Время "долгого запроса": без pg_cancel_backend загрузка остановилась бы только после него
+STATEMENT_TIME = 5.0
+
+# Через сколько после начала загрузки запрашивается отмена
+CANCEL_AFTER = 0.05
+
+# Допустимая задержка от запроса отмены до остановки загрузки
+CANCEL_LATENCY_LIMIT = 0.5
+
+
+class FakeServer:
+    """Сервер-заглушка: запросы ждут STATEMENT_TIME или pg_cancel_backend."""
+
+    def __init__(self, statement_time=STATEMENT_TIME):
+        self.statement_time = statement_time
+        self.cancelled = threading.Event()
+        self.cancelled_pids = []
+        self.statements = []
+
+    def run_statement(self, sql):
+        self.statements.append(sql)
+        if self.cancelled.wait(self.statement_time):
+            raise QueryCanceledError("canceling statement due to user request")
+
+
+class FakeCursor:
+    def __init__(self, server):
+        self.server = server
+
+    def execute(self, sql, params=None):
+        if 'pg_cancel_backend' in sql:
+            self.server.cancelled_pids.extend(params[0])
+            self.server.cancelled.set()
+
+    def copy_expert(self, sql, buffer):
+        self.server.run_statement(sql)
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self, server):
+        self.server = server
+        self.closed = False
+
+    def cursor(self):
+        return FakeCursor(self.server)
+
+    def close(self):
+        self.closed = True
+
+
+class FakeDatabase:
+    """Заглушка peewee базы: транзакции и служебные запросы ничего не делают."""
+
+    database = 'cancel_test'
+
+    def __init__(self, server):
+        self.server = server
+
+    def atomic(self):
+        return nullcontext()
+
+    def cursor(self):
+        return FakeCursor(self.server)
+
+    def execute_sql(self, sql, params=None):
+        pass
+
+
+class Passenger(Model):
+    name = CharField()
+    seat = IntegerField()
+
+    class Meta:
+        table_name = 'passengers'
+
+
+def fake_model(server):
+    """Модель, у которой create() - долгий запрос на сервере-заглушке"""
+
+    class SlowPassenger:
+        @staticmethod
+        def create(**record):
+            server.run_statement('INSERT INTO "passengers"')
+
+    return SlowPassenger
+
+
+def make_manager(server):
+    manager = DatabaseManager({}, event_bus=EventBus())
+    manager._connect_admin = lambda: FakeConnection(server)
+    manager.cancel_token.register_backend(4242)
+    return manager
+
+
+def records(count):
+    return [{'name': f'passenger {i}', 'seat': i} for i in range(count)]
+
+
+def cancel_later(manager, delay=CANCEL_AFTER):
+    timer = threading.Timer(delay, manager.cancel)
+    timer.start()
+    return timer
+
+
+def measure_cancel(manager, load):
+    """Запускает загрузку, отменяет ее и возвращает задержку отмены в секундах"""
+    timer = cancel_later(manager)
+    try:
+        with pytest.raises(OperationCancelled):
+            load()
+        return manager.cancel_token.latency()
+    finally:
+        timer.cancel()
+
+
+class TestCancellationToken:
+    def test_not_cancelled_by_default(self):
+        token = CancellationToken()
+        assert not token.is_cancelled
+        assert token.latency() is None
+        token.raise_if_cancelled()
+
+    def test_cancel_raises(self):
+        token = CancellationToken()
+        token.cancel()
+        assert token.is_cancelled
+        with pytest.raises(OperationCancelled):
+            token.raise_if_cancelled()
+
+    def test_repeated_cancel_keeps_first_time(self):
+        token = CancellationToken()
+        token.cancel()
+        cancelled_at = token.cancelled_at
+        time.sleep(0.01)
+        token.cancel()
+        assert token.cancelled_at == cancelled_at
+        assert token.latency() >= 0.01
+
+    def test_backend_registration(self):
+        token = CancellationToken()
+        token.register_backend(30)
+        token.register_backend(10)
+        token.register_backend(30)
+        assert token.backend_pids() == [10, 30]
+
+        token.unregister_backend(30)
+        token.unregister_backend(99)
+        assert token.backend_pids() == [10]
+
+    def test_cancel_from_another_thread(self):
+        token = CancellationToken()
+        thread = threading.Thread(target=token.cancel)
+        thread.start()
+        thread.join()
+        assert token.is_cancelled
+
+
+class TestCancelBackends:
+    def test_cancel_calls_pg_cancel_backend(self):
+        server = FakeServer()
+        manager = make_manager(server)
+        manager.cancel_token.register_backend(17)
+
+        manager.cancel()
+
+        assert manager.cancel_token.is_cancelled
+        assert server.cancelled_pids == [17, 4242]
+
+    def test_cancel_without_backends_does_not_connect(self):
+        manager = DatabaseManager({}, event_bus=EventBus())
+        manager._connect_admin = lambda: pytest.fail("соединение не нужно: прерывать нечего")
+
+        manager.cancel()
+
+        assert manager.cancel_token.is_cancelled
+
+    def test_second_cancel_is_ignored(self):
+        server = FakeServer()
+        manager = make_manager(server)
+        manager.cancel()
+        manager.cancel()
+        assert server.cancelled_pids == [4242]
+
+    def test_admin_connection_error_is_logged(self):
+        messages = []
+        events = EventBus()
+        events.subscribe(lambda event: messages.append(event.text), (LogMessage,))
+        manager = DatabaseManager({}, event_bus=events)
+        manager.cancel_token.register_backend(1)
+
+        def refuse():
+            raise OSError("connection refused")
+
+        manager._connect_admin = refuse
+        manager.cancel()
+
+        assert manager.cancel_token.is_cancelled
+        assert any('connection refused' in message for message in messages)
+
+
+class TestCancelLatency:
+    def test_insert_records(self):
+        server = FakeServer()
+        manager = make_manager(server)
+        database = FakeDatabase(server)
+
+        latency = measure_cancel(manager, lambda: manager._insert_records(
+            database, fake_model(server), 'passengers', records(10), 10, time.perf_counter()
+        ))
+
+        assert server.cancelled_pids == [4242]
+        assert latency < CANCEL_LATENCY_LIMIT
+
+    def test_copy_records(self):
+        server = FakeServer()
+        manager = make_manager(server)
+        database = FakeDatabase(server)
+        checkpoints = LoadCheckpoints(database, 'fingerprint')
+
+        latency = measure_cancel(manager, lambda: manager._copy_records(
+            database, Passenger, 'passengers', iter(records(1000)), 1000, 100, time.perf_counter(), checkpoints
+        ))
+
+        assert server.cancelled_pids == [4242]
+        assert latency < CANCEL_LATENCY_LIMIT
+        # Прерванный пакет не отмечен контрольной точкой и не загружается построчно
+        assert checkpoints.get('passengers').done == 0
+        assert len(server.statements) == 1
+
+    def test_fast_statements_stop_between_records(self):
+        # Запросы короткие: загрузка останавливается на проверке токена между записями
+        server = FakeServer(statement_time=0.001)
+        manager = make_manager(server)
+        manager._connect_admin = lambda: FakeConnection(FakeServer())
+        database = FakeDatabase(server)
+        data = records(100000)
+
+        latency = measure_cancel(manager, lambda: manager._insert_records(
+            database, fake_model(server), 'passengers', data, len(data), time.perf_counter()
+        ))
+
+        assert 0 < len(server.statements) < len(data)
+        assert latency < CANCEL_LATENCY_LIMIT
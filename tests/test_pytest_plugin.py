@@ -0,0 +1,273 @@
+"""
+Плагин core.pytest_plugin: фикстуры <набор>_db, изоляция, имена копий
+воркеров xdist и сводка времени подготовки баз.
+
+Тесты запускают вложенную сессию pytest (pytester). Сервер не нужен:
+conftest вложенной сессии подменяет соединения psycopg2 и сборку
+шаблонов и записывает выполненные команды в events.json.
+"""
+
+import json
+
+import pytest
+
+from core.config_manager import DATABASES_CONFIG
+
+PLUGIN = ('-p', 'core.pytest_plugin')
+
+FAKE_SERVER_CONFTEST = '''
+import json
+import types
+
+import pytest
+
+import core.pytest_plugin as plugin
+
+EVENTS = []
+
+
+class FakeCursor:
+    def __init__(self, name):
+        self.name = name
+
+    def execute(self, sql, params=None):
+        EVENTS.append(['sql', self.name, sql])
+
+    def fetchall(self):
+        return [(1,)]
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+class FakeConnection:
+    def __init__(self, name):
+        self.name = name
+        self.closed = False
+
+    def cursor(self):
+        return FakeCursor(self.name)
+
+    def rollback(self):
+        EVENTS.append(['rollback', self.name])
+
+    def close(self):
+        self.closed = True
+
+
+def build_templates(manager, datasets):
+    EVENTS.append(['build', datasets])
+    return True
+
+
+@pytest.fixture(scope='session', autouse=True)
+def fake_server():
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(plugin, 'psycopg2', types.SimpleNamespace(connect=lambda **dsn: FakeConnection(dsn['dbname'])))
+        patch.setattr(plugin, 'connect_admin', lambda config: FakeConnection('postgres'))
+        patch.setattr(plugin.DatabaseManager, 'build_templates', build_templates)
+        yield
+
+
+def pytest_sessionfinish(session):
+    with open('events.json', 'w') as f:
+        json.dump(EVENTS, f)
+'''
+
+
+@pytest.fixture
+def dataset_pytester(pytester, monkeypatch):
+    monkeypatch.delenv('PYTEST_XDIST_WORKER', raising=False)
+    pytester.makeconftest(FAKE_SERVER_CONFTEST)
+    return pytester
+
+
+def read_events(pytester):
+    return json.loads((pytester.path / 'events.json').read_text())
+
+
+def statements(pytester):
+    """SQL администратора: создание и удаление копий"""
+    return [event[2] for event in read_events(pytester) if event[:2] == ['sql', 'postgres']]
+
+
+def created(name, template='school_world__template'):
+    return f'CREATE DATABASE "{name}" TEMPLATE "{template}"'
+
+
+def dropped(name):
+    return f'DROP DATABASE IF EXISTS "{name}" WITH (FORCE)'
+
+
+def test_dataset_fixtures_are_generated(dataset_pytester):
+    result = dataset_pytester.runpytest(*PLUGIN, '--fixtures')
+
+    assert result.ret == 0
+    for dataset in DATABASES_CONFIG:
+        result.stdout.fnmatch_lines([f'{dataset}_db*'])
+
+
+def test_transaction_isolation_shares_worker_copy(dataset_pytester):
+    dataset_pytester.makepyfile('''
+        def test_first(school_world_db):
+            assert school_world_db.name == 'school_world__test_main'
+            assert school_world_db.dsn['dbname'] == 'school_world__test_main'
+
+        def test_second(school_world_db):
+            assert school_world_db.fetchall('SELECT 1') == [(1,)]
+    ''')
+
+    result = dataset_pytester.runpytest(*PLUGIN)
+
+    result.assert_outcomes(passed=2)
+    events = read_events(dataset_pytester)
+    # Шаблон собирается один раз, копия воркера создается один раз и удаляется в конце сессии
+    assert events.count(['build', ['school_world']]) == 1
+    assert events.count(['rollback', 'school_world__test_main']) == 2
+    assert statements(dataset_pytester) == [
+        dropped('school_world__test_main'),
+        created('school_world__test_main'),
+        dropped('school_world__test_main'),
+    ]
+
+
+def test_clone_isolation_creates_copy_per_test(dataset_pytester):
+    dataset_pytester.makepyfile('''
+        def test_first(school_world_db):
+            assert school_world_db.name == 'school_world__test_main_1'
+
+        def test_second(school_world_db):
+            assert school_world_db.name == 'school_world__test_main_2'
+    ''')
+
+    result = dataset_pytester.runpytest(*PLUGIN, '--dataset-isolation', 'clone')
+
+    result.assert_outcomes(passed=2)
+    assert ['rollback', 'school_world__test_main_1'] not in read_events(dataset_pytester)
+    assert statements(dataset_pytester) == [
+        dropped('school_world__test_main_1'),
+        created('school_world__test_main_1'),
+        dropped('school_world__test_main_1'),
+        dropped('school_world__test_main_2'),
+        created('school_world__test_main_2'),
+        dropped('school_world__test_main_2'),
+    ]
+
+
+def test_marker_overrides_option(dataset_pytester):
+    dataset_pytester.makepyfile('''
+        import pytest
+
+        @pytest.mark.dataset_isolation('clone')
+        def test_clone(school_world_db):
+            assert school_world_db.name == 'school_world__test_main_1'
+
+        def test_default(school_world_db):
+            assert school_world_db.name == 'school_world__test_main'
+    ''')
+
+    result = dataset_pytester.runpytest(*PLUGIN)
+
+    result.assert_outcomes(passed=2)
+
+
+def test_marker_transaction_overrides_clone_option(dataset_pytester):
+    dataset_pytester.makepyfile('''
+        import pytest
+
+        @pytest.mark.dataset_isolation('transaction')
+        def test_transaction(school_world_db):
+            assert school_world_db.name == 'school_world__test_main'
+    ''')
+
+    result = dataset_pytester.runpytest(*PLUGIN, '--dataset-isolation', 'clone')
+
+    result.assert_outcomes(passed=1)
+    assert ['rollback', 'school_world__test_main'] in read_events(dataset_pytester)
+
+
+def test_unknown_marker_isolation_is_usage_error(dataset_pytester):
+    dataset_pytester.makepyfile('''
+        import pytest
+
+        @pytest.mark.dataset_isolation('snapshot')
+        def test_snapshot(school_world_db):
+            pass
+    ''')
+
+    result = dataset_pytester.runpytest(*PLUGIN)
+
+    result.assert_outcomes(errors=1)
+    result.stdout.fnmatch_lines(['*UsageError*Неизвестная изоляция*snapshot*'])
+
+
+def test_unknown_option_isolation_is_rejected(dataset_pytester):
+    result = dataset_pytester.runpytest(*PLUGIN, '--dataset-isolation', 'snapshot')
+
+    assert result.ret == pytest.ExitCode.USAGE_ERROR
+
+
+def test_worker_copies_are_named_by_xdist_worker(dataset_pytester, monkeypatch):
+    monkeypatch.setenv('PYTEST_XDIST_WORKER', 'gw3')
+    dataset_pytester.makepyfile('''
+        import pytest
+
+        def test_worker(school_world_db):
+            assert school_world_db.name == 'school_world__test_gw3'
+
+        @pytest.mark.dataset_isolation('clone')
+        def test_clone(school_world_db):
+            assert school_world_db.name == 'school_world__test_gw3_1'
+    ''')
+
+    result = dataset_pytester.runpytest(*PLUGIN)
+
+    result.assert_outcomes(passed=2)
+    assert created('school_world__test_gw3') in statements(dataset_pytester)
+    assert created('school_world__test_gw3_1') in statements(dataset_pytester)
+
+
+def test_setup_overhead_summary(dataset_pytester):
+    dataset_pytester.makepyfile('''
+        def test_first(school_world_db):
+            pass
+
+        def test_second(school_world_db):
+            pass
+
+        def test_without_database():
+            pass
+    ''')
+
+    result = dataset_pytester.runpytest(*PLUGIN, '--junitxml', 'report.xml')
+
+    result.assert_outcomes(passed=3)
+    result.stdout.fnmatch_lines([
+        '*подготовка баз наборов данных*',
+        'Изоляция: transaction; тестов с базой: 2',
+        'Подготовка: всего * мс, p50 * мс, p95 * мс, макс * мс',
+        'Очистка: всего * мс, p50 * мс',
+        'Самые долгие*',
+        '*мс  test_setup_overhead_summary.py::test_first',
+    ])
+    report = (dataset_pytester.path / 'report.xml').read_text()
+    assert 'dataset_db_setup_ms' in report
+    assert 'dataset_db_teardown_ms' in report
+
+
+def test_no_summary_without_dataset_tests(dataset_pytester):
+    dataset_pytester.makepyfile('''
+        def test_plain():
+            pass
+    ''')
+
+    result = dataset_pytester.runpytest(*PLUGIN)
+
+    result.assert_outcomes(passed=1)
+    result.stdout.no_fnmatch_line('*подготовка баз наборов данных*')
@@ -0,0 +1,114 @@
+"""
+Сборка шаблона набора (<база>__template) для пула --serve и фикстур
+pytest: набор загружается прямо в шаблон, рабочая база набора не
+удаляется и не пересоздается.
+
+Сервер не нужен: административное соединение заменено заглушкой,
+которая записывает выполненные команды, а загрузка набора - записью
+базы, в которую подключены модели.
+"""
+
+import importlib
+
+import pytest
+
+from core.config_manager import DATABASES_CONFIG
+from core.database_manager import DatabaseManager
+from core.events import EventBus
+
+DATASET = 'school_world'
+TEMPLATE = 'school_world__template'
+
+
+class FakeServer:
+    def __init__(self, template_fingerprint=None):
+        self.template_fingerprint = template_fingerprint
+        self.statements = []
+        self.loaded_into = []
+
+
+class FakeCursor:
+    def __init__(self, server):
+        self.server = server
+        self.result = None
+
+    def execute(self, sql, params=None):
+        self.server.statements.append(sql)
+        if 'COMMENT ON DATABASE' in sql:
+            self.server.template_fingerprint = params[0]
+        # Запрос отпечатка шаблона; проверки существования баз ничего не находят
+        self.result = (self.server.template_fingerprint,) if 'shobj_description' in sql else None
+
+    def fetchone(self):
+        return self.result
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self, server):
+        self.server = server
+
+    def cursor(self):
+        return FakeCursor(self.server)
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def server(monkeypatch):
+    server = FakeServer()
+
+    def load(manager, db_name, db_config, target):
+        database = importlib.import_module(db_config['models_module']).get_database()
+        server.loaded_into.append((target, database.database))
+        return True
+
+    monkeypatch.setattr(DatabaseManager, '_connect_admin', lambda manager: FakeConnection(server))
+    monkeypatch.setattr(DatabaseManager, '_create_single_database_impl', load)
+    return server
+
+
+def make_manager():
+    return DatabaseManager({}, event_bus=EventBus())
+
+
+def test_template_is_built_without_touching_source_database(server):
+    assert make_manager().build_templates([DATASET])
+
+    # Модели загружали данные в шаблон и после сборки снова подключены к базе набора
+    assert server.loaded_into == [(TEMPLATE, TEMPLATE)]
+    database = importlib.import_module(DATABASES_CONFIG[DATASET]['models_module']).get_database()
+    assert database.database == DATASET
+
+    assert f'ALTER DATABASE "{TEMPLATE}" IS_TEMPLATE true' in server.statements
+    for sql in server.statements:
+        assert f'DATABASE "{DATASET}"' not in sql
+        assert f'DATABASE IF EXISTS "{DATASET}"' not in sql
+        assert f'TEMPLATE "{DATASET}"' not in sql
+
+
+def test_current_template_is_not_rebuilt(server):
+    manager = make_manager()
+    manager.build_templates([DATASET])
+    server.statements.clear()
+
+    assert manager.build_templates([DATASET])
+
+    assert server.loaded_into == [(TEMPLATE, TEMPLATE)]
+    assert not any('CREATE DATABASE' in sql or 'DROP DATABASE' in sql for sql in server.statements)
+
+
+def test_model_change_rebuilds_template(server, monkeypatch):
+    make_manager().build_templates([DATASET])
+    built = server.template_fingerprint
+
+    # Данные набора те же, изменилось только определение модели
+    model = importlib.import_module(DATABASES_CONFIG[DATASET]['models_module']).get_models()[0]
+    monkeypatch.setattr(model._meta, 'indexes', [(('id',), True)])
+    make_manager().build_templates([DATASET])
+
+    assert server.template_fingerprint != built
+    assert len(server.loaded_into) == 2
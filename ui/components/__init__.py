@@ -2,11 +2,13 @@
 Компоненты UI (не виджеты).
 """
 
+from .startup_monitor import StartupMonitor
 from .status_bar_component import StatusBarComponent
 from .theme_manager import ThemeManager
 from .worker_manager import WorkerManager, WorkerSignals
 
 __all__ = [
+    'StartupMonitor',
     'StatusBarComponent',
     'ThemeManager',
     'WorkerManager',
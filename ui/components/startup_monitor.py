@@ -0,0 +1,70 @@
+import sys
+import threading
+import time
+from typing import List, Optional
+
+from PyQt6.QtCore import QEvent, QObject, QTimer, pyqtSignal
+
+# Модули слоя работы с БД: до первой отрисовки окна их быть не должно
+DATABASE_LAYER_MODULES = ('peewee', 'psycopg2', 'core.database_manager')
+
+
+def warm_up_database_layer() -> None:
+    """Импортирует слой работы с БД (DatabaseManager, peewee, psycopg2)."""
+    # Явные import (а не importlib): PyInstaller находит их при сборке
+    import core.database_manager  # noqa: F401
+    import core.events  # noqa: F401
+
+
+class StartupMonitor(QObject):
+    """
+    Первая отрисовка главного окна и фоновый прогрев слоя работы с БД.
+
+    Слой работы с БД не нужен для первой отрисовки, поэтому импортируется
+    после нее в фоновом потоке: к первой операции он уже загружен, и
+    DatabaseJob не останавливает интерфейс на время импорта.
+    """
+    first_painted = pyqtSignal()
+    warmed_up = pyqtSignal()
+
+    def __init__(self, window: QObject):
+        super().__init__(window)
+        self.window = window
+        self.first_paint_at: Optional[float] = None
+        self.loaded_before_paint: List[str] = []
+        self.warm_up_started_at: Optional[float] = None
+        self.warmed_up_at: Optional[float] = None
+        self.warm_up_error: Optional[str] = None
+        window.installEventFilter(self)
+
+    def eventFilter(self, watched: QObject, event: QEvent) -> bool:
+        if watched is self.window and event.type() == QEvent.Type.Paint and self.first_paint_at is None:
+            self.first_paint_at = time.perf_counter()
+            self.loaded_before_paint = [name for name in DATABASE_LAYER_MODULES if name in sys.modules]
+            self.window.removeEventFilter(self)
+            # Сигнал - после завершения отрисовки, а не посреди нее
+            QTimer.singleShot(0, self.first_painted.emit)
+        return False
+
+    def warm_up(self) -> None:
+        """Запускает импорт слоя работы с БД в фоновом потоке"""
+        if self.warm_up_started_at is not None:
+            return
+        self.warm_up_started_at = time.perf_counter()
+        threading.Thread(target=self._warm_up, name="warm-up", daemon=True).start()
+
+    def _warm_up(self) -> None:
+        try:
+            warm_up_database_layer()
+        except Exception as e:
+            # Ошибка импорта повторится и будет показана при первой операции
+            self.warm_up_error = str(e)
+        self.warmed_up_at = time.perf_counter()
+        # Сигнал из фонового потока доставляется в главный через очередь событий
+        self.warmed_up.emit()
+
+    @property
+    def warm_up_duration(self) -> Optional[float]:
+        if self.warm_up_started_at is None or self.warmed_up_at is None:
+            return None
+        return self.warmed_up_at - self.warm_up_started_at
@@ -1,8 +1,15 @@
 import threading
 import traceback
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Callable
 
-from PyQt6.QtCore import QObject, pyqtSignal, QMetaObject, Qt, Q_ARG
+from PyQt6.QtCore import QObject, pyqtSignal
+
+from core.progress import ProgressBoard
+
+# Операции упираются в сервер PostgreSQL, а не в CPU клиента
+DEFAULT_MAX_WORKERS = 4
 
 
 class WorkerSignals(QObject):
@@ -13,71 +20,162 @@ class WorkerSignals(QObject):
     progress = pyqtSignal(int)
 
 
+class DatabaseJob:
+    """Операция над одной базой данных, выполняемая в пуле."""
+
+    def __init__(self, operation: str, db_name: str, config: Dict, signals: WorkerSignals, prefix: str = "",
+                 progress_board: ProgressBoard = None):
+        from core.database_manager import DatabaseManager
+        from core.events import EventBus, LogMessage, TableProgress
+
+        self.operation = operation
+        self.db_name = db_name
+
+        # Сигналы Qt потокобезопасны: emit из рабочего потока доставляется в главный
+        event_bus = EventBus()
+        event_bus.subscribe(
+            lambda event: signals.log.emit("".join(prefix + line for line in f"{event.text}\n".splitlines(True))),
+            (LogMessage,)
+        )
+        event_bus.subscribe(lambda event: signals.progress.emit(event.percent), (TableProgress,))
+        if progress_board is not None:
+            # Панель прогресса забирает состояние сама, с ограниченной частотой кадров
+            event_bus.subscribe(progress_board.handle)
+
+        # Конструктор не открывает соединений, поэтому безопасен в главном потоке
+        self.db_manager = DatabaseManager(config, event_bus=event_bus)
+
+    def run(self):
+        if self.operation == "create":
+            self.db_manager.create_databases([self.db_name])
+        elif self.operation == "clean":
+            self.db_manager.clean_databases([self.db_name])
+        else:
+            raise ValueError(f"Неизвестная операция: {self.operation}")
+
+
 class WorkerManager:
-    def __init__(self):
-        self.active_workers: List[tuple] = []
+    """
+    Единый ограниченный пул потоков для операций с БД.
+
+    Операции над разными базами выполняются параллельно (не более max_workers
+    одновременно), операции над одной и той же базой - строго по очереди.
+    """
+
+    def __init__(self, max_workers: int = None):
+        self.max_workers = max_workers or DEFAULT_MAX_WORKERS
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="db-worker")
+        self._lock = threading.Lock()
+        self._busy_databases = set()
+        self._pending: Dict[str, deque] = {}
+        self._jobs: List[DatabaseJob] = []
+        self._queued = 0
+        self._active = 0
+        self.progress_board = ProgressBoard()
 
     def run_database_operation(self, operation: str, databases: List[str],
-                               config: Dict, callbacks: Dict[str, Callable]) -> tuple:
+                               config: Dict, callbacks: Dict[str, Callable]) -> WorkerSignals:
         """
-        Запускает операцию с БД в отдельном потоке.
+        Ставит операцию с БД в очередь пула: по одной задаче на каждую базу.
+        Сигнал finished испускается, когда завершены задачи всех баз.
         """
         worker_signals = WorkerSignals()
-
-        def worker():
-            try:
-                from core.database_manager import DatabaseManager
-                db_manager = DatabaseManager(config)
-
-                if operation == "create":
-                    db_manager.create_databases(databases)
-                elif operation == "clean":
-                    db_manager.clean_databases(databases)
-                else:
-                    raise ValueError(f"Неизвестная операция: {operation}")
-
-                # Эмитируем сигнал в главном потоке
-                QMetaObject.invokeMethod(
-                    worker_signals,
-                    "finished",
-                    Qt.ConnectionType.QueuedConnection
-                )
-
-            except Exception as e:
-                error_msg = f"[ERROR] Ошибка: {e}\n{traceback.format_exc()}"
-                # Эмитируем ошибку в главном потоке
-                QMetaObject.invokeMethod(
-                    worker_signals,
-                    "error",
-                    Qt.ConnectionType.QueuedConnection,
-                    Q_ARG(str, error_msg)
-                )
-
-        thread = threading.Thread(target=worker, daemon=True)
-        self.active_workers.append((thread, worker_signals))
-
-        # Подключаем сигналы к callback-функциям
         worker_signals.finished.connect(callbacks.get('finished', lambda: None))
         worker_signals.error.connect(callbacks.get('error', lambda x: None))
         worker_signals.log.connect(callbacks.get('log', lambda x: None))
-
-        thread.start()
-        return thread, worker_signals
+        worker_signals.progress.connect(callbacks.get('progress', lambda x: None))
+
+        # При параллельном выполнении помечаем строки лога именем базы
+        jobs = [
+            DatabaseJob(operation, db_name, config, worker_signals,
+                        prefix=f"[{db_name}] " if len(databases) > 1 else "",
+                        progress_board=self.progress_board)
+            for db_name in databases
+        ]
+        remaining = {'count': len(jobs)}
+
+        def on_job_done():
+            with self._lock:
+                remaining['count'] -= 1
+                done = remaining['count'] == 0
+            if done:
+                worker_signals.finished.emit()
+
+        for job in jobs:
+            self._submit(job, worker_signals, on_job_done)
+
+        return worker_signals
+
+    def _submit(self, job: DatabaseJob, signals: WorkerSignals, on_done: Callable) -> None:
+        """Отправляет задачу в пул или в очередь ожидания ее базы."""
+        task = (job, signals, on_done)
+
+        with self._lock:
+            self._jobs.append(job)
+            self._queued += 1
+            if job.db_name in self._busy_databases:
+                self._pending.setdefault(job.db_name, deque()).append(task)
+                return
+            self._busy_databases.add(job.db_name)
+
+        self._executor.submit(self._run, *task)
+
+    def _run(self, job: DatabaseJob, signals: WorkerSignals, on_done: Callable) -> None:
+        """Выполняет задачу в потоке пула и запускает следующую задачу той же базы."""
+        with self._lock:
+            self._queued -= 1
+            self._active += 1
+
+        try:
+            job.run()
+        except Exception as e:
+            signals.error.emit(f"[ERROR] Ошибка: {e}\n{traceback.format_exc()}")
+        finally:
+            with self._lock:
+                self._active -= 1
+                self._jobs.remove(job)
+                pending = self._pending.get(job.db_name)
+                next_task = pending.popleft() if pending else None
+                if next_task is None:
+                    self._busy_databases.discard(job.db_name)
+                    self._pending.pop(job.db_name, None)
+
+            on_done()
+
+            if next_task is not None:
+                self._executor.submit(self._run, *next_task)
+
+    def cancel_all(self) -> None:
+        """Отменяет выполняющиеся и ожидающие задачи."""
+        with self._lock:
+            jobs = list(self._jobs)
+
+        for job in jobs:
+            # pg_cancel_backend выполняет сетевой запрос - не блокируем вызывающий поток
+            threading.Thread(target=job.db_manager.cancel, daemon=True).start()
 
     def wait_for_completion(self, timeout: float = 2.0) -> None:
-        """Ожидает завершения всех активных потоков."""
-        for thread, _ in self.active_workers:
-            if thread.is_alive():
-                thread.join(timeout=timeout)
-
-    def cleanup(self) -> None:
-        """Очищает список завершенных работников."""
-        self.active_workers = [(t, s) for t, s in self.active_workers if t.is_alive()]
+        """Ожидает завершения всех задач и останавливает пул."""
+        done = threading.Event()
+        threading.Thread(target=lambda: (self._executor.shutdown(wait=True), done.set()), daemon=True).start()
+        done.wait(timeout)
 
     def has_active_workers(self) -> bool:
-        """Проверяет, есть ли активные потоки."""
-        return any(t.is_alive() for t, _ in self.active_workers)
+        """Проверяет, есть ли выполняющиеся или ожидающие задачи."""
+        with self._lock:
+            return bool(self._jobs)
 
     def get_active_count(self) -> int:
-        """Возвращает количество активных потоков."""
-        return sum(1 for t, _ in self.active_workers if t.is_alive())
+        """Возвращает количество выполняющихся задач."""
+        with self._lock:
+            return self._active
+
+    def get_stats(self) -> Dict[str, float]:
+        """Возвращает загрузку пула: активные задачи, глубину очереди и утилизацию."""
+        with self._lock:
+            return {
+                'active': self._active,
+                'queued': self._queued,
+                'max_workers': self.max_workers,
+                'utilisation': self._active / self.max_workers,
+            }
@@ -5,11 +5,12 @@ from datetime import datetime
 from PyQt6.QtCore import QTimer, QSettings
 from PyQt6.QtGui import QIcon
 from PyQt6.QtWidgets import (
-    QMainWindow, QWidget, QVBoxLayout, QStatusBar, QPushButton
+    QMainWindow, QWidget, QVBoxLayout, QStatusBar, QPushButton, QLabel
 )
 
 from core.config_manager import get_postgres_config, save_postgres_config, RESOURCES_DIR
 from core.logger import QtOutputLogger
+from ui.components.startup_monitor import StartupMonitor
 from ui.styles import (
     LIGHT_THEME, DARK_THEME,
     VERSION_WIDGET_STYLE_LIGHT, VERSION_WIDGET_STYLE_DARK,
@@ -19,6 +20,7 @@ from ui.widgets.connection_config_widget import ConnectionConfigWidget
 from ui.widgets.console_output_widget import ConsoleOutputWidget
 from ui.widgets.control_buttons_widget import ControlButtonsWidget
 from ui.widgets.database_selection_widget import DatabaseSelectionWidget
+from ui.widgets.progress_panel_widget import ProgressPanelWidget
 
 
 class MainWindow(QMainWindow):
@@ -40,6 +42,17 @@ class MainWindow(QMainWindow):
         # Применяем сохраненную тему
         self.apply_theme(self.current_theme)
 
+        # Таймеры и импорт слоя работы с БД - после первой отрисовки окна
+        self.startup_monitor = StartupMonitor(self)
+        self.startup_monitor.first_painted.connect(self.finish_startup)
+
+    def finish_startup(self):
+        """Запускает таймеры и фоновый прогрев слоя работы с БД после первой отрисовки."""
+        self.status_timer.start(5000)
+        self.pool_timer.start(500)
+        self.console_timer.start(100)
+        self.startup_monitor.warm_up()
+
     @staticmethod
     def get_app_icon():
         possible_paths = [
@@ -79,7 +92,11 @@ class MainWindow(QMainWindow):
         self.control_buttons.set_current_theme(self.current_theme)
         main_layout.addWidget(self.control_buttons)
 
-        # 4. Виджет консоли
+        # 4. Панель прогресса по базам и таблицам (показывается при первой операции)
+        self.progress_panel = ProgressPanelWidget(self.control_buttons.worker_manager.progress_board)
+        main_layout.addWidget(self.progress_panel)
+
+        # 5. Виджет консоли
         self.console_widget = ConsoleOutputWidget()
         main_layout.addWidget(self.console_widget, 1)
 
@@ -97,14 +114,35 @@ class MainWindow(QMainWindow):
         # Версия приложения
         version_widget = self.create_version_widget()
 
+        # Загрузка пула потоков
+        self.pool_label = QLabel()
+        self.pool_label.setObjectName("poolLabel")
+        self.update_pool_status()
+
         # Добавляем элементы в статус бар
         status_bar.addPermanentWidget(self.theme_btn)
         status_bar.addPermanentWidget(version_widget)
+        status_bar.addPermanentWidget(self.pool_label)
 
         # Обновляем сообщения статуса через таймер
         self.status_timer = QTimer()
         self.status_timer.timeout.connect(self.update_status_message)
-        self.status_timer.start(5000)
+
+        # Обновляем загрузку пула потоков
+        self.pool_timer = QTimer()
+        self.pool_timer.timeout.connect(self.update_pool_status)
+
+    def update_pool_status(self):
+        """Показывает в статус баре занятость пула и глубину очереди."""
+        stats = self.control_buttons.worker_manager.get_stats()
+        self.pool_label.setText(
+            f"⚙️ {stats['active']}/{stats['max_workers']} · очередь: {stats['queued']}"
+        )
+        self.pool_label.setToolTip(
+            f"Активных задач: {stats['active']}\n"
+            f"Ожидают в очереди: {stats['queued']}\n"
+            f"Утилизация пула: {stats['utilisation']:.0%}"
+        )
 
     def create_theme_button(self):
         """Создает кнопку переключения темы."""
@@ -171,7 +209,6 @@ class MainWindow(QMainWindow):
         # Настраиваем таймер для обновления консоли
         self.console_timer = QTimer()
         self.console_timer.timeout.connect(self.update_console_display)
-        self.console_timer.start(100)
 
     def connect_signals(self):
         """Подключает сигналы между компонентами."""
@@ -185,6 +222,9 @@ class MainWindow(QMainWindow):
         self.control_buttons.operation_finished.connect(
             lambda msg: self.statusBar().showMessage(msg, 3000)
         )
+        self.control_buttons.operation_progress.connect(
+            lambda percent: self.statusBar().showMessage(f"Загрузка таблицы: {percent}%", 3000)
+        )
         self.control_buttons.config_saved.connect(
             lambda: self.statusBar().showMessage("Настройки сохранены", 3000)
         )
@@ -295,6 +335,10 @@ class MainWindow(QMainWindow):
             self.console_timer.stop()
         if hasattr(self, 'status_timer'):
             self.status_timer.stop()
+        if hasattr(self, 'pool_timer'):
+            self.pool_timer.stop()
+        if hasattr(self, 'progress_panel'):
+            self.progress_panel.refresh_timer.stop()
 
         # 2. Очищаем ресурсы виджета кнопок (ждем завершения потоков)
         if hasattr(self, 'control_buttons'):
@@ -81,6 +81,11 @@ QPushButton#saveButton {
     color: white;
 }
 
+QPushButton#cancelButton {
+    background-color: #FF9800;
+    color: white;
+}
+
 /* Консоль вывода */
 QTextEdit {
     font-family: 'Consolas', 'Courier New', monospace;
@@ -93,6 +98,24 @@ QTextEdit {
     selection-background-color: #264F78;
 }
 
+/* Панель прогресса */
+QTreeWidget {
+    font-weight: normal;
+    font-size: 12px;
+    background-color: white;
+    color: #333333;
+    border: 1px solid #cccccc;
+    border-radius: 4px;
+}
+
+QHeaderView::section {
+    background-color: #f0f0f0;
+    color: #333333;
+    border: none;
+    border-bottom: 1px solid #cccccc;
+    padding: 4px;
+}
+
 /* Чекбоксы */
 QCheckBox {
     spacing: 8px;
@@ -258,6 +281,11 @@ QPushButton#saveButton {
     color: white;
 }
 
+QPushButton#cancelButton {
+    background-color: #FF9800;
+    color: white;
+}
+
 /* Консоль вывода - в темной теме светлее */
 QTextEdit {
     font-family: 'Consolas', 'Courier New', monospace;
@@ -270,6 +298,24 @@ QTextEdit {
     selection-background-color: #264F78;
 }
 
+/* Панель прогресса */
+QTreeWidget {
+    font-weight: normal;
+    font-size: 12px;
+    background-color: #252525;
+    color: #cccccc;
+    border: 1px solid #444444;
+    border-radius: 4px;
+}
+
+QHeaderView::section {
+    background-color: #2d2d2d;
+    color: #cccccc;
+    border: none;
+    border-bottom: 1px solid #444444;
+    padding: 4px;
+}
+
 /* Чекбоксы */
 QCheckBox {
     spacing: 8px;
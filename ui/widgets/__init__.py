@@ -6,10 +6,12 @@ from .connection_config_widget import ConnectionConfigWidget
 from .console_output_widget import ConsoleOutputWidget
 from .control_buttons_widget import ControlButtonsWidget
 from .database_selection_widget import DatabaseSelectionWidget
+from .progress_panel_widget import ProgressPanelWidget
 
 __all__ = [
     'ConnectionConfigWidget',
     'DatabaseSelectionWidget',
     'ControlButtonsWidget',
     'ConsoleOutputWidget',
+    'ProgressPanelWidget',
 ]
@@ -1,41 +1,33 @@
-import threading
-import traceback
-
-from PyQt6.QtCore import QObject, pyqtSignal, pyqtSlot
+from PyQt6.QtCore import pyqtSignal, pyqtSlot
 from PyQt6.QtGui import QTextCursor
 from PyQt6.QtWidgets import QFrame, QHBoxLayout, QPushButton, QWidget, QMessageBox
 
-from core.database_manager import DatabaseManager
 from core.logger import QtOutputLogger
+from ui.components.worker_manager import WorkerManager
 from ui.styles import DISABLED_BUTTON_STYLE_LIGHT, DISABLED_BUTTON_STYLE_DARK
 
 
-# Класс для безопасной передачи данных между потоками (переносим из main_window)
-class WorkerSignals(QObject):
-    finished = pyqtSignal()
-    error = pyqtSignal(str)
-    log = pyqtSignal(str)
-
-
 class ControlButtonsWidget(QFrame):
-    """Виджет кнопок управления с полной логикой потоков."""
+    """Виджет кнопок управления. Операции выполняются в общем пуле WorkerManager."""
 
     # Сигналы для общения с main_window
     operation_started = pyqtSignal(str)  # сообщение для статус бара
     operation_finished = pyqtSignal(str)  # сообщение для статус бара
     config_saved = pyqtSignal()
     console_log = pyqtSignal(str)
+    operation_progress = pyqtSignal(int)  # процент загрузки текущей таблицы
     clear_console_requested = pyqtSignal()
 
     def __init__(self, parent=None):
         super().__init__(parent)
         self.main_window = parent
-        self.active_workers = []
+        self.worker_manager = WorkerManager()
         self.current_theme = "light"
         self.logger = None
         self.console_output = None
 
         self.setup_ui()
+        self.update_buttons_state()
 
     def setup_ui(self):
         layout = QHBoxLayout(self)
@@ -51,16 +43,19 @@ class ControlButtonsWidget(QFrame):
         self.create_btn = self._create_button("🗄️ Создать базы данных", "createButton")
         self.clean_btn = self._create_button("🧹 Очистить базы данных", "cleanButton")
         self.save_btn = self._create_button("💾 Сохранить настройки", "saveButton")
+        self.cancel_btn = self._create_button("⛔ Отменить", "cancelButton")
 
         # Подключаем кнопки
         self.create_btn.clicked.connect(self.create_databases)
         self.clean_btn.clicked.connect(self.clean_databases)
         self.save_btn.clicked.connect(self.save_current_config)
+        self.cancel_btn.clicked.connect(self.cancel_operation)
 
         # Добавление в контейнер
         button_container_layout.addWidget(self.create_btn)
         button_container_layout.addWidget(self.clean_btn)
         button_container_layout.addWidget(self.save_btn)
+        button_container_layout.addWidget(self.cancel_btn)
 
         # Центрирование
         layout.addStretch()
@@ -84,6 +79,7 @@ class ControlButtonsWidget(QFrame):
     def set_current_theme(self, theme):
         """Устанавливает текущую тему."""
         self.current_theme = theme
+        self.update_buttons_state()
 
     # ========== ОРИГИНАЛЬНЫЕ МЕТОДЫ ИЗ MAIN_WINDOW ==========
 
@@ -130,34 +126,17 @@ class ControlButtonsWidget(QFrame):
         self.config_saved.emit()
 
     def run_database_operation(self, operation, databases, config):
-        """Запускает операцию с БД в отдельном потоке ."""
-        self.set_buttons_enabled(False)
-
-        if self.logger:
-            self.logger.start_logging()
-
-        # Создаем объект сигналов для этого потока
-        worker_signals = WorkerSignals()
-        worker_signals.finished.connect(lambda: self.on_worker_finished(worker_signals))
-        worker_signals.error.connect(self.on_worker_error)
-        worker_signals.log.connect(self.on_worker_log)
-
-        def worker():
-            try:
-                db_manager = DatabaseManager(config)
-                if operation == "create":
-                    db_manager.create_databases(databases)
-                else:
-                    db_manager.clean_databases(databases)
-                worker_signals.finished.emit()
-            except Exception as e:
-                error_msg = f"[ERROR] Ошибка: {e}\n{traceback.format_exc()}"
-                worker_signals.error.emit(error_msg)
-
-        thread = threading.Thread(target=worker, daemon=True)
-        self.active_workers.append((thread, worker_signals))
-
-        thread.start()
+        """
+        Ставит операцию с БД в очередь пула потоков. Разные базы обрабатываются
+        параллельно, операции над одной базой выполняются по очереди.
+        """
+        self.worker_manager.run_database_operation(operation, databases, config, {
+            'finished': self.on_worker_finished,
+            'error': self.on_worker_error,
+            'log': self.on_worker_log,
+            'progress': self.on_worker_progress,
+        })
+        self.update_buttons_state()
 
         op_name = "создание" if operation == "create" else "очистка"
         self.log_to_console(f"\n{'=' * 60}\n")
@@ -166,19 +145,18 @@ class ControlButtonsWidget(QFrame):
 
         self.operation_started.emit(f"Выполняется {op_name}...")
 
+    def cancel_operation(self):
+        """Обработчик кнопки 'Отменить': отменяет все выполняющиеся операции."""
+        self.cancel_btn.setEnabled(False)
+        self.log_to_console("\n⛔ Отмена операции...\n")
+        self.operation_started.emit("Выполняется отмена...")
+
+        self.worker_manager.cancel_all()
+
     @pyqtSlot()
-    def on_worker_finished(self, worker_signals):
-        """Слот для завершения работы потока ."""
-        # Удаляем завершенный поток из списка активных
-        for i, (thread, signals) in enumerate(self.active_workers):
-            if signals == worker_signals:
-                self.active_workers.pop(i)
-                break
-
-        if self.logger:
-            self.logger.stop_logging()
-
-        self.set_buttons_enabled(True)
+    def on_worker_finished(self):
+        """Слот для завершения операции (всех ее баз) ."""
+        self.update_buttons_state()
         self.operation_finished.emit("Операция завершена")
 
     @pyqtSlot(str)
@@ -186,16 +164,17 @@ class ControlButtonsWidget(QFrame):
         """Слот для обработки ошибок из потока ."""
         print(error_msg)  # Вывод в системную консоль
         self.log_to_console(error_msg)  # Вывод в UI консоль
-        self.set_buttons_enabled(True)
-
-        if self.logger:
-            self.logger.stop_logging()
 
     @pyqtSlot(str)
     def on_worker_log(self, log_msg):
         """Слот для получения логов из потока ."""
         self.log_to_console(log_msg)
 
+    @pyqtSlot(int)
+    def on_worker_progress(self, percent):
+        """Слот для получения прогресса загрузки таблицы ."""
+        self.operation_progress.emit(percent)
+
     def log_to_console(self, message):
         """Прямой вывод сообщения в консоль."""
         if self.console_output:
@@ -206,30 +185,22 @@ class ControlButtonsWidget(QFrame):
             # Если нет прямой ссылки, используем сигнал
             self.console_log.emit(message)
 
-    def set_buttons_enabled(self, enabled):
-        """Блокирует или разблокирует кнопки управления."""
-        self.create_btn.setEnabled(enabled)
-        self.clean_btn.setEnabled(enabled)
-        self.save_btn.setEnabled(enabled)
-
-        # Применяем/снимаем стиль для отключенных кнопок
-        if not enabled:
-            if self.current_theme == "dark":
-                style = DISABLED_BUTTON_STYLE_DARK
-            else:
-                style = DISABLED_BUTTON_STYLE_LIGHT
-
-            self.create_btn.setStyleSheet(style)
-            self.clean_btn.setStyleSheet(style)
-            self.save_btn.setStyleSheet(style)
+    def update_buttons_state(self):
+        """Кнопка отмены доступна, пока в пуле есть задачи. Новые операции можно ставить в очередь."""
+        busy = self.worker_manager.has_active_workers()
+        self.cancel_btn.setEnabled(busy)
+
+        # Применяем/снимаем стиль для отключенной кнопки
+        if busy:
+            self.cancel_btn.setStyleSheet("")
+        elif self.current_theme == "dark":
+            self.cancel_btn.setStyleSheet(DISABLED_BUTTON_STYLE_DARK)
         else:
-            self.create_btn.setStyleSheet("")
-            self.clean_btn.setStyleSheet("")
-            self.save_btn.setStyleSheet("")
+            self.cancel_btn.setStyleSheet(DISABLED_BUTTON_STYLE_LIGHT)
 
     def cleanup(self):
-        """Очистка ресурсов при закрытии."""
-        print(f"Ожидание завершения {len(self.active_workers)} активных потоков...")
-        for thread, _ in self.active_workers:
-            if thread.is_alive():
-                thread.join(timeout=2.0)
+        """Очистка ресурсов при закрытии: отменяет операции и ждет потоки."""
+        print(f"Ожидание завершения {self.worker_manager.get_active_count()} активных потоков...")
+        if self.worker_manager.has_active_workers():
+            self.worker_manager.cancel_all()
+        self.worker_manager.wait_for_completion(timeout=2.0)
@@ -0,0 +1,145 @@
+from PyQt6.QtCore import QTimer
+from PyQt6.QtWidgets import QGroupBox, QHBoxLayout, QLabel, QPushButton, QTreeWidget, QTreeWidgetItem, QVBoxLayout
+
+from core.progress import ProgressBoard, STATE_DONE, STATE_LOADING, STATE_STOPPED
+
+# Не больше стольких перерисовок панели в секунду, как бы часто ни шли события
+PROGRESS_PANEL_FPS = 5
+
+COLUMNS = ['База / таблица', 'Фаза', 'Строк', '%', 'строк/с', 'МБ/с', 'Осталось']
+
+
+def format_eta(seconds):
+    """Оставшееся время в виде м:сс (или ч:мм:сс)"""
+    if seconds is None:
+        return '—'
+    seconds = int(seconds + 0.5)
+    hours, rest = divmod(seconds, 3600)
+    minutes, seconds = divmod(rest, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes}:{seconds:02d}"
+
+
+def format_count(value):
+    return f"{value:,.0f}".replace(',', ' ')
+
+
+class ProgressPanelWidget(QGroupBox):
+    """
+    Панель прогресса: фаза каждой базы и по таблицам - строки, скорость и
+    оставшееся время. Состояние берется из ProgressBoard по таймеру, не чаще
+    PROGRESS_PANEL_FPS раз в секунду и только если оно изменилось.
+    """
+
+    def __init__(self, board: ProgressBoard, fps: int = PROGRESS_PANEL_FPS):
+        super().__init__("Прогресс")
+        self.board = board
+        self._version = None
+        self._items = {}
+        self.setup_ui()
+
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.timeout.connect(self.refresh)
+        self.refresh_timer.start(int(1000 / fps))
+
+    def setup_ui(self):
+        layout = QVBoxLayout()
+
+        header = QHBoxLayout()
+        self.summary_label = QLabel()
+        self.clear_btn = QPushButton("Убрать завершенные")
+        self.clear_btn.clicked.connect(self.board.clear)
+        header.addWidget(self.summary_label, 1)
+        header.addWidget(self.clear_btn)
+
+        self.tree = QTreeWidget()
+        self.tree.setColumnCount(len(COLUMNS))
+        self.tree.setHeaderLabels(COLUMNS)
+        self.tree.setRootIsDecorated(True)
+        self.tree.setUniformRowHeights(True)
+        self.tree.setColumnWidth(0, 200)
+        self.tree.setColumnWidth(1, 150)
+        self.tree.setColumnWidth(2, 150)
+        self.tree.setMaximumHeight(220)
+
+        layout.addLayout(header)
+        layout.addWidget(self.tree)
+        self.setLayout(layout)
+        self.setVisible(False)
+
+    def refresh(self):
+        """Перерисовывает панель, если состояние изменилось с прошлого кадра."""
+        version = self.board.version
+        if version == self._version:
+            return
+        self._version = version
+        snapshot = self.board.snapshot()
+
+        self.setVisible(bool(snapshot))
+        self.tree.setUpdatesEnabled(False)
+        try:
+            self._update_items(snapshot)
+        finally:
+            self.tree.setUpdatesEnabled(True)
+
+        active = sum(1 for database in snapshot if database['phase'])
+        loading = [table for database in snapshot for table in database['tables'] if table['state'] == STATE_LOADING]
+        rate = sum(table['rows_per_sec'] for table in loading)
+        self.summary_label.setText(
+            f"Баз в работе: {active} из {len(snapshot)} · загружается таблиц: {len(loading)} · "
+            f"{format_count(rate)} строк/с"
+        )
+
+    def _update_items(self, snapshot):
+        names = {database['database'] for database in snapshot}
+        for name in [name for name in self._items if name not in names]:
+            item, _ = self._items.pop(name)
+            self.tree.takeTopLevelItem(self.tree.indexOfTopLevelItem(item))
+
+        for database in snapshot:
+            entry = self._items.get(database['database'])
+            if entry is None:
+                item = QTreeWidgetItem(self.tree, [database['database']])
+                item.setExpanded(True)
+                entry = self._items[database['database']] = (item, {})
+            item, table_items = entry
+
+            if database['phase']:
+                phase = f"⏳ {database['phase_title']}"
+            elif database['success'] is False:
+                phase = "❌ ошибка"
+            else:
+                phase = "✅ готово"
+            item.setText(1, phase)
+
+            tables = {table['table'] for table in database['tables']}
+            for name in [name for name in table_items if name not in tables]:
+                item.removeChild(table_items.pop(name))
+
+            for table in database['tables']:
+                table_item = table_items.get(table['table'])
+                if table_item is None:
+                    table_item = table_items[table['table']] = QTreeWidgetItem(item, [table['table']])
+                self._update_table_item(table_item, table)
+
+    @staticmethod
+    def _update_table_item(item, table):
+        if table['state'] == STATE_LOADING:
+            state = "загрузка"
+        elif table['state'] == STATE_DONE:
+            state = "✅"
+        elif table['state'] == STATE_STOPPED:
+            state = "⛔ прервана"
+        else:
+            state = f"⚠️ ошибок: {table['errors']}"
+
+        loading = table['state'] == STATE_LOADING
+        rows = format_count(table['done'])
+        if table['total']:
+            rows += f" / {format_count(table['total'])}"
+
+        item.setText(1, state)
+        item.setText(2, rows)
+        item.setText(3, f"{table['percent']}%")
+        item.setText(4, format_count(table['rows_per_sec']) if table['rows_per_sec'] else '—')
+        item.setText(5, f"{table['bytes_per_sec'] / 1024 / 1024:.1f}" if table['bytes_per_sec'] else '—')
+        item.setText(6, format_eta(table['eta']) if loading else '')